@@ -0,0 +1,95 @@
+import asyncio
+import logging
+import time
+from collections import defaultdict
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from .ratelimit import TokenBucket
+
+log = logging.getLogger(__name__)
+
+# Seconds a BattleMetrics response is reused, per kind
+PLAYERS_TTL = 60.0
+INFO_TTL = 300.0
+
+# BattleMetrics allows 60 requests/minute without a token; stay under it with a small burst
+REQUEST_RATE = 0.75
+REQUEST_BURST = 10
+
+
+class CachedBattleMetrics:
+    """
+    Shared front for BattleMetricsClient, keyed by server_id.
+
+    Responses are reused for a TTL, so every guild and command tracking the same
+    server is served by one fetch; concurrent misses for the same key share a
+    single in-flight request, and all requests share one rate limit. Exposes the
+    same coroutines as the client.
+    """
+
+    def __init__(self, client: Any, players_ttl: float = PLAYERS_TTL, info_ttl: float = INFO_TTL):
+        self.client = client
+        self.ttl = {"players": players_ttl, "info": info_ttl}
+        self.limiter = TokenBucket(REQUEST_RATE, REQUEST_BURST) # Every outgoing request, shared by all callers
+
+        self._entries: Dict[Tuple[str, str], Tuple[float, Any]] = {} # (kind, server_id) -> (fetched_at, data)
+        self._inflight: Dict[Tuple[str, str], asyncio.Task] = {}
+
+        self.hits: Dict[str, int] = defaultdict(int)
+        self.misses: Dict[str, int] = defaultdict(int)
+        self.shared: Dict[str, int] = defaultdict(int) # Misses that joined an in-flight fetch
+        self.errors: Dict[str, int] = defaultdict(int)
+
+    async def get_server_players(self, server_id: str, max_age: Optional[float] = None):
+        return await self._get("players", str(server_id), self.client.get_server_players, max_age)
+
+    async def get_server_info(self, server_id: str, max_age: Optional[float] = None):
+        return await self._get("info", str(server_id), self.client.get_server_info, max_age)
+
+    def age(self, kind: str, server_id: str) -> Optional[float]:
+        entry = self._entries.get((kind, str(server_id)))
+        return time.monotonic() - entry[0] if entry else None
+
+    def invalidate(self, server_id: str):
+        for kind in self.ttl:
+            self._entries.pop((kind, str(server_id)), None)
+
+    async def _get(self, kind: str, server_id: str, fetch: Callable[[str], Awaitable[Any]], max_age: Optional[float]):
+        key = (kind, server_id)
+        ttl = self.ttl[kind] if max_age is None else max_age
+        entry = self._entries.get(key)
+        if entry and time.monotonic() - entry[0] < ttl:
+            self.hits[kind] += 1
+            return entry[1]
+
+        task = self._inflight.get(key)
+        if task is None:
+            self.misses[kind] += 1
+            task = asyncio.create_task(self._fetch(key, fetch))
+            self._inflight[key] = task
+        else:
+            self.shared[kind] += 1
+        # shield: one caller being cancelled must not cancel the fetch the others are waiting on
+        return await asyncio.shield(task)
+
+    async def _fetch(self, key: Tuple[str, str], fetch: Callable[[str], Awaitable[Any]]):
+        try:
+            await self.limiter.acquire()
+            data = await fetch(key[1])
+            if data is not None: # The client returns None on API errors; don't pin those for a TTL
+                self._entries[key] = (time.monotonic(), data)
+            return data
+        except Exception:
+            self.errors[key[0]] += 1
+            raise
+        finally:
+            self._inflight.pop(key, None)
+
+    def get_stats(self) -> Dict[str, Dict[str, int]]:
+        return {
+            kind: {"hits": self.hits[kind], "misses": self.misses[kind], "shared": self.shared[kind], "errors": self.errors[kind]}
+            for kind in self.ttl
+        }
+
+    async def close(self):
+        await self.client.close()
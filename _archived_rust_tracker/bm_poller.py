@@ -0,0 +1,194 @@
+import asyncio
+import heapq
+import itertools
+import logging
+import random
+import time
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+log = logging.getLogger(__name__)
+
+MIN_INTERVAL = 60.0      # Busy servers (wipe day) are polled at most once a minute
+MAX_INTERVAL = 600.0     # Quiet or empty servers
+INITIAL_INTERVAL = 180.0
+TARGET_CHANGES = 3.0     # Aim for about this many joins/leaves between polls
+CHURN_SMOOTHING = 0.5    # EWMA weight of the newest churn sample
+SYNC_INTERVAL = 30.0     # Seconds between re-reading which servers are configured
+
+
+@dataclass
+class ServerState:
+    server_id: str
+    interval: float = INITIAL_INTERVAL
+    churn: float = 0.0                      # Smoothed joins+leaves per second
+    population: Optional[int] = None
+    last_success: Optional[float] = None    # time.monotonic()
+    last_error: Optional[str] = None
+    errors: int = 0
+    empty_streak: int = 0
+    online: Optional[Set[str]] = None
+
+    @property
+    def staleness(self) -> Optional[float]:
+        return time.monotonic() - self.last_success if self.last_success else None
+
+
+class BattleMetricsPoller:
+    """
+    Polls each configured BattleMetrics server on its own schedule.
+
+    Servers live in a min-heap keyed by next due time and are fetched with bounded
+    concurrency, so a slow server only delays itself. After each poll the interval
+    adapts to the observed join/leave churn: busy servers are polled more often,
+    quiet and empty ones back off towards MAX_INTERVAL, failures back off
+    exponentially. One fetch serves every guild tracking the server.
+    """
+
+    def __init__(
+        self,
+        servers: Callable[[], Dict[str, List[int]]],
+        fetch: Callable[[str], Awaitable[List[dict]]],
+        handler: Callable[[str, List[int], List[dict]], Awaitable[None]],
+        names: Callable[[List[dict]], Set[str]],
+        max_concurrency: int = 4,
+    ):
+        self._servers = servers  # () -> {server_id: [guild_id, ...]}
+        self._fetch = fetch      # async (server_id) -> players
+        self._handler = handler  # async (server_id, guild_ids, players)
+        self._names = names      # players -> set of normalized names, for churn
+
+        self.states: Dict[str, ServerState] = {}
+        self._guilds: Dict[str, List[int]] = {}
+        self._heap: List[Tuple[float, int, str]] = []
+        self._seq = itertools.count()
+        self._scheduled: Dict[str, int] = {} # server_id -> seq of its live heap entry
+        self._inflight: Set[str] = set()
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._wakeup = asyncio.Event()
+        self._next_sync = 0.0
+        self._task: Optional[asyncio.Task] = None
+        self._polls: Set[asyncio.Task] = set() # In-flight polls, kept referenced until done
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        for task in list(self._polls):
+            task.cancel()
+        await asyncio.gather(*self._polls, return_exceptions=True)
+
+    def refresh(self):
+        """Re-read the configured servers now (after a config change)."""
+        self._next_sync = 0.0
+        self._wakeup.set()
+
+    def status_for_guild(self, guild_id: int) -> Optional[ServerState]:
+        for server_id, guild_ids in self._guilds.items():
+            if guild_id in guild_ids:
+                return self.states.get(server_id)
+        return None
+
+    def _sync_servers(self, now: float):
+        self._guilds = {sid: gids for sid, gids in self._servers().items() if sid}
+        for server_id in self._guilds:
+            if server_id not in self.states:
+                self.states[server_id] = ServerState(server_id)
+                # Spread first polls so a restart doesn't fetch every server at once
+                self._schedule(server_id, now + random.uniform(0, MIN_INTERVAL / 2))
+        for server_id in list(self.states):
+            if server_id not in self._guilds:
+                del self.states[server_id] # Heap entry is dropped when it comes due
+                self._scheduled.pop(server_id, None)
+        self._next_sync = now + SYNC_INTERVAL
+
+    def _schedule(self, server_id: str, due: float):
+        seq = next(self._seq)
+        self._scheduled[server_id] = seq
+        heapq.heappush(self._heap, (due, seq, server_id))
+
+    async def _run(self):
+        while True:
+            now = time.monotonic()
+            if now >= self._next_sync:
+                try:
+                    self._sync_servers(now)
+                except Exception as e:
+                    log.error(f"BattleMetricsPoller: Failed to read configured servers: {e}")
+                    self._next_sync = now + SYNC_INTERVAL
+
+            while self._heap and self._heap[0][0] <= now:
+                _, seq, server_id = heapq.heappop(self._heap)
+                state = self.states.get(server_id)
+                if state is None or self._scheduled.get(server_id) != seq or server_id in self._inflight:
+                    continue # Removed, superseded by a newer entry, or still running
+                self._inflight.add(server_id)
+                task = asyncio.create_task(self._poll(state))
+                self._polls.add(task)
+                task.add_done_callback(self._polls.discard)
+
+            due = self._heap[0][0] if self._heap else self._next_sync
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=max(0.0, min(due, self._next_sync) - time.monotonic()))
+            except asyncio.TimeoutError:
+                pass
+
+    async def _poll(self, state: ServerState):
+        try:
+            async with self._semaphore:
+                players = await self._fetch(state.server_id)
+
+            if not players and state.population and state.empty_streak < 1:
+                # The client returns [] on API errors too; only trust an empty server on the second read
+                state.empty_streak += 1
+                state.last_error = "empty player list, re-checking"
+                state.interval = MIN_INTERVAL
+                return
+            state.empty_streak = 0
+
+            self._observe(state, players or [])
+            guild_ids = self._guilds.get(state.server_id, [])
+            if guild_ids:
+                await self._handler(state.server_id, guild_ids, players or [])
+            state.last_error = None
+        except Exception as e:
+            state.errors += 1
+            state.last_error = str(e)
+            state.interval = min(MAX_INTERVAL, state.interval * 2)
+            log.warning(f"BattleMetricsPoller: Poll of server {state.server_id} failed ({e}); next in {state.interval:.0f}s")
+        finally:
+            self._inflight.discard(state.server_id)
+            if state.server_id in self.states:
+                jitter = state.interval * 0.1
+                self._schedule(state.server_id, time.monotonic() + state.interval + random.uniform(-jitter, jitter))
+                self._wakeup.set()
+
+    def _observe(self, state: ServerState, players: List[dict]):
+        now = time.monotonic()
+        online = self._names(players)
+
+        if state.online is not None and state.last_success:
+            elapsed = max(1.0, now - state.last_success)
+            rate = len(online ^ state.online) / elapsed
+            state.churn = CHURN_SMOOTHING * rate + (1 - CHURN_SMOOTHING) * state.churn
+
+        if not online:
+            desired = MAX_INTERVAL
+        elif state.churn > 0:
+            desired = TARGET_CHANGES / state.churn
+        else:
+            desired = state.interval * 1.5
+        state.interval = min(MAX_INTERVAL, max(MIN_INTERVAL, desired))
+
+        state.online = online
+        state.population = len(online)
+        state.last_success = now
@@ -0,0 +1,183 @@
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+
+@dataclass
+class MarkerDelta:
+    """Changes between two consecutive marker polls."""
+    markers: List[Any]                                # Full current snapshot
+    added: List[Any] = field(default_factory=list)
+    removed: List[Any] = field(default_factory=list)  # Marker objects from the previous snapshot
+    moved: List[Any] = field(default_factory=list)
+    updated: List[Any] = field(default_factory=list)  # Same position, different content (e.g. vending stock)
+    initial: bool = False                             # First snapshot since the monitor started
+
+    def merge(self, newer: "MarkerDelta") -> "MarkerDelta":
+        """Fold a newer delta into this one, as if both polls were diffed in one step."""
+        added = {m.id: m for m in self.added}
+        removed = {m.id: m for m in self.removed}
+        moved = {m.id: m for m in self.moved}
+        updated = {m.id: m for m in self.updated}
+
+        for m in newer.removed:
+            if m.id in added:
+                del added[m.id]  # Appeared and disappeared between deliveries
+            else:
+                removed[m.id] = m
+            moved.pop(m.id, None)
+            updated.pop(m.id, None)
+        for m in newer.added:
+            added[m.id] = m
+        for m in newer.moved:
+            if m.id in added:
+                added[m.id] = m
+            else:
+                moved[m.id] = m
+        for m in newer.updated:
+            if m.id in added:
+                added[m.id] = m
+            else:
+                updated[m.id] = m
+
+        return MarkerDelta(
+            markers=newer.markers,
+            added=list(added.values()),
+            removed=list(removed.values()),
+            moved=list(moved.values()),
+            updated=list(updated.values()),
+            initial=self.initial or newer.initial,
+        )
+
+
+@dataclass
+class PopChange:
+    info: Any
+    players: int
+    max_players: int
+    queued_players: int
+    previous_players: Optional[int] = None
+    previous_queued: Optional[int] = None
+
+
+def _sell_orders_fingerprint(marker) -> Tuple:
+    orders = getattr(marker, "sell_orders", None) or []
+    return tuple(
+        (
+            getattr(o, "item_id", None),
+            getattr(o, "quantity", None),
+            getattr(o, "currency_id", None),
+            getattr(o, "cost_per_item", None),
+            getattr(o, "amount_in_stock", None),
+        )
+        for o in orders
+    )
+
+
+def _content_fingerprint(marker) -> int:
+    return hash((
+        getattr(marker, "type", None),
+        getattr(marker, "name", None),
+        getattr(marker, "out_of_stock", None),
+        _sell_orders_fingerprint(marker),
+    ))
+
+
+def _object_fingerprint(obj) -> int:
+    try:
+        return hash(repr(sorted(vars(obj).items())))
+    except TypeError:
+        return hash(repr(obj))
+
+
+class SnapshotDiffer:
+    """
+    Compares each polled snapshot with the previous one and turns it into delta events.
+    Returns an empty list for no-op polls so nothing is dispatched.
+    """
+
+    def __init__(self, move_threshold: float = 1.0):
+        self.move_threshold = move_threshold
+
+        self._markers: Dict[int, Any] = {}
+        self._positions: Dict[int, Tuple[float, float]] = {}
+        self._contents: Dict[int, int] = {}
+        self._has_markers = False
+
+        self._info: Optional[PopChange] = None
+        self._info_fingerprint: Optional[int] = None
+        self._time_fingerprint: Optional[int] = None
+
+        self.suppressed = 0  # Polls that produced no events
+
+    def diff(self, endpoint: str, data: Any) -> List[Tuple[str, Any]]:
+        if endpoint == "markers":
+            delta = self.diff_markers(data)
+            events = [("marker_delta", delta)] if delta else []
+        elif endpoint == "server_info":
+            events = self.diff_server_info(data)
+        elif endpoint == "time":
+            fingerprint = _object_fingerprint(data)
+            events = [] if fingerprint == self._time_fingerprint else [("time", data)]
+            self._time_fingerprint = fingerprint
+        else:
+            events = [(endpoint, data)]
+
+        if not events:
+            self.suppressed += 1
+        return events
+
+    def diff_markers(self, markers: List[Any]) -> Optional[MarkerDelta]:
+        delta = MarkerDelta(markers=markers, initial=not self._has_markers)
+        current: Dict[int, Any] = {}
+        positions: Dict[int, Tuple[float, float]] = {}
+        contents: Dict[int, int] = {}
+
+        for marker in markers:
+            current[marker.id] = marker
+            pos = (marker.x, marker.y)
+            content = _content_fingerprint(marker)
+            positions[marker.id] = pos
+            contents[marker.id] = content
+
+            old_pos = self._positions.get(marker.id)
+            if old_pos is None:
+                delta.added.append(marker)
+                continue
+            if abs(pos[0] - old_pos[0]) > self.move_threshold or abs(pos[1] - old_pos[1]) > self.move_threshold:
+                delta.moved.append(marker)
+            elif content != self._contents[marker.id]:
+                delta.updated.append(marker)
+
+        for marker_id, marker in self._markers.items():
+            if marker_id not in current:
+                delta.removed.append(marker)
+
+        changed = delta.initial or delta.added or delta.removed or delta.moved or delta.updated
+
+        self._markers = current
+        self._positions = positions
+        self._contents = contents
+        self._has_markers = True
+
+        return delta if changed else None
+
+    def diff_server_info(self, info: Any) -> List[Tuple[str, Any]]:
+        fingerprint = _object_fingerprint(info)
+        if fingerprint == self._info_fingerprint:
+            return []
+        self._info_fingerprint = fingerprint
+
+        events = [("server_info", info)]
+        previous = self._info
+        pop = PopChange(
+            info=info,
+            players=info.players,
+            max_players=info.max_players,
+            queued_players=info.queued_players,
+            previous_players=previous.players if previous else None,
+            previous_queued=previous.queued_players if previous else None,
+        )
+        if not previous or (previous.players, previous.max_players, previous.queued_players) != (pop.players, pop.max_players, pop.queued_players):
+            events.append(("pop_changed", pop))
+        self._info = pop
+        return events
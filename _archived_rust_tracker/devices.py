@@ -0,0 +1,69 @@
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional
+
+from .search import NameIndex, normalize
+
+
+@dataclass
+class SmartDevice:
+    entity_id: int
+    name: str
+    type: str # 'alarm', 'switch', 'storage'
+
+
+class DeviceRegistry:
+    """
+    Paired smart devices for one guild, loaded once from rust_smart_devices and
+    kept current write-through by /rust_pair. O(1) lookup by entity_id for entity
+    events, and by name for /rust_switch (exact, then prefix/substring/trigram
+    through a name index rather than a scan of every device).
+    """
+
+    def __init__(self, devices: Iterable[SmartDevice] = ()):
+        self._by_id: Dict[int, SmartDevice] = {}
+        self._by_name: Dict[str, List[SmartDevice]] = {} # Names aren't unique, e.g. a switch and an alarm both called "Door"
+        self._names = NameIndex()
+        for device in devices:
+            self.upsert(device)
+
+    @classmethod
+    def from_rows(cls, rows) -> "DeviceRegistry":
+        return cls(SmartDevice(int(r["entity_id"]), r["name"], r["type"]) for r in rows)
+
+    def __len__(self) -> int:
+        return len(self._by_id)
+
+    def upsert(self, device: SmartDevice):
+        old = self._by_id.get(device.entity_id)
+        if old:
+            self._names.remove(old.name)
+            key = normalize(old.name)
+            same_name = [d for d in self._by_name.get(key, ()) if d is not old]
+            if same_name:
+                self._by_name[key] = same_name
+            else:
+                self._by_name.pop(key, None)
+        self._by_id[device.entity_id] = device
+        self._by_name.setdefault(normalize(device.name), []).append(device)
+        self._names.add(device.name)
+
+    def get(self, entity_id: int) -> Optional[SmartDevice]:
+        return self._by_id.get(entity_id)
+
+    def find(self, name: str, device_type: Optional[str] = None) -> Optional[SmartDevice]:
+        """Exact (case-insensitive) name match, falling back to prefix, substring and trigram matches."""
+        device = self._named(normalize(name), device_type)
+        if device:
+            return device
+
+        for match in self._names.search(name, limit=10):
+            device = self._named(normalize(match), device_type)
+            if device:
+                return device
+        return None
+
+    def _named(self, key: str, device_type: Optional[str]) -> Optional[SmartDevice]:
+        for device in reversed(self._by_name.get(key, ())): # Most recently paired first
+            if device_type is None or device.type == device_type:
+                return device
+        return None
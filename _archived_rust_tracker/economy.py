@@ -0,0 +1,94 @@
+import datetime
+import logging
+from typing import List, Optional
+
+from xyz.jefferybeans.jeffbot.database import db
+
+log = logging.getLogger(__name__)
+
+# Rollup key for guilds without a wipe time (NULL can't be part of the primary key)
+NO_WIPE = datetime.datetime(1970, 1, 2)
+TRANSFER = "" # item_name for currency transfers, which have no item
+
+
+def hour_bucket(timestamp: datetime.datetime) -> datetime.datetime:
+    return timestamp.replace(minute=0, second=0, microsecond=0)
+
+
+class EconomyRollups:
+    """
+    Hourly and per-wipe totals of rust_economy_transactions, kept in
+    rust_economy_hourly / rust_economy_wipe and updated at insert time, so
+    stats read a few pre-aggregated rows instead of scanning the whole wipe.
+    """
+
+    async def record(self, guild_id: int, wipe_at: Optional[datetime.datetime], item_name: Optional[str], cost_item: str, quantity: int, cost_amount: int, timestamp: datetime.datetime):
+        item = item_name or TRANSFER
+        await db.execute("""
+            INSERT INTO rust_economy_hourly (guild_id, hour_start, item_name, cost_item, total_quantity, total_cost, trades)
+            VALUES (%s, %s, %s, %s, %s, %s, 1)
+            ON DUPLICATE KEY UPDATE total_quantity = total_quantity + VALUES(total_quantity),
+                total_cost = total_cost + VALUES(total_cost), trades = trades + 1
+        """, guild_id, hour_bucket(timestamp), item, cost_item, quantity, cost_amount)
+        await db.execute("""
+            INSERT INTO rust_economy_wipe (guild_id, wipe_at, item_name, cost_item, total_quantity, total_cost, trades)
+            VALUES (%s, %s, %s, %s, %s, %s, 1)
+            ON DUPLICATE KEY UPDATE total_quantity = total_quantity + VALUES(total_quantity),
+                total_cost = total_cost + VALUES(total_cost), trades = trades + 1
+        """, guild_id, wipe_at or NO_WIPE, item, cost_item, quantity, cost_amount)
+
+    async def top_items(self, guild_id: int, wipe_at: Optional[datetime.datetime], limit: int = 5) -> List[dict]:
+        return await db.fetch_all("""
+            SELECT item_name, cost_item, total_quantity as total_sold, total_cost as total_volume, trades
+            FROM rust_economy_wipe
+            WHERE guild_id = %s AND wipe_at = %s AND item_name <> ''
+            ORDER BY total_cost DESC
+            LIMIT %s
+        """, guild_id, wipe_at or NO_WIPE, limit)
+
+    async def hourly(self, guild_id: int, since: datetime.datetime, item_name: Optional[str] = None) -> List[dict]:
+        """Trade volume per hour (optionally for one item) for trend views."""
+        query = """
+            SELECT hour_start, cost_item, SUM(total_quantity) as total_sold, SUM(total_cost) as total_volume, SUM(trades) as trades
+            FROM rust_economy_hourly
+            WHERE guild_id = %s AND hour_start >= %s AND item_name <> ''
+        """
+        params = [guild_id, hour_bucket(since)]
+        if item_name:
+            query += " AND item_name = %s"
+            params.append(item_name)
+        query += " GROUP BY hour_start, cost_item ORDER BY hour_start"
+        return await db.fetch_all(query, *params)
+
+    async def rebuild_wipe(self, guild_id: int, wipe_at: Optional[datetime.datetime]):
+        """Re-derive the current wipe's totals from the hourly rollup after the wipe time changes."""
+        # Earlier wipes stay as history; only totals the new wipe supersedes are replaced
+        await db.execute("DELETE FROM rust_economy_wipe WHERE guild_id = %s AND wipe_at >= %s", guild_id, wipe_at or NO_WIPE)
+        query = """
+            INSERT INTO rust_economy_wipe (guild_id, wipe_at, item_name, cost_item, total_quantity, total_cost, trades)
+            SELECT guild_id, %s, item_name, cost_item, SUM(total_quantity), SUM(total_cost), SUM(trades)
+            FROM rust_economy_hourly
+            WHERE guild_id = %s
+        """
+        params = [wipe_at or NO_WIPE, guild_id]
+        if wipe_at:
+            query += " AND hour_start >= %s"
+            params.append(hour_bucket(wipe_at))
+        query += " GROUP BY guild_id, item_name, cost_item"
+        await db.execute(query, *params)
+
+    async def rebuild_hourly(self, guild_id: int):
+        """Backfill the hourly rollup from raw transactions (first start, or after a resync)."""
+        await db.execute("DELETE FROM rust_economy_hourly WHERE guild_id = %s", guild_id)
+        await db.execute("""
+            INSERT INTO rust_economy_hourly (guild_id, hour_start, item_name, cost_item, total_quantity, total_cost, trades)
+            SELECT guild_id, DATE_FORMAT(timestamp, '%%Y-%%m-%%d %%H:00:00'), COALESCE(item_name, ''), cost_item,
+                SUM(quantity), SUM(cost_amount), COUNT(*)
+            FROM rust_economy_transactions
+            WHERE guild_id = %s AND cost_item IS NOT NULL
+            GROUP BY guild_id, DATE_FORMAT(timestamp, '%%Y-%%m-%%d %%H:00:00'), COALESCE(item_name, ''), cost_item
+        """, guild_id)
+
+    async def clear(self, guild_id: int):
+        await db.execute("DELETE FROM rust_economy_hourly WHERE guild_id = %s", guild_id)
+        await db.execute("DELETE FROM rust_economy_wipe WHERE guild_id = %s", guild_id)
@@ -0,0 +1,143 @@
+import asyncio
+import logging
+import time
+from collections import defaultdict, deque
+from typing import Any, Callable, Deque, Dict, Optional
+
+log = logging.getLogger(__name__)
+
+# Queue policies
+COALESCE = "coalesce"        # Replace (or merge into) a pending event of the same type
+DROP_OLDEST = "drop_oldest"  # When full, make room by dropping the oldest droppable event, else drop the new one
+NEVER_DROP = "never_drop"    # Always enqueued, even past maxsize
+
+DEFAULT_POLICIES = {
+    "marker_delta": COALESCE,   # Deltas are merged, so nothing is lost
+    "time": COALESCE,
+    "server_info": COALESCE,
+    "pop_changed": COALESCE,
+    "team_info": COALESCE,
+    "team_event": NEVER_DROP,
+    "entity_event": NEVER_DROP, # Smart alarms
+    "chat_event": DROP_OLDEST,
+}
+
+
+class _Entry:
+    __slots__ = ("event_type", "payload", "enqueued_at")
+
+    def __init__(self, event_type: str, payload: Any, enqueued_at: float):
+        self.event_type = event_type
+        self.payload = payload
+        self.enqueued_at = enqueued_at
+
+
+class GuildEventQueue:
+    """
+    Bounded queue between a RustMonitor and its event handler.
+
+    put() never blocks, so socket listeners return immediately; a dedicated consumer
+    task delivers events to the handler in order.
+    """
+
+    def __init__(self, guild_id: int, handler: Callable, maxsize: int = 256, policies: Optional[Dict[str, str]] = None):
+        self.guild_id = guild_id
+        self.handler = handler # async func(event_type, data)
+        self.maxsize = maxsize
+        self.policies = dict(DEFAULT_POLICIES)
+        if policies:
+            self.policies.update(policies)
+
+        self._queue: Deque[_Entry] = deque()
+        self._pending: Dict[str, _Entry] = {} # event_type -> queued entry, for coalescing
+        self._not_empty = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+        self.dropped: Dict[str, int] = defaultdict(int)
+        self.coalesced: Dict[str, int] = defaultdict(int)
+        self.max_age = 0.0 # Longest time an event waited before delivery
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._consume())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def put(self, event_type: str, payload: Any):
+        policy = self.policies.get(event_type, DROP_OLDEST)
+
+        if policy == COALESCE:
+            pending = self._pending.get(event_type)
+            if pending:
+                merge = getattr(pending.payload, "merge", None)
+                pending.payload = merge(payload) if merge else payload
+                self.coalesced[event_type] += 1
+                return
+
+        if len(self._queue) >= self.maxsize and not self._evict_one():
+            if policy == DROP_OLDEST:
+                self.dropped[event_type] += 1
+                return
+            # COALESCE holds at most one entry per type and carries state, so it may exceed maxsize like NEVER_DROP
+
+        entry = _Entry(event_type, payload, time.monotonic())
+        self._queue.append(entry)
+        if policy == COALESCE:
+            self._pending[event_type] = entry
+        self._not_empty.set()
+
+    def _evict_one(self) -> bool:
+        # Only plain droppable events; a coalesced entry holds merged state that can't be recovered.
+        for entry in self._queue:
+            if self.policies.get(entry.event_type, DROP_OLDEST) == DROP_OLDEST:
+                self._queue.remove(entry)
+                self.dropped[entry.event_type] += 1
+                return True
+        return False
+
+    def _forget(self, entry: _Entry):
+        if self._pending.get(entry.event_type) is entry:
+            del self._pending[entry.event_type]
+
+    @property
+    def depth(self) -> int:
+        return len(self._queue)
+
+    @property
+    def oldest_age(self) -> float:
+        """Seconds the oldest queued event has been waiting."""
+        if not self._queue:
+            return 0.0
+        return time.monotonic() - self._queue[0].enqueued_at
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "depth": self.depth,
+            "oldest_age": self.oldest_age,
+            "max_age": self.max_age,
+            "dropped": sum(self.dropped.values()),
+            "coalesced": sum(self.coalesced.values()),
+        }
+
+    async def _consume(self):
+        while True:
+            if not self._queue:
+                self._not_empty.clear()
+                await self._not_empty.wait()
+                continue
+
+            entry = self._queue.popleft()
+            self._forget(entry)
+            self.max_age = max(self.max_age, time.monotonic() - entry.enqueued_at)
+
+            try:
+                await self.handler(entry.event_type, entry.payload)
+            except Exception as e:
+                log.error(f"GuildEventQueue: Handler failed for {entry.event_type} in guild {self.guild_id}: {e}")
@@ -0,0 +1,93 @@
+import asyncio
+import contextlib
+import functools
+import logging
+import os
+import time
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+log = logging.getLogger(__name__)
+
+# Pool sizes, overridable from the environment like the rest of the bot config
+THREAD_WORKERS = int(os.environ.get("RUST_TRACKER_THREAD_WORKERS", min(4, os.cpu_count() or 1)))
+PROCESS_WORKERS = int(os.environ.get("RUST_TRACKER_PROCESS_WORKERS", max(1, min(2, (os.cpu_count() or 1) - 1))))
+
+THREAD = "thread"   # I/O, GIL-releasing work (PIL encoding, file access) and short Python work
+PROCESS = "process" # Pure-Python CPU work; func and args must be picklable
+
+
+def _timed_call(func: Callable, args: tuple, kwargs: dict):
+    started = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, time.perf_counter() - started
+
+
+class OffloadPool:
+    """
+    Thread and process pools for CPU-bound work in the cog.
+
+    run() hands work to a pool and awaits it. Time spent in workers (off-loop),
+    waiting for a free worker, and in instrumented on-loop sections is accumulated
+    per label for /rust_status.
+    """
+
+    def __init__(self, thread_workers: int = THREAD_WORKERS, process_workers: int = PROCESS_WORKERS):
+        self.thread_workers = thread_workers
+        self.process_workers = process_workers
+        self._threads: Optional[ThreadPoolExecutor] = None
+        self._processes: Optional[ProcessPoolExecutor] = None
+
+        self.off_loop_seconds: Dict[str, float] = defaultdict(float)  # label -> seconds running in a worker
+        self.queued_seconds: Dict[str, float] = defaultdict(float)    # label -> seconds waiting for a worker
+        self.on_loop_seconds: Dict[str, float] = defaultdict(float)   # label -> seconds in on_loop() sections
+        self.calls: Dict[str, int] = defaultdict(int)
+
+    def _executor(self, kind: str):
+        if kind == PROCESS:
+            if self._processes is None:
+                self._processes = ProcessPoolExecutor(max_workers=self.process_workers)
+            return self._processes
+        if self._threads is None:
+            self._threads = ThreadPoolExecutor(max_workers=self.thread_workers, thread_name_prefix="rust-offload")
+        return self._threads
+
+    async def run(self, func: Callable, *args, kind: str = THREAD, label: Optional[str] = None, **kwargs) -> Any:
+        label = label or getattr(func, "__name__", "task")
+        loop = asyncio.get_running_loop()
+        submitted = time.perf_counter()
+        result, elapsed = await loop.run_in_executor(self._executor(kind), functools.partial(_timed_call, func, args, kwargs))
+        self.calls[label] += 1
+        self.off_loop_seconds[label] += elapsed
+        self.queued_seconds[label] += max(0.0, time.perf_counter() - submitted - elapsed)
+        return result
+
+    @contextlib.contextmanager
+    def on_loop(self, label: str):
+        """Time a synchronous section that has to stay on the event loop."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.on_loop_seconds[label] += time.perf_counter() - started
+
+    def get_stats(self) -> Dict[str, Dict[str, float]]:
+        labels = set(self.off_loop_seconds) | set(self.on_loop_seconds)
+        return {
+            label: {
+                "calls": self.calls.get(label, 0),
+                "off_loop": self.off_loop_seconds.get(label, 0.0),
+                "queued": self.queued_seconds.get(label, 0.0),
+                "on_loop": self.on_loop_seconds.get(label, 0.0),
+            }
+            for label in sorted(labels)
+        }
+
+    def shutdown(self):
+        if self._threads:
+            self._threads.shutdown(wait=False, cancel_futures=True)
+            self._threads = None
+        if self._processes:
+            self._processes.shutdown(wait=False, cancel_futures=True)
+            self._processes = None
@@ -0,0 +1,98 @@
+import datetime
+import logging
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+from xyz.jefferybeans.jeffbot.database import db
+
+log = logging.getLogger(__name__)
+
+
+@dataclass
+class GuildConfig:
+    guild_id: int
+    channel_ids: List[int] = field(default_factory=list)  # Tracking channels
+    wipe_at: Optional[datetime.datetime] = None
+    battlemetrics_server_id: Optional[str] = None
+    manager_role_id: Optional[int] = None                 # Economy manager role
+
+
+def _parse_wipe(value) -> Optional[datetime.datetime]:
+    if isinstance(value, str):
+        try:
+            return datetime.datetime.fromisoformat(value)
+        except ValueError:
+            return None
+    return value
+
+
+class GuildConfigCache:
+    """
+    Per-guild Rust tracker config, assembled from rust_tracking_channels,
+    rust_server_configs and rust_economy_config. Loaded in bulk at cog_load;
+    commands that write any of those tables call invalidate().
+    """
+
+    def __init__(self):
+        self._configs: Dict[int, GuildConfig] = {}
+
+    async def load_all(self):
+        channels = await db.fetch_all("SELECT guild_id, channel_id, last_wipe_at, battlemetrics_server_id FROM rust_tracking_channels")
+        servers = await db.fetch_all("SELECT guild_id, battlemetrics_server_id FROM rust_server_configs WHERE battlemetrics_server_id IS NOT NULL")
+        economy = await self._fetch_economy("SELECT guild_id, manager_role_id FROM rust_economy_config")
+        self._configs = self._build(channels, servers, economy)
+        log.info(f"GuildConfigCache: Loaded config for {len(self._configs)} guilds")
+
+    async def _load_guild(self, guild_id: int) -> GuildConfig:
+        channels = await db.fetch_all("SELECT guild_id, channel_id, last_wipe_at, battlemetrics_server_id FROM rust_tracking_channels WHERE guild_id = %s", guild_id)
+        servers = await db.fetch_all("SELECT guild_id, battlemetrics_server_id FROM rust_server_configs WHERE guild_id = %s AND battlemetrics_server_id IS NOT NULL", guild_id)
+        economy = await self._fetch_economy("SELECT guild_id, manager_role_id FROM rust_economy_config WHERE guild_id = %s", guild_id)
+        config = self._build(channels, servers, economy).get(guild_id) or GuildConfig(guild_id)
+        self._configs[guild_id] = config
+        return config
+
+    @staticmethod
+    async def _fetch_economy(query: str, *params):
+        # rust_economy_config is created outside this cog and may not exist yet
+        try:
+            return await db.fetch_all(query, *params)
+        except Exception as e:
+            log.warning(f"GuildConfigCache: Could not read rust_economy_config: {e}")
+            return []
+
+    @staticmethod
+    def _build(channels, servers, economy) -> Dict[int, GuildConfig]:
+        configs: Dict[int, GuildConfig] = {}
+
+        for row in channels:
+            config = configs.setdefault(row["guild_id"], GuildConfig(row["guild_id"]))
+            config.channel_ids.append(row["channel_id"])
+            if row["last_wipe_at"] and not config.wipe_at:
+                config.wipe_at = _parse_wipe(row["last_wipe_at"])
+            if row["battlemetrics_server_id"] and not config.battlemetrics_server_id:
+                config.battlemetrics_server_id = row["battlemetrics_server_id"]
+
+        # /rust_config set_battlemetrics stores the id on the Rust+ config; use it when no channel has one
+        for row in servers:
+            config = configs.setdefault(row["guild_id"], GuildConfig(row["guild_id"]))
+            if not config.battlemetrics_server_id:
+                config.battlemetrics_server_id = row["battlemetrics_server_id"]
+
+        for row in economy:
+            config = configs.setdefault(row["guild_id"], GuildConfig(row["guild_id"]))
+            config.manager_role_id = row["manager_role_id"]
+
+        return configs
+
+    async def get(self, guild_id: int) -> GuildConfig:
+        config = self._configs.get(guild_id)
+        if config is None:
+            config = await self._load_guild(guild_id)
+        return config
+
+    async def invalidate(self, guild_id: int):
+        """Reload a guild after one of its config rows changed."""
+        await self._load_guild(guild_id)
+
+    def all(self) -> List[GuildConfig]:
+        return list(self._configs.values())
@@ -0,0 +1,221 @@
+import logging
+import os
+import struct
+import threading
+from array import array
+from typing import Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+log = logging.getLogger(__name__)
+
+HISTORY_DIR = os.path.join("cache", "rust_history")
+HISTORY_CAPACITY = 20_000 # Max samples kept in memory per guild (~500 KB once full)
+
+# On-disk record: timestamp (epoch s), marker id, marker type, x, y. Files are append-only and time-ordered.
+RECORD = struct.Struct("<dqBff")
+
+Sample = Tuple[float, int, int, float, float]
+
+# Appends and retention trims rewrite the same files from different worker threads
+_file_lock = threading.Lock()
+
+
+class MarkerHistory:
+    """
+    Bounded ring of marker position samples for one guild.
+
+    Columns live in typed arrays, so no per-sample Python objects are kept. The
+    arrays grow with use up to capacity and then wrap, so quiet guilds stay small.
+    Samples are appended in time order, which lets range queries binary-search
+    the ring instead of scanning it.
+    """
+
+    def __init__(self, capacity: int = HISTORY_CAPACITY):
+        self.capacity = capacity
+        self._t = array("d")
+        self._id = array("q")
+        self._type = array("B")
+        self._x = array("f")
+        self._y = array("f")
+        self._head = 0 # Next write slot
+        self.size = 0
+        self.unflushed = 0
+
+    def append(self, timestamp: float, marker_id: int, marker_type: int, x: float, y: float):
+        i = self._head
+        if i == len(self._t):
+            # Still growing towards capacity
+            self._t.append(timestamp)
+            self._id.append(marker_id)
+            self._type.append(marker_type)
+            self._x.append(x)
+            self._y.append(y)
+        else:
+            self._t[i] = timestamp
+            self._id[i] = marker_id
+            self._type[i] = marker_type
+            self._x[i] = x
+            self._y[i] = y
+        self._head = (i + 1) % self.capacity
+        self.size = min(self.size + 1, self.capacity)
+        self.unflushed = min(self.unflushed + 1, self.capacity)
+
+    def _slot(self, n: int) -> int:
+        """Ring slot of the n-th oldest sample."""
+        return (self._head - self.size + n) % self.capacity
+
+    def _bisect(self, timestamp: float) -> int:
+        lo, hi = 0, self.size
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._t[self._slot(mid)] < timestamp:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def _sample(self, n: int) -> Sample:
+        i = self._slot(n)
+        return self._t[i], self._id[i], self._type[i], self._x[i], self._y[i]
+
+    def range(self, start: float, end: float, types: Optional[FrozenSet[int]] = None, marker_id: Optional[int] = None) -> List[Sample]:
+        samples = []
+        for n in range(self._bisect(start), self._bisect(end)):
+            i = self._slot(n)
+            if types is not None and self._type[i] not in types:
+                continue
+            if marker_id is not None and self._id[i] != marker_id:
+                continue
+            samples.append(self._sample(n))
+        return samples
+
+    def path(self, marker_id: int) -> List[Tuple[float, float, float]]:
+        """(timestamp, x, y) for one marker, oldest first."""
+        return [(t, x, y) for t, _, _, x, y in self.range(0.0, float("inf"), marker_id=marker_id)]
+
+    def take_unflushed(self) -> bytes:
+        """Pack samples added since the last flush as on-disk records."""
+        if not self.unflushed:
+            return b""
+        buf = bytearray(RECORD.size * self.unflushed)
+        for k, n in enumerate(range(self.size - self.unflushed, self.size)):
+            RECORD.pack_into(buf, k * RECORD.size, *self._sample(n))
+        self.unflushed = 0
+        return bytes(buf)
+
+
+def heatmap(samples: Iterable[Sample], map_size: float, cells: int = 64) -> List[List[int]]:
+    """Bin samples into a cells x cells grid of counts; row 0 is the north edge."""
+    grid = [[0] * cells for _ in range(cells)]
+    scale = cells / map_size if map_size else 0
+    for _, _, _, x, y in samples:
+        col = min(cells - 1, max(0, int(x * scale)))
+        row = min(cells - 1, max(0, cells - 1 - int(y * scale)))
+        grid[row][col] += 1
+    return grid
+
+
+def history_path(guild_id: int, directory: str = HISTORY_DIR) -> str:
+    return os.path.join(directory, f"{guild_id}.bin")
+
+
+def append_records(path: str, data: bytes):
+    """Blocking; run in the thread pool."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with _file_lock:
+        with open(path, "ab") as f:
+            f.write(data)
+
+
+def _first_at_or_after(f, count: int, timestamp: float) -> int:
+    """Binary-search a time-ordered record file for the first record at or after timestamp."""
+    lo, hi = 0, count
+    while lo < hi:
+        mid = (lo + hi) // 2
+        f.seek(mid * RECORD.size)
+        if RECORD.unpack(f.read(RECORD.size))[0] < timestamp:
+            lo = mid + 1
+        else:
+            hi = mid
+    return lo
+
+
+def read_range(path: str, start: float, end: float) -> List[Sample]:
+    """Blocking; binary-searches the time-ordered record file for [start, end)."""
+    if not os.path.exists(path):
+        return []
+
+    with open(path, "rb") as f:
+        count = os.fstat(f.fileno()).st_size // RECORD.size
+        first = _first_at_or_after(f, count, start)
+        last = _first_at_or_after(f, count, end)
+        f.seek(first * RECORD.size)
+        data = f.read((last - first) * RECORD.size)
+    return list(RECORD.iter_unpack(data))
+
+
+def trim_records(path: str, before: float) -> int:
+    """Blocking; drop records older than before from one history file. Returns records removed."""
+    with _file_lock:
+        with open(path, "rb") as f:
+            count = os.fstat(f.fileno()).st_size // RECORD.size
+            first = _first_at_or_after(f, count, before)
+            if not first:
+                return 0
+            f.seek(first * RECORD.size)
+            data = f.read((count - first) * RECORD.size)
+        if not data:
+            os.remove(path)
+            return count
+        tmp = path + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+        return first
+
+
+def trim_history(directory: str, before: float) -> int:
+    """Blocking; trim every guild's history file. Returns records removed."""
+    if not os.path.isdir(directory):
+        return 0
+    removed = 0
+    for entry in os.listdir(directory):
+        if entry.endswith(".bin"):
+            try:
+                removed += trim_records(os.path.join(directory, entry), before)
+            except OSError as e:
+                log.error(f"Failed to trim marker history {entry}: {e}")
+    return removed
+
+
+class HistoryStore:
+    """Per-guild MarkerHistory rings plus their on-disk files."""
+
+    def __init__(self, capacity: int = HISTORY_CAPACITY, directory: str = HISTORY_DIR):
+        self.capacity = capacity
+        self.directory = directory
+        self._histories: Dict[int, MarkerHistory] = {}
+
+    def get(self, guild_id: int) -> MarkerHistory:
+        history = self._histories.get(guild_id)
+        if history is None:
+            history = self._histories[guild_id] = MarkerHistory(self.capacity)
+        return history
+
+    def record(self, guild_id: int, timestamp: float, markers: Iterable, skip_types: FrozenSet[int] = frozenset()):
+        history = self.get(guild_id)
+        for marker in markers:
+            m_type = getattr(marker, "type", 0)
+            if m_type not in skip_types:
+                history.append(timestamp, marker.id, m_type, marker.x, marker.y)
+
+    def pending(self) -> List[Tuple[str, bytes]]:
+        """Collect unflushed records per guild as (path, data) for append_records()."""
+        batches = []
+        for guild_id, history in self._histories.items():
+            data = history.take_unflushed()
+            if data:
+                batches.append((history_path(guild_id, self.directory), data))
+        return batches
+
+    def drop(self, guild_id: int):
+        self._histories.pop(guild_id, None)
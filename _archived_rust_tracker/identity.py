@@ -0,0 +1,225 @@
+import datetime
+import logging
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from xyz.jefferybeans.jeffbot.database import db
+
+from .search import NameIndex
+
+log = logging.getLogger(__name__)
+
+Sighting = Tuple[str, Optional[int], Optional[int]] # (name, steam_id, bm_id)
+
+CLAN_TAG = re.compile(r"\[.*?\]")
+PLAYER_PREFIX = re.compile(r"^player\s+", re.IGNORECASE)
+
+
+@lru_cache(maxsize=8192)
+def normalize_name(name: str) -> str:
+    """
+    Normalize a player name for consistent matching.
+    Removes clan tags [TAG] and 'Player ' prefix, trims whitespace, and converts to lowercase.
+    """
+    name = CLAN_TAG.sub("", name)
+    name = PLAYER_PREFIX.sub("", name.strip())
+    return name.strip().lower()
+
+
+@dataclass
+class PlayerIdentity:
+    player_id: int            # rust_players.id
+    guild_id: int
+    name: str                 # Current rust_players.name (display)
+    steam_id: Optional[int] = None
+    bm_id: Optional[int] = None # BattleMetrics player id
+
+
+class IdentityStore:
+    """
+    Stable player identity per guild.
+
+    A player is resolved by steam_id (team info), then BattleMetrics player id,
+    then any name they were seen under (rust_player_aliases). All lookups are O(1)
+    dict hits; the database is only written when a new id or alias is linked.
+    """
+
+    def __init__(self, normalize: Callable[[str], str]):
+        self.normalize = normalize
+        self._players: Dict[int, PlayerIdentity] = {}
+        self._by_steam: Dict[Tuple[int, int], int] = {}
+        self._by_bm: Dict[Tuple[int, int], int] = {}
+        self._by_alias: Dict[Tuple[int, str], int] = {}
+        self._names: Dict[int, NameIndex] = {} # guild_id -> every known name, for fuzzy lookups
+
+    async def load_all(self):
+        players = await db.fetch_all("SELECT id, guild_id, name, normalized_name, steam_id, bm_player_id FROM rust_players")
+        aliases = await db.fetch_all("SELECT guild_id, normalized_name, player_id FROM rust_player_aliases")
+        self._players.clear()
+        self._by_steam.clear()
+        self._by_bm.clear()
+        self._by_alias.clear()
+        self._names.clear()
+        self._index(players, aliases)
+        log.info(f"IdentityStore: Loaded {len(self._players)} players, {len(self._by_alias)} names")
+
+    async def load_guild(self, guild_id: int):
+        """Re-read one guild after bulk edits (merge, dedup)."""
+        for pid in [pid for pid, p in self._players.items() if p.guild_id == guild_id]:
+            self._forget(pid)
+        for key in [k for k in self._by_alias if k[0] == guild_id]:
+            del self._by_alias[key]
+        self._names.pop(guild_id, None)
+        players = await db.fetch_all("SELECT id, guild_id, name, normalized_name, steam_id, bm_player_id FROM rust_players WHERE guild_id = %s", guild_id)
+        aliases = await db.fetch_all("SELECT guild_id, normalized_name, player_id FROM rust_player_aliases WHERE guild_id = %s", guild_id)
+        self._index(players, aliases)
+
+    def _index(self, players, aliases):
+        for row in players:
+            identity = PlayerIdentity(row["id"], row["guild_id"], row["name"], row["steam_id"], row["bm_player_id"])
+            self._players[identity.player_id] = identity
+            if identity.steam_id:
+                self._by_steam[(identity.guild_id, identity.steam_id)] = identity.player_id
+            if identity.bm_id:
+                self._by_bm[(identity.guild_id, identity.bm_id)] = identity.player_id
+            self._link_name(identity.guild_id, row.get("normalized_name") or self.normalize(identity.name), identity.player_id)
+        for row in aliases:
+            if row["player_id"] in self._players:
+                self._link_name(row["guild_id"], row["normalized_name"], row["player_id"])
+                self._by_alias[(row["guild_id"], row["normalized_name"])] = row["player_id"] # The alias table wins
+
+    def _link_name(self, guild_id: int, key: str, player_id: int):
+        if (guild_id, key) not in self._by_alias:
+            self._by_alias[(guild_id, key)] = player_id
+            self._names.setdefault(guild_id, NameIndex()).add(key)
+
+    def _forget(self, player_id: int):
+        identity = self._players.pop(player_id, None)
+        if identity:
+            self._by_steam.pop((identity.guild_id, identity.steam_id), None)
+            self._by_bm.pop((identity.guild_id, identity.bm_id), None)
+
+    def get(self, player_id: int) -> Optional[PlayerIdentity]:
+        return self._players.get(player_id)
+
+    def resolve(self, guild_id: int, name: Optional[str] = None, steam_id: Optional[int] = None, bm_id: Optional[int] = None) -> Optional[PlayerIdentity]:
+        pid = None
+        if steam_id:
+            pid = self._by_steam.get((guild_id, steam_id))
+        if pid is None and bm_id:
+            pid = self._by_bm.get((guild_id, bm_id))
+        if pid is None and name:
+            pid = self._by_alias.get((guild_id, self.normalize(name)))
+        return self._players.get(pid) if pid is not None else None
+
+    def search(self, guild_id: int, term: str) -> Optional[PlayerIdentity]:
+        """Best fuzzy (substring, then trigram) match of term against every name seen in the guild."""
+        index = self._names.get(guild_id)
+        if not index:
+            return None
+        for key in index.search(self.normalize(term) or term, limit=5):
+            identity = self._players.get(self._by_alias.get((guild_id, key)))
+            if identity:
+                return identity
+        return None
+
+    async def observe(self, guild_id: int, name: str, steam_id: Optional[int] = None, bm_id: Optional[int] = None, timestamp: Optional[datetime.datetime] = None) -> Optional[PlayerIdentity]:
+        """Resolve a sighting and link any ids or name not yet known for that player."""
+        return (await self.observe_many(guild_id, [(name, steam_id, bm_id)], timestamp))[0]
+
+    async def observe_many(self, guild_id: int, sightings: Iterable[Sighting], timestamp: Optional[datetime.datetime] = None) -> List[Optional[PlayerIdentity]]:
+        """
+        Resolve (name, steam_id, bm_id) sightings in memory, then write every newly
+        linked id and name with one statement per table.
+        """
+        results: List[Optional[PlayerIdentity]] = []
+        id_links: Dict[int, PlayerIdentity] = {}
+        new_aliases: Dict[str, Tuple[PlayerIdentity, str]] = {} # normalized name -> (identity, name as seen)
+        for name, steam_id, bm_id in sightings:
+            identity = self.resolve(guild_id, name, steam_id, bm_id)
+            results.append(identity)
+            if identity is None:
+                continue
+
+            if steam_id and not identity.steam_id and (guild_id, steam_id) not in self._by_steam:
+                identity.steam_id = steam_id
+                self._by_steam[(guild_id, steam_id)] = identity.player_id
+                id_links[identity.player_id] = identity
+            if bm_id and not identity.bm_id and (guild_id, bm_id) not in self._by_bm:
+                identity.bm_id = bm_id
+                self._by_bm[(guild_id, bm_id)] = identity.player_id
+                id_links[identity.player_id] = identity
+
+            # A name already mapped (to this player or someone else) is left alone; ids decide
+            key = self.normalize(name) if name else ""
+            if key and (guild_id, key) not in self._by_alias:
+                new_aliases.setdefault(key, (identity, name))
+
+        if id_links:
+            ids = list(id_links)
+            cases = " ".join(["WHEN %s THEN %s"] * len(ids))
+            placeholders = ", ".join(["%s"] * len(ids))
+            params = []
+            for column in ("steam_id", "bm_id"):
+                for pid in ids:
+                    params.extend([pid, getattr(id_links[pid], column)])
+            await db.execute(f"""
+                UPDATE rust_players
+                SET steam_id = COALESCE(steam_id, CASE id {cases} END),
+                    bm_player_id = COALESCE(bm_player_id, CASE id {cases} END)
+                WHERE id IN ({placeholders})
+            """, *params, *ids)
+
+        if new_aliases:
+            seen_at = timestamp or datetime.datetime.now(datetime.timezone.utc)
+            values = ", ".join(["(%s, %s, %s, %s, %s)"] * len(new_aliases))
+            params = []
+            for key, (identity, name) in new_aliases.items():
+                params.extend([guild_id, key, identity.player_id, name[:100], seen_at])
+            await db.execute(f"""
+                INSERT INTO rust_player_aliases (guild_id, normalized_name, player_id, name, first_seen)
+                VALUES {values}
+                ON DUPLICATE KEY UPDATE player_id = player_id
+            """, *params)
+            for key, (identity, _) in new_aliases.items():
+                self._link_name(guild_id, key, identity.player_id)
+
+        return results
+
+    async def register(self, guild_id: int, player_id: int, name: str, steam_id: Optional[int] = None, bm_id: Optional[int] = None):
+        """Index a player row that was just created under this name."""
+        identity = PlayerIdentity(player_id, guild_id, name)
+        self._players[player_id] = identity
+        self._link_name(guild_id, self.normalize(name), player_id)
+        if steam_id or bm_id:
+            await self.observe(guild_id, name, steam_id, bm_id)
+
+    async def merge(self, source_id: int, target_id: int):
+        """Move the source player's aliases and ids to the target before the source row is deleted."""
+        source, target = self._players.get(source_id), self._players.get(target_id)
+        if not source or not target:
+            return
+        # Persist every name the source resolves by (its own name is only on its rust_players row,
+        # which is about to be deleted) before re-pointing the in-memory maps
+        keys = {self.normalize(source.name)} | {key for (gid, key), pid in self._by_alias.items() if pid == source_id}
+        keys.discard("")
+        if keys:
+            now = datetime.datetime.now(datetime.timezone.utc)
+            placeholders = ", ".join(["(%s, %s, %s, %s, %s)"] * len(keys))
+            params = []
+            for key in keys:
+                params.extend([target.guild_id, key, target_id, key[:100], now])
+            await db.execute(f"""
+                INSERT INTO rust_player_aliases (guild_id, normalized_name, player_id, name, first_seen)
+                VALUES {placeholders}
+                ON DUPLICATE KEY UPDATE player_id = VALUES(player_id)
+            """, *params)
+        await db.execute("UPDATE rust_player_aliases SET player_id = %s WHERE player_id = %s", target_id, source_id)
+
+        for key in keys:
+            self._link_name(target.guild_id, key, target_id)
+            self._by_alias[(target.guild_id, key)] = target_id
+        self._forget(source_id)
+        await self.observe(target.guild_id, target.name, source.steam_id, source.bm_id)
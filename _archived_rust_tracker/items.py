@@ -0,0 +1,41 @@
+import functools
+import json
+import logging
+import os
+from typing import Dict
+
+from .search import NameIndex
+
+log = logging.getLogger(__name__)
+
+# Rust item id -> name table, e.g. rustplusplus' src/staticFiles/items.json ({"<id>": {"name": ...}})
+ITEMS_PATH = os.environ.get("RUST_TRACKER_ITEMS_JSON", os.path.join("data", "rust_items.json"))
+
+
+@functools.lru_cache(maxsize=1)
+def _load_items(path: str) -> Dict[int, str]:
+    try:
+        with open(path, encoding="utf-8") as f:
+            raw = json.load(f)
+    except (OSError, ValueError) as e:
+        log.warning(f"Rust items: Could not load item names from {path}: {e}")
+        return {}
+    return {int(item_id): entry["name"] for item_id, entry in raw.items() if entry.get("name")}
+
+
+def item_name(item_id: int, is_blueprint: bool = False) -> str:
+    name = _load_items(ITEMS_PATH).get(item_id) or f"Item {item_id}"
+    return f"{name} (BP)" if is_blueprint else name
+
+
+@functools.lru_cache(maxsize=1)
+def _build_index(path: str) -> NameIndex:
+    index = NameIndex()
+    for name in _load_items(path).values():
+        index.add(name)
+    return index
+
+
+def item_index() -> NameIndex:
+    """Every known item name, for resolving user input."""
+    return _build_index(ITEMS_PATH)
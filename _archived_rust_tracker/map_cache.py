@@ -0,0 +1,136 @@
+import asyncio
+import io
+import logging
+import os
+import time
+from collections import OrderedDict
+from typing import Dict, List, Tuple
+
+from PIL import Image, ImageDraw
+
+from .ratelimit import PRIORITY_COMMAND
+from .executor import OffloadPool
+
+log = logging.getLogger(__name__)
+
+MAP_CACHE_DIR = os.path.join("cache", "rust_maps")
+MAX_BASE_IN_MEMORY = 4   # Base maps are large RGBA images; keep only a few resident
+OUTPUT_TTL = 30.0        # Seconds a rendered /rust_map image is reused
+
+# Overlay style per Rust+ marker type: (fill colour, radius in px)
+MARKER_STYLES = {
+    2: ((255, 80, 0, 255), 14),     # Explosion
+    3: ((60, 200, 60, 255), 6),     # Vending machine
+    4: ((255, 200, 0, 255), 12),    # CH47
+    5: ((40, 120, 255, 255), 16),   # Cargo ship
+    6: ((200, 0, 200, 255), 10),    # Locked crate
+    8: ((255, 40, 40, 255), 12),    # Patrol helicopter
+    9: ((0, 200, 200, 255), 10),    # Travelling vendor
+}
+OUT_OF_STOCK_COLOUR = (150, 150, 150, 255)
+
+
+def _map_key(info) -> Tuple[int, int]:
+    """(seed, size) identifies a map; it only changes on wipe."""
+    size = getattr(info, "size", None) or getattr(info, "map_size", None)
+    return int(info.seed), int(size)
+
+
+class MapRenderer:
+    """
+    Layered /rust_map renderer.
+
+    The base layer (terrain + monuments) is fetched once per (seed, size) and cached
+    in memory and on disk. Event and vending overlays are drawn from the latest marker
+    snapshot, and all PIL work runs in the thread pool. Finished PNGs are reused for
+    OUTPUT_TTL seconds.
+    """
+
+    def __init__(self, pool: OffloadPool, cache_dir: str = MAP_CACHE_DIR, output_ttl: float = OUTPUT_TTL):
+        self.pool = pool
+        self.cache_dir = cache_dir
+        self.output_ttl = output_ttl
+
+        self._bases: "OrderedDict[Tuple[int, int], Image.Image]" = OrderedDict()
+        self._outputs: Dict[int, Tuple[Tuple[int, int], float, bytes]] = {} # guild_id -> (map key, rendered_at, png)
+        self._locks: Dict[int, asyncio.Lock] = {}
+
+    async def render(self, monitor) -> bytes:
+        lock = self._locks.setdefault(monitor.guild_id, asyncio.Lock())
+        async with lock:
+            info = (await monitor.get_snapshot("server_info")).data
+            key = _map_key(info)
+
+            cached = self._outputs.get(monitor.guild_id)
+            if cached and cached[0] == key and time.monotonic() - cached[1] < self.output_ttl:
+                return cached[2]
+
+            base = await self._get_base(monitor, key)
+            markers = (await monitor.get_snapshot("markers")).data
+
+            png = await self._run_off_loop(self._compose, base, markers, key[1])
+            self._outputs[monitor.guild_id] = (key, time.monotonic(), png)
+            return png
+
+    def invalidate(self, guild_id: int):
+        self._outputs.pop(guild_id, None)
+
+    async def _run_off_loop(self, func, *args):
+        return await self.pool.run(func, *args, label="map_render")
+
+    async def _get_base(self, monitor, key: Tuple[int, int]) -> Image.Image:
+        base = self._bases.get(key)
+        if base is not None:
+            self._bases.move_to_end(key)
+            return base
+
+        path = os.path.join(self.cache_dir, f"{key[0]}_{key[1]}.png")
+        if os.path.exists(path):
+            base = await self._run_off_loop(self._load, path)
+        else:
+            log.info(f"MapRenderer: Fetching base map for seed {key[0]} size {key[1]}")
+            base = await monitor.request("get_map", add_icons=True, add_events=False, add_vending_machines=False, priority=PRIORITY_COMMAND)
+            base = base.convert("RGBA")
+            await self._run_off_loop(self._save, base, path)
+
+        self._bases[key] = base
+        while len(self._bases) > MAX_BASE_IN_MEMORY:
+            self._bases.popitem(last=False)
+        return base
+
+    @staticmethod
+    def _load(path: str) -> Image.Image:
+        with Image.open(path) as img:
+            return img.convert("RGBA")
+
+    @staticmethod
+    def _save(img: Image.Image, path: str):
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            img.save(path, "PNG")
+        except OSError as e:
+            log.warning(f"MapRenderer: Could not write base map cache {path}: {e}")
+
+    @staticmethod
+    def _compose(base: Image.Image, markers: List, map_size: int) -> bytes:
+        img = base.copy()
+        draw = ImageDraw.Draw(img)
+        scale_x = img.width / map_size
+        scale_y = img.height / map_size
+
+        for marker in markers:
+            style = MARKER_STYLES.get(getattr(marker, "type", None))
+            if not style:
+                continue
+            colour, radius = style
+            if getattr(marker, "out_of_stock", False):
+                colour = OUT_OF_STOCK_COLOUR
+
+            # World y grows north, image y grows down
+            px = marker.x * scale_x
+            py = img.height - marker.y * scale_y
+            draw.ellipse((px - radius, py - radius, px + radius, py + radius), fill=colour, outline=(0, 0, 0, 255), width=2)
+
+        with io.BytesIO() as out:
+            img.save(out, "PNG")
+            return out.getvalue()
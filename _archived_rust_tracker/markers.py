@@ -0,0 +1,122 @@
+import datetime
+import enum
+from dataclasses import dataclass
+from typing import Any, Dict, FrozenSet, List, Optional
+
+from .changes import MarkerDelta
+
+
+class MarkerType(enum.IntEnum):
+    """AppMarkerType values as sent by Rust+ on marker.type."""
+    UNDEFINED = 0
+    PLAYER = 1
+    EXPLOSION = 2
+    VENDING_MACHINE = 3
+    CH47 = 4
+    CARGO_SHIP = 5
+    CRATE = 6
+    GENERIC_RADIUS = 7
+    PATROL_HELICOPTER = 8
+    TRAVELLING_VENDOR = 9
+
+    @classmethod
+    def of(cls, marker: Any) -> "MarkerType":
+        try:
+            return cls(getattr(marker, "type", 0))
+        except ValueError:
+            return cls.UNDEFINED
+
+
+# Map events worth tracking; vending machines and players are handled elsewhere
+EVENT_TYPES: FrozenSet[MarkerType] = frozenset({
+    MarkerType.EXPLOSION,
+    MarkerType.CH47,
+    MarkerType.CARGO_SHIP,
+    MarkerType.CRATE,
+    MarkerType.PATROL_HELICOPTER,
+    MarkerType.TRAVELLING_VENDOR,
+})
+
+# Event kinds
+SPAWN = "spawn"
+DESPAWN = "despawn"
+MOVED = "moved"
+
+
+@dataclass
+class TrackedMarker:
+    marker_id: int
+    type: MarkerType
+    first_seen: datetime.datetime
+    last_seen: datetime.datetime
+    x: float
+    y: float
+    vx: float = 0.0 # Map units per second, from the last two observed positions
+    vy: float = 0.0
+    partial: bool = False # Already out when tracking started; first_seen is not the real spawn time
+
+    @property
+    def lifetime(self) -> datetime.timedelta:
+        return self.last_seen - self.first_seen
+
+
+@dataclass
+class MarkerEvent:
+    kind: str
+    marker: TrackedMarker
+
+
+class MarkerTracker:
+    """
+    Per-guild state for map event markers, keyed by marker id.
+
+    apply() consumes the MarkerDelta produced by SnapshotDiffer, so the work per
+    poll is proportional to the number of changed markers, not the map size.
+    """
+
+    def __init__(self, types: FrozenSet[MarkerType] = EVENT_TYPES):
+        self.types = types
+        self.markers: Dict[int, TrackedMarker] = {}
+
+    def apply(self, delta: MarkerDelta, timestamp: datetime.datetime) -> List[MarkerEvent]:
+        events: List[MarkerEvent] = []
+
+        if delta.initial:
+            # Markers that were already out: seed state without announcing them
+            self.markers.clear()
+            for marker in delta.markers:
+                m_type = MarkerType.of(marker)
+                if m_type in self.types:
+                    self.markers[marker.id] = TrackedMarker(marker.id, m_type, timestamp, timestamp, marker.x, marker.y, partial=True)
+            return events
+
+        for marker in delta.removed:
+            tracked = self.markers.pop(marker.id, None)
+            if tracked:
+                tracked.last_seen = timestamp
+                events.append(MarkerEvent(DESPAWN, tracked))
+
+        for marker in delta.added:
+            m_type = MarkerType.of(marker)
+            if m_type not in self.types:
+                continue
+            tracked = TrackedMarker(marker.id, m_type, timestamp, timestamp, marker.x, marker.y)
+            self.markers[marker.id] = tracked
+            events.append(MarkerEvent(SPAWN, tracked))
+
+        for marker in delta.moved:
+            tracked = self.markers.get(marker.id)
+            if not tracked:
+                continue
+            elapsed = (timestamp - tracked.last_seen).total_seconds()
+            if elapsed > 0:
+                tracked.vx = (marker.x - tracked.x) / elapsed
+                tracked.vy = (marker.y - tracked.y) / elapsed
+            tracked.x, tracked.y = marker.x, marker.y
+            tracked.last_seen = timestamp
+            events.append(MarkerEvent(MOVED, tracked))
+
+        return events
+
+    def active(self, m_type: Optional[MarkerType] = None) -> List[TrackedMarker]:
+        return [m for m in self.markers.values() if m_type is None or m.type == m_type]
@@ -0,0 +1,45 @@
+from collections import defaultdict, deque
+from typing import Deque, Dict, Optional
+
+
+class LatencyTracker:
+    """Rolling latency samples per key (e.g. Rust+ endpoint), with percentile lookups."""
+
+    def __init__(self, window: int = 256):
+        self.window = window
+        self._samples: Dict[str, Deque[float]] = defaultdict(lambda: deque(maxlen=self.window))
+        self.errors: Dict[str, int] = defaultdict(int)
+        self.timeouts: Dict[str, int] = defaultdict(int)
+
+    def record(self, key: str, seconds: float):
+        self._samples[key].append(seconds)
+
+    def record_error(self, key: str, timed_out: bool = False):
+        if timed_out:
+            self.timeouts[key] += 1
+        else:
+            self.errors[key] += 1
+
+    def percentile(self, key: str, pct: float) -> Optional[float]:
+        samples = self._samples.get(key)
+        if not samples:
+            return None
+        ordered = sorted(samples)
+        index = min(len(ordered) - 1, int(round(pct / 100.0 * (len(ordered) - 1))))
+        return ordered[index]
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """key -> {p50, p95, max, count, errors, timeouts}"""
+        out = {}
+        for key, samples in self._samples.items():
+            if not samples:
+                continue
+            out[key] = {
+                "p50": self.percentile(key, 50),
+                "p95": self.percentile(key, 95),
+                "max": max(samples),
+                "count": len(samples),
+                "errors": self.errors.get(key, 0),
+                "timeouts": self.timeouts.get(key, 0),
+            }
+        return out
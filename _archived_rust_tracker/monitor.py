@@ -1,11 +1,52 @@
 import asyncio
 import logging
+import random
 import time
 from typing import Optional, List, Callable, Dict, Any
 from rustplus import RustSocket, EntityEvent, TeamEvent, ChatEvent, ServerDetails
 
+from .scheduler import PollScheduler
+from .metrics import LatencyTracker
+from .changes import SnapshotDiffer
+from .events import GuildEventQueue
+from .ratelimit import ConnectLimiter, PriorityRateLimiter, PRIORITY_BACKGROUND, PRIORITY_COMMAND
+from .snapshots import Snapshot, SnapshotCache
+
 log = logging.getLogger(__name__)
 
+# Polled endpoint -> RustSocket request method
+POLL_REQUESTS = {
+    "markers": "get_markers",
+    "time": "get_time",
+    "server_info": "get_info",
+}
+
+# Cached endpoint -> RustSocket request method
+SNAPSHOT_REQUESTS = dict(POLL_REQUESTS, team_info="get_team_info")
+
+# Rust+ per-connection budget: the server refills ~3 tokens/s up to 25.
+# Keep a little headroom so we never trip the server-side limiter.
+REQUEST_RATE = 2.5
+REQUEST_BURST = 20
+REQUEST_COSTS = {
+    "get_map": 5,
+    "send_team_message": 2,
+}
+
+# Reconnect backoff (seconds). Delays are drawn uniformly from [0, min(cap, base * 2^attempt)].
+BACKOFF_BASE = 5
+BACKOFF_CAP = 60
+
+# Seconds a handshake may hold a shared ConnectLimiter slot before it counts as a failed attempt
+CONNECT_TIMEOUT = 20
+
+# Per-request deadline in seconds. A request past its deadline is cancelled.
+POLL_TIMEOUTS = {
+    "markers": 8.0,
+    "time": 5.0,
+    "server_info": 5.0,
+}
+
 class RustMonitor:
     def __init__(self, 
                  guild_id: int,
@@ -13,18 +54,30 @@ class RustMonitor:
                  port: int, 
                  player_id: int, 
                  player_token: int,
-                 event_callback: Callable):
+                 event_callback: Callable,
+                 scheduler: PollScheduler,
+                 connect_limiter: ConnectLimiter,
+                 event_policies: Optional[Dict[str, str]] = None,
+                 queue_size: int = 256):
         self.guild_id = guild_id
         self.server_ip = server_ip
         self.port = port
         self.player_id = player_id
         self.player_token = player_token
         self.event_callback = event_callback # async func(event_type, data)
+        # Events are delivered through a bounded queue so slow handlers never block the socket reader
+        self.events = GuildEventQueue(guild_id, event_callback, maxsize=queue_size, policies=event_policies)
+        self.scheduler = scheduler # Shared fleet-wide poller, calls self.poll()
+        self.connect_limiter = connect_limiter # Shared fleet-wide connection gate
         
         self.socket: Optional[RustSocket] = None
         self._is_running = False
         self._reconnect_task = None
-        self._polling_task = None
+        
+        self.latency = LatencyTracker() # Per-endpoint request latency
+        self.limiter = PriorityRateLimiter(REQUEST_RATE, REQUEST_BURST) # Shared by polling, commands and chat replies
+        self.snapshots = SnapshotCache(self._fetch_snapshot) # Last-known server_info / time / team_info
+        self.differ = SnapshotDiffer() # Turns polled snapshots into delta events
         
     async def start(self):
         if self._is_running:
@@ -55,17 +108,19 @@ class RustMonitor:
         async def on_entity_event(event: EntityEvent):
              await self._handle_entity_event(event)
             
+        # Event delivery
+        self.events.start()
         # Connection Loop
         self._reconnect_task = asyncio.create_task(self._connection_loop())
-        # Polling Loop
-        self._polling_task = asyncio.create_task(self._polling_loop())
+        # Polling is driven by the shared scheduler
+        self.scheduler.register(self)
 
     async def stop(self):
         self._is_running = False
+        self.scheduler.unregister(self)
         if self._reconnect_task:
             self._reconnect_task.cancel()
-        if self._polling_task:
-            self._polling_task.cancel()
+        await self.events.stop()
         
         if self.socket:
             try:
@@ -75,12 +130,14 @@ class RustMonitor:
         log.info(f"RustMonitor: Stopped for guild {self.guild_id}")
 
     async def _connection_loop(self):
-        backoff = 5
+        attempt = 0
         while self._is_running:
             try:
                 log.info(f"RustMonitor: Connecting to {self.server_ip}:{self.port}...")
-                await self.socket.connect()
+                async with self.connect_limiter:
+                    await asyncio.wait_for(self.socket.connect(), CONNECT_TIMEOUT)
                 log.info(f"RustMonitor: Connected! Guild {self.guild_id}")
+                attempt = 0
                 
                 # Fetch initial team info
                 await self._fetch_initial_state()
@@ -92,54 +149,94 @@ class RustMonitor:
                 except Exception as hang_error:
                     log.warning(f"RustMonitor: Connection hang interrupted: {hang_error}")
                     
-                log.warning(f"RustMonitor: Disconnected from {self.server_ip}. Reconnecting in {backoff}s...")
+                log.warning(f"RustMonitor: Disconnected from {self.server_ip}. Reconnecting...")
                 
+            except asyncio.TimeoutError:
+                log.error(f"RustMonitor: Connect to {self.server_ip}:{self.port} timed out after {CONNECT_TIMEOUT}s for guild {self.guild_id}")
+                try:
+                    await self.socket.disconnect() # Drop the half-open handshake before retrying
+                except Exception:
+                    pass
             except Exception as e:
                 log.error(f"RustMonitor: Connection error for guild {self.guild_id}: {e}")
             
-            # Backoff
+            # Full-jitter backoff so monitors dropped by the same restart spread out
             if self._is_running:
-                await asyncio.sleep(backoff)
-                backoff = min(backoff * 2, 60) # Cap at 60s
+                delay = random.uniform(0, min(BACKOFF_CAP, BACKOFF_BASE * 2 ** attempt))
+                attempt = min(attempt + 1, 10)
+                await asyncio.sleep(delay)
 
-    async def _polling_loop(self):
-        """Poll for map markers, time, and population."""
-        while self._is_running:
-            if self.socket and self.socket.ws and not self.socket.ws.closed:
-                try:
-                    # 1. Markers (Cargo, Heli, etc.)
-                    markers = await self.socket.get_markers()
-                    await self.event_callback("markers", markers)
-                    
-                    # 2. Time
-                    time_data = await self.socket.get_time()
-                    await self.event_callback("time", time_data)
-                    
-                    # 3. Pop (get_info)
-                    info = await self.socket.get_info()
-                    await self.event_callback("server_info", info)
-
-                except Exception as e:
-                    # Don't log spam if disconnected, but log real errors
-                    if "Connection closed" not in str(e):
-                        log.debug(f"RustMonitor: Polling error: {e}")
-            
-            await asyncio.sleep(10) # Poll every 10s
+    @property
+    def is_connected(self) -> bool:
+        return bool(self.socket and self.socket.ws and not self.socket.ws.closed)
+
+    async def request(self, method: str, *args, priority: int = PRIORITY_BACKGROUND, **kwargs):
+        """
+        Issue a RustSocket request through this connection's rate limiter.
+        Waits in line (by priority) when the budget is spent instead of failing.
+        """
+        await self.limiter.acquire(priority, REQUEST_COSTS.get(method, 1))
+        return await getattr(self.socket, method)(*args, **kwargs)
+
+    async def get_snapshot(self, endpoint: str, priority: int = PRIORITY_COMMAND) -> Snapshot:
+        """Last-known data for "server_info", "time" or "team_info"; refreshed in the background when stale."""
+        return await self.snapshots.get(endpoint, priority)
+
+    async def _fetch_snapshot(self, endpoint: str, priority: int):
+        return await self.request(SNAPSHOT_REQUESTS[endpoint], priority=priority)
+
+    async def poll(self, endpoints: List[str]):
+        """
+        Poll the given endpoints ("markers", "time", "server_info"). Called by PollScheduler.
+        Requests run concurrently; each result is diffed against the previous snapshot and
+        the resulting delta events ("marker_delta", "pop_changed", "server_info", "time")
+        are dispatched as soon as they arrive. Polls where nothing changed dispatch nothing.
+        """
+        if not self._is_running or not self.is_connected:
+            return
+
+        await asyncio.gather(*(self._poll_endpoint(e) for e in endpoints))
+
+    async def _poll_endpoint(self, endpoint: str):
+        started = time.monotonic()
+        try:
+            # The deadline covers time spent queued behind higher-priority requests too
+            data = await asyncio.wait_for(self.request(POLL_REQUESTS[endpoint]), timeout=POLL_TIMEOUTS[endpoint])
+        except asyncio.TimeoutError:
+            self.latency.record_error(endpoint, timed_out=True)
+            log.debug(f"RustMonitor: {endpoint} poll timed out for guild {self.guild_id}")
+            return
+        except Exception as e:
+            self.latency.record_error(endpoint)
+            # Don't log spam if disconnected, but log real errors
+            if "Connection closed" not in str(e):
+                log.debug(f"RustMonitor: Polling error ({endpoint}): {e}")
+            return
+
+        self.latency.record(endpoint, time.monotonic() - started)
+        self.snapshots.store(endpoint, data)
+
+        for event_type, payload in self.differ.diff(endpoint, data):
+            self.events.put(event_type, payload)
 
     async def _fetch_initial_state(self):
         try:
             # Get Team Info
-            team_info = await self.socket.get_team_info()
+            team_info = await self.request("get_team_info")
+            self.snapshots.store("team_info", team_info)
             # Dispatch "Initial Team" event
-            await self.event_callback("team_info", team_info)
+            self.events.put("team_info", team_info)
         except Exception as e:
             log.error(f"RustMonitor: Failed to fetch initial team info: {e}")
 
     async def _handle_team_event(self, event: TeamEvent):
-        await self.event_callback("team_event", event)
+        # Team events carry the full team state
+        if getattr(event, "team_info", None) is not None:
+            self.snapshots.store("team_info", event.team_info)
+        self.events.put("team_event", event)
 
     async def _handle_chat_event(self, event: ChatEvent):
-        await self.event_callback("chat_event", event)
+        self.events.put("chat_event", event)
         
     async def _handle_entity_event(self, event: EntityEvent):
-        await self.event_callback("entity_event", event)
+        self.events.put("entity_event", event)
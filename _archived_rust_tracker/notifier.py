@@ -0,0 +1,147 @@
+import asyncio
+import itertools
+import logging
+from collections import defaultdict
+from typing import Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+from .ratelimit import TokenBucket
+
+log = logging.getLogger(__name__)
+
+# Notification priorities, lowest value is sent first
+PRIORITY_ALARM = 0
+PRIORITY_EVENT = 1
+PRIORITY_SWITCH = 2
+PRIORITY_INFO = 3
+
+COALESCE_WINDOW = 2.0 # After a message is sent, seconds to collect follow-ups into one message
+
+# Discord allows roughly 5 messages per 5 seconds per channel
+CHANNEL_RATE = 1.0
+CHANNEL_BURST = 5
+
+# coalesce_key -> template for 2+ items. {count} and {items} are filled in.
+COALESCE_FORMATS = {
+    "alarm": "🚨 **{count} SMART ALARMS TRIGGERED**: {items}!",
+    "alarm_clear": "✅ {count} Smart Alarms Cleared: {items}",
+    "spawn": "{items} have spawned!",
+    "switch": "🔌 {count} switches changed: {items}",
+}
+
+
+class _ChannelSender:
+    """Per-channel priority queue drained by one task under the channel's rate limit."""
+
+    def __init__(self, channel_id: int, get_channel: Callable):
+        self.channel_id = channel_id
+        self._get_channel = get_channel
+        self._queue: asyncio.PriorityQueue = asyncio.PriorityQueue()
+        self._bucket = TokenBucket(CHANNEL_RATE, CHANNEL_BURST)
+        self._seq = itertools.count()
+        self.sent = 0
+        self._task = asyncio.create_task(self._run())
+
+    def put(self, priority: int, message: str):
+        self._queue.put_nowait((priority, next(self._seq), message))
+
+    @property
+    def depth(self) -> int:
+        return self._queue.qsize()
+
+    def cancel(self):
+        self._task.cancel()
+
+    async def _run(self):
+        while True:
+            _, _, message = await self._queue.get()
+            channel = self._get_channel(self.channel_id)
+            if not channel:
+                continue
+            await self._bucket.acquire()
+            try:
+                await channel.send(message)
+                self.sent += 1
+            except Exception as e:
+                log.error(f"Failed to send Rust notification: {e}")
+
+
+class NotificationPipeline:
+    """
+    Outbound Discord notifications for the tracker.
+
+    Messages are fanned out to each tracking channel's own sender, so channels are
+    served concurrently and each respects its own rate limit. Within a channel,
+    higher-priority messages (alarms) jump ahead of queued lower-priority ones.
+    The first message for a coalesce_key goes out immediately; others with the same
+    key arriving within COALESCE_WINDOW after it are merged into one follow-up.
+    """
+
+    def __init__(self, get_channel_ids: Callable[[int], Awaitable[List[int]]], get_channel: Callable, window: float = COALESCE_WINDOW):
+        self._get_channel_ids = get_channel_ids
+        self._get_channel = get_channel
+        self.window = window
+
+        self._senders: Dict[int, _ChannelSender] = {}
+        self._buffers: Dict[Tuple[int, str], List[Tuple[int, str, str]]] = {} # (guild_id, key) -> [(priority, message, item)] within the open window
+        self.coalesced: Dict[str, int] = defaultdict(int)
+        self._flushes: Set[asyncio.Task] = set() # Open coalescing windows, kept referenced until flushed
+
+    async def notify(self, guild_id: int, message: str, priority: int = PRIORITY_INFO, coalesce_key: Optional[str] = None, item: Optional[str] = None):
+        if coalesce_key is None:
+            await self._fan_out(guild_id, priority, message)
+            return
+
+        key = (guild_id, coalesce_key)
+        buffer = self._buffers.get(key)
+        if buffer is None:
+            # Leading edge: send now, and open a window for whatever follows
+            self._buffers[key] = []
+            task = asyncio.create_task(self._flush_later(key))
+            self._flushes.add(task)
+            task.add_done_callback(self._flushes.discard)
+            await self._fan_out(guild_id, priority, message)
+        else:
+            buffer.append((priority, message, item or message))
+
+    async def _flush_later(self, key: Tuple[int, str]):
+        await asyncio.sleep(self.window)
+        entries = self._buffers.pop(key, [])
+        if not entries:
+            return
+
+        guild_id, coalesce_key = key
+        priority = min(p for p, _, _ in entries)
+        if len(entries) == 1:
+            message = entries[0][1]
+        else:
+            self.coalesced[coalesce_key] += len(entries) - 1
+            template = COALESCE_FORMATS.get(coalesce_key, "{items}")
+            message = template.format(count=len(entries), items=", ".join(item for _, _, item in entries))
+        try:
+            await self._fan_out(guild_id, priority, message[:2000])
+        except Exception as e:
+            log.error(f"NotificationPipeline: Failed to flush {coalesce_key} for guild {guild_id}: {e}")
+
+    async def _fan_out(self, guild_id: int, priority: int, message: str):
+        for channel_id in await self._get_channel_ids(guild_id):
+            sender = self._senders.get(channel_id)
+            if sender is None:
+                sender = _ChannelSender(channel_id, self._get_channel)
+                self._senders[channel_id] = sender
+            sender.put(priority, message)
+
+    @property
+    def sent(self) -> int:
+        """Messages actually delivered to Discord."""
+        return sum(s.sent for s in self._senders.values())
+
+    def queued(self) -> int:
+        return sum(s.depth for s in self._senders.values())
+
+    def close(self):
+        for task in list(self._flushes):
+            task.cancel()
+        self._flushes.clear()
+        for sender in self._senders.values():
+            sender.cancel()
+        self._senders.clear()
@@ -0,0 +1,114 @@
+import asyncio
+import heapq
+import itertools
+import time
+from typing import Optional
+
+
+class TokenBucket:
+    """Classic token bucket. acquire() waits until a token is available instead of failing."""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate          # Tokens added per second
+        self.capacity = capacity  # Maximum burst
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def try_acquire(self, tokens: float = 1.0) -> bool:
+        self._refill()
+        if self._tokens >= tokens:
+            self._tokens -= tokens
+            return True
+        return False
+
+    def time_until(self, tokens: float = 1.0) -> float:
+        """Seconds until `tokens` will be available."""
+        self._refill()
+        if self._tokens >= tokens:
+            return 0.0
+        return (tokens - self._tokens) / self.rate
+
+    async def acquire(self, tokens: float = 1.0):
+        async with self._lock:
+            while not self.try_acquire(tokens):
+                await asyncio.sleep(self.time_until(tokens))
+
+
+class ConnectLimiter:
+    """
+    Fleet-wide gate for Rust+ connection attempts, shared by every RustMonitor.
+
+    Caps both the number of handshakes in flight and the rate they start at,
+    so a server restart doesn't make every monitor reconnect in the same instant.
+    """
+
+    def __init__(self, max_concurrent: int = 8, rate: float = 5.0, burst: float = 10.0):
+        self._semaphore = asyncio.Semaphore(max_concurrent)
+        self._bucket = TokenBucket(rate, burst)
+        self.waiting = 0
+
+    async def __aenter__(self):
+        self.waiting += 1
+        try:
+            await self._bucket.acquire()
+            await self._semaphore.acquire()
+        finally:
+            self.waiting -= 1
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        self._semaphore.release()
+
+
+# Request priority classes, lowest value is served first
+PRIORITY_COMMAND = 0     # Slash commands (a user is waiting on an interaction)
+PRIORITY_CHAT = 1        # In-game chat command replies
+PRIORITY_BACKGROUND = 2  # Scheduled polling
+
+
+class PriorityRateLimiter:
+    """
+    Token bucket whose waiters are served by priority, then arrival order.
+
+    When the budget is exhausted requests queue rather than fail, and a queued
+    command always gets the next token ahead of any queued poll.
+    """
+
+    def __init__(self, rate: float, capacity: float):
+        self._bucket = TokenBucket(rate, capacity)
+        self._waiters = []  # heap of (priority, seq, cost, future)
+        self._seq = itertools.count()
+        self._pump_task: Optional[asyncio.Task] = None
+
+    @property
+    def queued(self) -> int:
+        return sum(1 for *_, fut in self._waiters if not fut.done())
+
+    async def acquire(self, priority: int = PRIORITY_BACKGROUND, cost: float = 1.0):
+        if not self._waiters and self._bucket.try_acquire(cost):
+            return
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._seq), cost, future))
+        if self._pump_task is None or self._pump_task.done():
+            self._pump_task = asyncio.create_task(self._pump())
+        await future
+
+    async def _pump(self):
+        while self._waiters:
+            priority, _, cost, future = self._waiters[0]
+            if future.done():
+                # Waiter was cancelled (e.g. poll deadline hit while queued)
+                heapq.heappop(self._waiters)
+                continue
+            if self._bucket.try_acquire(cost):
+                heapq.heappop(self._waiters)
+                future.set_result(None)
+                continue
+            await asyncio.sleep(self._bucket.time_until(cost))
@@ -0,0 +1,139 @@
+import datetime
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterable, List, Optional, Set
+
+from xyz.jefferybeans.jeffbot.database import db
+
+from .identity import IdentityStore
+
+log = logging.getLogger(__name__)
+
+CHUNK_SIZE = 1000 # Ids per IN (...) list
+STALE_GAP = datetime.timedelta(minutes=10)     # Marked online but unseen this long: the leave was missed
+STALE_SESSION_END = datetime.timedelta(minutes=5) # Such a session is closed this long after last_seen
+
+
+@dataclass
+class ReconcileResult:
+    guild_id: int
+    joined: List[str] = field(default_factory=list)
+    left: List[str] = field(default_factory=list)
+    checked: int = 0
+    duration: float = 0.0
+    finished_at: datetime.datetime = field(default_factory=lambda: datetime.datetime.now(datetime.timezone.utc))
+
+    @property
+    def corrections(self) -> int:
+        return len(self.joined) + len(self.left)
+
+
+def _chunks(ids: List[int]) -> Iterable[List[int]]:
+    for start in range(0, len(ids), CHUNK_SIZE):
+        yield ids[start:start + CHUNK_SIZE]
+
+
+async def mark_online(ids: List[int], timestamp: datetime.datetime, is_teammate: Optional[bool] = None):
+    """
+    Set-based join: closes zombie sessions (same heuristic as _update_player_activity),
+    opens a session for players without one, then flips is_online.
+    """
+    for chunk in _chunks(ids):
+        placeholders = ", ".join(["%s"] * len(chunk))
+        await db.execute(f"""
+            UPDATE rust_sessions s JOIN rust_players p ON p.id = s.player_id
+            SET s.end_time = p.last_seen + INTERVAL {int(STALE_SESSION_END.total_seconds())} SECOND
+            WHERE s.end_time IS NULL AND p.is_online = TRUE AND p.last_seen < %s AND p.id IN ({placeholders})
+        """, timestamp - STALE_GAP, *chunk)
+        await db.execute(f"""
+            INSERT INTO rust_sessions (player_id, start_time)
+            SELECT p.id, %s FROM rust_players p
+            WHERE p.id IN ({placeholders})
+            AND NOT EXISTS (SELECT 1 FROM rust_sessions s WHERE s.player_id = p.id AND s.end_time IS NULL)
+        """, timestamp, *chunk)
+        await db.execute(
+            f"UPDATE rust_players SET is_online = TRUE, last_seen = %s, is_teammate = COALESCE(%s, is_teammate) WHERE id IN ({placeholders})",
+            timestamp, is_teammate, *chunk,
+        )
+
+
+async def mark_offline(ids: List[int], timestamp: datetime.datetime):
+    """Set-based leave. Players already offline are left alone, so their last_seen isn't overwritten."""
+    for chunk in _chunks(ids):
+        placeholders = ", ".join(["%s"] * len(chunk))
+        await db.execute(f"UPDATE rust_sessions SET end_time = %s WHERE end_time IS NULL AND player_id IN ({placeholders})", timestamp, *chunk)
+        await db.execute(f"UPDATE rust_players SET is_online = FALSE, last_seen = %s WHERE is_online = TRUE AND id IN ({placeholders})", timestamp, *chunk)
+
+
+class BattleMetricsReconciler:
+    """
+    Brings rust_players / rust_sessions in line with a BattleMetrics online list.
+
+    The join and leave sets are computed in memory from one SELECT, then applied
+    with a few bulk statements per guild instead of one _update_player_activity
+    call (up to five queries) per mismatched player. The database helper has no
+    transaction API, so statements are ordered to be safe to re-run: sessions are
+    opened/closed before the players' is_online flags flip, and session inserts
+    skip players that already have an open session.
+
+    BattleMetrics players are matched to rows by their BattleMetrics id through the
+    identity index, so a rename or clan tag change doesn't read as a leave + join.
+    """
+
+    def __init__(self, normalize: Callable[[str], str], identity: IdentityStore):
+        self.normalize = normalize
+        self.identity = identity
+        self.last: Dict[int, ReconcileResult] = {} # guild_id -> most recent run
+
+    def online_names(self, bm_players: Iterable[dict]) -> Set[str]:
+        return {
+            self.normalize(p["attributes"]["name"])
+            for p in bm_players
+            if "attributes" in p and p["attributes"].get("name")
+        }
+
+    async def online_ids(self, guild_id: int, bm_players: Iterable[dict]) -> Set[int]:
+        """rust_players ids of the tracked players in a BattleMetrics online list."""
+        sightings = []
+        for p in bm_players:
+            name = p.get("attributes", {}).get("name")
+            if name:
+                bm_id = int(p["id"]) if str(p.get("id", "")).isdigit() else None
+                sightings.append((name, None, bm_id))
+        # New BattleMetrics ids and names are linked in one batch, not per player
+        identities = await self.identity.observe_many(guild_id, sightings)
+        return {identity.player_id for identity in identities if identity}
+
+    async def reconcile(self, guild_id: int, bm_players: Iterable[dict], tracked_only: bool = False) -> ReconcileResult:
+        """tracked_only limits the check to teammates and players currently marked online."""
+        started = time.perf_counter()
+        now = datetime.datetime.now(datetime.timezone.utc)
+        online = await self.online_ids(guild_id, bm_players)
+
+        query = "SELECT id, name, is_online FROM rust_players WHERE guild_id = %s"
+        if tracked_only:
+            query += " AND (is_online = TRUE OR is_teammate = TRUE)"
+        rows = await db.fetch_all(query, guild_id)
+
+        result = ReconcileResult(guild_id, checked=len(rows))
+        join_ids, leave_ids = [], []
+        for row in rows:
+            is_online_bm = row["id"] in online
+            if is_online_bm and not row["is_online"]:
+                join_ids.append(row["id"])
+                result.joined.append(row["name"])
+            elif not is_online_bm and row["is_online"]:
+                leave_ids.append(row["id"])
+                result.left.append(row["name"])
+
+        await mark_online(join_ids, now)
+        await mark_offline(leave_ids, now)
+
+        result.duration = time.perf_counter() - started
+        result.finished_at = now
+        self.last[guild_id] = result
+        if result.corrections:
+            log.info(f"BattleMetrics Reconcile: guild {guild_id}: {len(result.joined)} joined, {len(result.left)} left "
+                     f"({result.checked} checked, {result.duration * 1000:.0f}ms)")
+        return result
@@ -0,0 +1,121 @@
+import asyncio
+import datetime
+import logging
+import os
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+from xyz.jefferybeans.jeffbot.database import db
+
+from .history import HISTORY_DIR, trim_history
+
+log = logging.getLogger(__name__)
+
+# Defaults, overridable from the environment like the rest of the bot config
+LISTINGS_HOURS = int(os.environ.get("RUST_TRACKER_RETAIN_LISTINGS_HOURS", 48))
+TRANSACTIONS_DAYS = int(os.environ.get("RUST_TRACKER_RETAIN_TRANSACTIONS_DAYS", 14))
+LIFETIMES_DAYS = int(os.environ.get("RUST_TRACKER_RETAIN_LIFETIMES_DAYS", 30))
+KEEP_WIPES = int(os.environ.get("RUST_TRACKER_RETAIN_WIPES", 3))
+HISTORY_DAYS = int(os.environ.get("RUST_TRACKER_RETAIN_HISTORY_DAYS", 7))
+
+BATCH_SIZE = 500     # Rows per DELETE, so no statement holds locks for long
+BATCH_PAUSE = 0.05   # Seconds between batches, to let other queries through
+
+
+@dataclass
+class AgePolicy:
+    """Delete rows of table whose time_column is older than max_age."""
+    name: str
+    table: str
+    time_column: str
+    max_age: datetime.timedelta
+
+
+@dataclass
+class RetentionReport:
+    started_at: datetime.datetime
+    reclaimed: Dict[str, int] = field(default_factory=dict) # policy name -> rows deleted
+    duration: float = 0.0
+
+    @property
+    def total(self) -> int:
+        return sum(self.reclaimed.values())
+
+
+def default_policies() -> List[AgePolicy]:
+    # Raw rows only; hourly/per-wipe economy rollups keep the aggregated history
+    return [
+        AgePolicy("market_listings", "rust_market_listings", "timestamp", datetime.timedelta(hours=LISTINGS_HOURS)),
+        AgePolicy("economy_transactions", "rust_economy_transactions", "timestamp", datetime.timedelta(days=TRANSACTIONS_DAYS)),
+        AgePolicy("marker_lifetimes", "rust_marker_lifetimes", "despawned_at", datetime.timedelta(days=LIFETIMES_DAYS)),
+    ]
+
+
+class RetentionEngine:
+    """
+    Trims tracker history in small batches: raw rows by age, economy rollups
+    by keeping only the most recent keep_wipes wipes per guild, and the on-disk
+    marker history files by age.
+    """
+
+    def __init__(
+        self,
+        policies: Optional[List[AgePolicy]] = None,
+        keep_wipes: int = KEEP_WIPES,
+        batch_size: int = BATCH_SIZE,
+        history_dir: str = HISTORY_DIR,
+        history_age: datetime.timedelta = datetime.timedelta(days=HISTORY_DAYS),
+    ):
+        self.policies = policies if policies is not None else default_policies()
+        self.keep_wipes = keep_wipes
+        self.batch_size = batch_size
+        self.history_dir = history_dir
+        self.history_age = history_age
+        self.last_report: Optional[RetentionReport] = None
+        self._lock = asyncio.Lock()
+
+    async def run(self) -> RetentionReport:
+        async with self._lock:
+            report = RetentionReport(started_at=datetime.datetime.now(datetime.timezone.utc))
+            started = time.perf_counter()
+
+            for policy in self.policies:
+                cutoff = report.started_at - policy.max_age
+                report.reclaimed[policy.name] = await self._delete_batched(policy.table, f"{policy.time_column} < %s", cutoff)
+
+            hourly, wipes = await self._trim_old_wipes()
+            report.reclaimed["economy_hourly"] = hourly
+            report.reclaimed["economy_wipe"] = wipes
+
+            cutoff = (report.started_at - self.history_age).timestamp()
+            report.reclaimed["marker_history"] = await asyncio.to_thread(trim_history, self.history_dir, cutoff)
+
+            report.duration = time.perf_counter() - started
+            self.last_report = report
+            return report
+
+    async def _delete_batched(self, table: str, condition: str, *params) -> int:
+        row = await db.fetch_one(f"SELECT COUNT(*) as n FROM {table} WHERE {condition}", *params)
+        pending = int(row["n"]) if row else 0
+        deleted = 0
+        while deleted < pending:
+            await db.execute(f"DELETE FROM {table} WHERE {condition} LIMIT {self.batch_size}", *params)
+            deleted += min(self.batch_size, pending - deleted)
+            await asyncio.sleep(BATCH_PAUSE)
+        return deleted
+
+    async def _trim_old_wipes(self):
+        rows = await db.fetch_all("SELECT DISTINCT guild_id, wipe_at FROM rust_economy_wipe ORDER BY guild_id, wipe_at DESC")
+        wipes: Dict[int, List[datetime.datetime]] = {}
+        for row in rows:
+            wipes.setdefault(row["guild_id"], []).append(row["wipe_at"])
+
+        hourly = wipe = 0
+        for guild_id, times in wipes.items():
+            if len(times) <= self.keep_wipes:
+                continue
+            cutoff = times[self.keep_wipes - 1] # Oldest wipe still kept
+            hourly += await self._delete_batched("rust_economy_hourly", "guild_id = %s AND hour_start < %s", guild_id, cutoff)
+            wipe += await self._delete_batched("rust_economy_wipe", "guild_id = %s AND wipe_at < %s", guild_id, cutoff)
+        return hourly, wipe
@@ -0,0 +1,81 @@
+import datetime
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+# Transition kinds
+ONLINE = "online"
+OFFLINE = "offline"
+DEATH = "death"
+RESPAWN = "respawn"
+
+
+@dataclass
+class MemberState:
+    steam_id: int
+    name: str
+    is_online: bool
+    is_alive: bool
+    spawn_time: int = 0
+    death_time: int = 0
+
+
+@dataclass
+class RosterTransition:
+    steam_id: int
+    name: str
+    kind: str
+    timestamp: datetime.datetime
+
+
+class TeamRoster:
+    """
+    In-memory team state for one guild, keyed by steam_id.
+
+    apply() takes a full TeamInfo (initial fetch or the one carried by a team event),
+    diffs it against the previous state and returns the transitions in between.
+    """
+
+    def __init__(self):
+        self.members: Dict[int, MemberState] = {}
+        self.leader_steam_id: Optional[int] = None
+        self.initialized = False
+
+    def apply(self, team_info: Any, timestamp: datetime.datetime) -> List[RosterTransition]:
+        transitions: List[RosterTransition] = []
+        members: Dict[int, MemberState] = {}
+
+        for m in team_info.members:
+            state = MemberState(
+                steam_id=m.steam_id,
+                name=m.name,
+                is_online=bool(m.is_online),
+                is_alive=bool(m.is_alive),
+                spawn_time=getattr(m, "spawn_time", 0) or 0,
+                death_time=getattr(m, "death_time", 0) or 0,
+            )
+            members[state.steam_id] = state
+            old = self.members.get(state.steam_id)
+
+            if old is None:
+                # First sighting: report presence so the DB matches the team snapshot. OFFLINE here
+                # only closes what the DB still has open; offline rows keep their real last_seen.
+                transitions.append(RosterTransition(state.steam_id, state.name, ONLINE if state.is_online else OFFLINE, timestamp))
+                continue
+
+            if state.is_online != old.is_online:
+                transitions.append(RosterTransition(state.steam_id, state.name, ONLINE if state.is_online else OFFLINE, timestamp))
+
+            # A newer death/spawn time catches a death+respawn that happened between two events
+            if old.is_alive and (not state.is_alive or state.death_time > old.death_time):
+                transitions.append(RosterTransition(state.steam_id, state.name, DEATH, timestamp))
+            if state.is_alive and (not old.is_alive or state.spawn_time > old.spawn_time):
+                transitions.append(RosterTransition(state.steam_id, state.name, RESPAWN, timestamp))
+
+        # Members who left the team simply drop out; we can no longer see their presence.
+        self.members = members
+        self.leader_steam_id = getattr(team_info, "leader_steam_id", None)
+        self.initialized = True
+        return transitions
+
+    def online(self) -> List[MemberState]:
+        return [m for m in self.members.values() if m.is_online]
@@ -8,28 +8,86 @@ import datetime
 import statistics
 import math
 import io
-from typing import Optional, List, Dict, Any
+import random
+from typing import Optional, List, Dict, Any, Tuple
 
 from xyz.jefferybeans.jeffbot.database import db
 from xyz.jefferybeans.jeffbot.utils.battlemetrics import BattleMetricsClient
 
 from .rust.monitor import RustMonitor
+from .rust.scheduler import PollScheduler
+from .rust.changes import MarkerDelta
+from .rust.ratelimit import ConnectLimiter, PRIORITY_COMMAND, PRIORITY_CHAT
+from .rust.map_cache import MapRenderer
+from .rust.executor import OffloadPool, PROCESS
+from .rust.roster import TeamRoster, RosterTransition, ONLINE, OFFLINE
+from .rust.devices import DeviceRegistry, SmartDevice
+from .rust.guild_config import GuildConfigCache
+from .rust.markers import MarkerTracker, MarkerType, TrackedMarker, SPAWN, DESPAWN
+from .rust.history import HistoryStore, append_records
+from .rust.vending import VendingTracker, Listing, ListingChange, NEW, REMOVED
+from .rust.items import item_index
+from .rust.search import NameIndex
+from .rust.watches import WatchIndex, PriceWatch, MAX_WATCHES_PER_USER
+from .rust.economy import EconomyRollups
+from .rust.retention import RetentionEngine
+from .rust.reconcile import BattleMetricsReconciler, ReconcileResult, mark_online, mark_offline
+from .rust.identity import IdentityStore, normalize_name
+from .rust.bm_cache import CachedBattleMetrics, PLAYERS_TTL
+from .rust.bm_poller import BattleMetricsPoller
+from .rust.notifier import NotificationPipeline, PRIORITY_ALARM, PRIORITY_EVENT, PRIORITY_SWITCH, PRIORITY_INFO
 
 log = logging.getLogger(__name__)
 
+# Startup stagger between monitors (seconds), so hundreds of guilds don't connect in one burst
+MONITOR_START_INTERVAL = 0.1
+
+BM_POLL_MAX_AGE = 15.0 # Seconds a cached BattleMetrics player list is fresh enough for a verification poll
+
+MARKER_LABELS = {
+    MarkerType.CARGO_SHIP: "🚢 Cargo Ship",
+    MarkerType.PATROL_HELICOPTER: "🚁 Patrol Helicopter",
+    MarkerType.CH47: "🚁 Chinook CH47",
+    MarkerType.EXPLOSION: "💥 Explosion",
+    MarkerType.CRATE: "📦 Hackable Crate",
+    MarkerType.TRAVELLING_VENDOR: "🛒 Travelling Vendor",
+}
+# Events whose departure is announced with how long they were out
+DEPARTURE_TYPES = {MarkerType.CARGO_SHIP, MarkerType.PATROL_HELICOPTER, MarkerType.CH47, MarkerType.TRAVELLING_VENDOR}
+HISTORY_SKIP_TYPES = frozenset({MarkerType.VENDING_MACHINE})
+LISTING_BATCH_ROWS = 1000 # Split very large first snapshots into several INSERTs
+NAME_BACKFILL_ROWS = 1000 # Players per UPDATE when filling normalized_name
+
 class RustTracker(commands.Cog):
     def __init__(self, bot: commands.Bot):
         self.bot = bot
         
         # Monitor Storage
         self.monitors: Dict[int, RustMonitor] = {}
+        self.poll_scheduler = PollScheduler()
+        self.connect_limiter = ConnectLimiter()
+        self.offload = OffloadPool()
+        self.map_renderer = MapRenderer(self.offload)
         
         # Legacy regexes removed.
         
         self.tracking_channels = set()
-        self.previous_markers = {} # guild_id -> {marker_id}
-        
-        self.bm_client = BattleMetricsClient()
+        self.rosters: Dict[int, TeamRoster] = {} # guild_id -> live team state from Rust+
+        self.devices: Dict[int, DeviceRegistry] = {} # guild_id -> paired smart devices
+        self.marker_trackers: Dict[int, MarkerTracker] = {} # guild_id -> live map events
+        self.marker_history = HistoryStore() # guild_id -> ring of marker positions, flushed to disk
+        self.vending: Dict[int, VendingTracker] = {} # guild_id -> last seen sell orders per shop
+        self.listing_index: Dict[int, NameIndex] = {} # guild_id -> item names currently on sale
+        self.price_watches = WatchIndex() # (guild_id, item) -> /rust_watch subscriptions
+        self.economy = EconomyRollups()
+        self.retention = RetentionEngine()
+        self.guild_configs = GuildConfigCache()
+        self.identity = IdentityStore(self._normalize_name) # steam/BattleMetrics id or known name -> rust_players row
+        self.notifier: Optional[NotificationPipeline] = None # Created in cog_load, needs a running loop
+        
+        self.bm_client = CachedBattleMetrics(BattleMetricsClient()) # Shared per server_id across guilds and commands
+        self.reconciler = BattleMetricsReconciler(self._normalize_name, self.identity)
+        self.bm_poller = BattleMetricsPoller(self._battlemetrics_servers, self._fetch_bm_players, self._handle_bm_players, self.reconciler.online_names)
         
 
     async def cog_load(self):
@@ -79,79 +137,221 @@ class RustTracker(commands.Cog):
         except Exception:
              pass
             
-        await self._load_tracking_channels()
+        try:
+            await db.execute("ALTER TABLE rust_market_listings ADD COLUMN shop_id BIGINT DEFAULT NULL")
+        except Exception:
+            pass
+        try:
+            await db.execute("ALTER TABLE rust_market_listings ADD COLUMN change_type VARCHAR(10) DEFAULT NULL")
+        except Exception:
+            pass
+            
+        try:
+            await db.execute("""
+                CREATE TABLE IF NOT EXISTS rust_current_listings (
+                    guild_id BIGINT,
+                    shop_id BIGINT,
+                    item_id INT,
+                    currency_id INT,
+                    shop_name VARCHAR(100),
+                    item_name VARCHAR(100),
+                    quantity INT,
+                    cost_item VARCHAR(100),
+                    cost_amount INT,
+                    stock INT,
+                    updated_at TIMESTAMP NULL,
+                    PRIMARY KEY (guild_id, shop_id, item_id, currency_id),
+                    INDEX idx_item (guild_id, item_name)
+                )
+            """)
+        except Exception as e:
+            log.error(f"Failed to create rust_current_listings table: {e}")
+            
+        try:
+            await db.execute("""
+                CREATE TABLE IF NOT EXISTS rust_price_watches (
+                    id BIGINT AUTO_INCREMENT PRIMARY KEY,
+                    guild_id BIGINT,
+                    user_id BIGINT,
+                    item_name VARCHAR(100),
+                    max_unit_price DOUBLE,
+                    cost_item VARCHAR(100),
+                    dm BOOLEAN DEFAULT FALSE,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    INDEX idx_guild_user (guild_id, user_id)
+                )
+            """)
+        except Exception as e:
+            log.error(f"Failed to create rust_price_watches table: {e}")
+            
+        try:
+            await db.execute("""
+                CREATE TABLE IF NOT EXISTS rust_economy_hourly (
+                    guild_id BIGINT,
+                    hour_start DATETIME,
+                    item_name VARCHAR(100),
+                    cost_item VARCHAR(100),
+                    total_quantity BIGINT DEFAULT 0,
+                    total_cost BIGINT DEFAULT 0,
+                    trades INT DEFAULT 0,
+                    PRIMARY KEY (guild_id, hour_start, item_name, cost_item)
+                )
+            """)
+            await db.execute("""
+                CREATE TABLE IF NOT EXISTS rust_economy_wipe (
+                    guild_id BIGINT,
+                    wipe_at DATETIME,
+                    item_name VARCHAR(100),
+                    cost_item VARCHAR(100),
+                    total_quantity BIGINT DEFAULT 0,
+                    total_cost BIGINT DEFAULT 0,
+                    trades INT DEFAULT 0,
+                    PRIMARY KEY (guild_id, wipe_at, item_name, cost_item),
+                    INDEX idx_top (guild_id, wipe_at, total_cost)
+                )
+            """)
+        except Exception as e:
+            log.error(f"Failed to create economy rollup tables: {e}")
+            
+        # Time indexes for the retention job's range deletes
+        try:
+            await db.execute("ALTER TABLE rust_market_listings ADD INDEX idx_time (timestamp)")
+        except Exception:
+            pass
+        try:
+            await db.execute("ALTER TABLE rust_economy_transactions ADD INDEX idx_time (timestamp)")
+        except Exception:
+            pass
             
-        self.check_rust_status.start()
+        try:
+            await db.execute("""
+                CREATE TABLE IF NOT EXISTS rust_marker_lifetimes (
+                    id BIGINT AUTO_INCREMENT PRIMARY KEY,
+                    guild_id BIGINT,
+                    marker_id BIGINT,
+                    marker_type INT,
+                    spawned_at TIMESTAMP NULL,
+                    despawned_at TIMESTAMP NULL,
+                    duration_seconds INT,
+                    INDEX idx_type_time (guild_id, marker_type, despawned_at)
+                )
+            """)
+        except Exception as e:
+            log.error(f"Failed to create rust_marker_lifetimes table: {e}")
+            
+        # Player identity: stable ids, names are display only
+        try:
+            await db.execute("ALTER TABLE rust_players ADD COLUMN bm_player_id BIGINT DEFAULT NULL")
+        except Exception:
+            pass
+        try:
+            await db.execute("ALTER TABLE rust_players ADD COLUMN normalized_name VARCHAR(100) DEFAULT NULL")
+        except Exception:
+            pass
+        try:
+            await db.execute("ALTER TABLE rust_players ADD INDEX idx_normalized (guild_id, normalized_name)")
+        except Exception:
+            pass
+        try:
+            await db.execute("ALTER TABLE rust_players ADD INDEX idx_steam (guild_id, steam_id)")
+        except Exception:
+            pass
+        try:
+            await db.execute("ALTER TABLE rust_players ADD INDEX idx_bm (guild_id, bm_player_id)")
+        except Exception:
+            pass
+        try:
+            await db.execute("""
+                CREATE TABLE IF NOT EXISTS rust_player_aliases (
+                    guild_id BIGINT,
+                    normalized_name VARCHAR(100),
+                    player_id BIGINT,
+                    name VARCHAR(100),
+                    first_seen TIMESTAMP NULL,
+                    PRIMARY KEY (guild_id, normalized_name),
+                    INDEX idx_player (player_id),
+                    FOREIGN KEY (player_id) REFERENCES rust_players(id) ON DELETE CASCADE
+                )
+            """)
+        except Exception as e:
+            log.error(f"Failed to create rust_player_aliases table: {e}")
+            
+        await self._load_tracking_channels()
+        await self.guild_configs.load_all()
+        await self._backfill_normalized_names()
+        await self.identity.load_all()
+        await self._load_listing_index()
+        self.price_watches = WatchIndex.from_rows(await db.fetch_all("SELECT * FROM rust_price_watches"))
+        self.notifier = NotificationPipeline(self._get_tracking_channel_ids, self.bot.get_channel)
+            
+        self.bm_poller.start()
+        self.flush_marker_history.start()
+        self.run_retention.start()
         # Start background sync
         # Start Monitors
+        self.poll_scheduler.start()
         self.bot.loop.create_task(self._load_monitors())
+        self.bot.loop.create_task(self._backfill_economy_rollups())
         
         log.info(f"RustTracker loaded. Tracking {len(self.tracking_channels)} channels.")
 
     async def cog_unload(self):
-        self.check_rust_status.cancel()
+        await self.bm_poller.stop()
+        self.flush_marker_history.cancel()
+        self.run_retention.cancel()
+        await self._flush_marker_history()
         if self.bm_client:
             await self.bm_client.close()
         
         for m in self.monitors.values():
             await m.stop()
+        await self.poll_scheduler.stop()
+        self.offload.shutdown()
+        if self.notifier:
+            self.notifier.close()
+
+    def _battlemetrics_servers(self) -> Dict[str, List[int]]:
+        """BattleMetrics server_id -> guilds verifying against it."""
+        servers: Dict[str, List[int]] = {}
+        for config in self.guild_configs.all():
+            if config.battlemetrics_server_id:
+                servers.setdefault(str(config.battlemetrics_server_id), []).append(config.guild_id)
+        return servers
+
+    async def _fetch_bm_players(self, server_id: str):
+        # Reuse a response another guild or command fetched moments ago
+        return await self.bm_client.get_server_players(server_id, max_age=BM_POLL_MAX_AGE)
+
+    async def _handle_bm_players(self, server_id: str, guild_ids: List[int], bm_players: List[dict]):
+        """Verify player status against one BattleMetrics fetch for every guild tracking the server."""
+        results = await asyncio.gather(*(self.reconciler.reconcile(guild_id, bm_players) for guild_id in guild_ids), return_exceptions=True)
+        for guild_id, result in zip(guild_ids, results):
+            if isinstance(result, Exception):
+                log.error(f"Error verifying BattleMetrics status for guild {guild_id}: {result}")
 
     @tasks.loop(minutes=5)
-    async def check_rust_status(self):
-        """Background loop to verify player status against BattleMetrics."""
-        await self.bot.wait_until_ready()
-        
-        # 1. Get guilds with BM Server ID
-        configs = await db.fetch_all("SELECT guild_id, battlemetrics_server_id FROM rust_tracking_channels WHERE battlemetrics_server_id IS NOT NULL")
-        
-        for config in configs:
-            guild_id = config["guild_id"]
-            server_id = config["battlemetrics_server_id"]
-            
-            if not server_id: continue
-                
+    async def flush_marker_history(self):
+        await self._flush_marker_history()
+
+    async def _flush_marker_history(self):
+        for path, data in self.marker_history.pending():
             try:
-                # 2. Fetch BM Data
-                bm_players = await self.bm_client.get_server_players(server_id)
-                # Helper to normalize names
-                # BM Name -> "Name"
-                bm_online_names = {self._normalize_name(p["attributes"]["name"]) for p in bm_players if "attributes" in p}
-                
-                # 3. Fetch DB Data
-                db_players = await db.fetch_all("SELECT id, name, is_online FROM rust_players WHERE guild_id = %s", guild_id)
-                db_online_map = {p["name"]: p for p in db_players if p["is_online"]}  # Name -> Row
-                db_offline_map = {p["name"]: p for p in db_players if not p["is_online"]}
-                
-                now = datetime.datetime.now(datetime.timezone.utc)
-                
-                # 4. Compare & Fix
-                
-                # Case A: DB says Offline, BM says Online (Missed Join)
-                for name in bm_online_names:
-                    # Check if tracked at all
-                    if name in db_offline_map:
-                        # Fix it
-                        log.info(f"Rust Verify: Found {name} online on BM but offline in DB. Correcting...")
-                        await self._update_player_activity(guild_id, name, True, now)
-                    elif name not in db_online_map:
-                         # New player completely?
-                         # Optional: Auto-track new players seen on BM?
-                         # Let's do it to be thorough.
-                         pass 
-
-                # Case B: DB says Online, BM says Offline (Missed Leave)
-                # We iterate over who we THINK is online
-                for name, row in db_online_map.items():
-                    if name not in bm_online_names:
-                        # They are gone
-                        log.info(f"Rust Verify: Found {name} online in DB but offline on BM. Correcting...")
-                        await self._update_player_activity(guild_id, name, False, now)
-                        
+                await self.offload.run(append_records, path, data, label="history_flush")
             except Exception as e:
-                log.error(f"Error in check_rust_status for guild {guild_id}: {e}")
+                log.error(f"Failed to flush marker history to {path}: {e}")
+
+    @tasks.loop(hours=1)
+    async def run_retention(self):
+        try:
+            report = await self.retention.run()
+            if report.total:
+                details = ", ".join(f"{name}: {n}" for name, n in report.reclaimed.items() if n)
+                log.info(f"Rust Retention: Reclaimed {report.total} rows in {report.duration:.1f}s ({details})")
+        except Exception as e:
+            log.error(f"Rust Retention: Run failed: {e}")
 
-    @check_rust_status.before_loop
-    async def before_check_rust_status(self):
+    @run_retention.before_loop
+    async def before_run_retention(self):
         await self.bot.wait_until_ready()
 
     async def _load_tracking_channels(self):
@@ -164,62 +364,253 @@ class RustTracker(commands.Cog):
             timestamp = datetime.datetime.now(datetime.timezone.utc)
             
             if event_type == "team_info":
-                 # Initial snapshot or update
-                 pass 
+                # Initial snapshot (or refetch after reconnect)
+                await self._process_team_info(guild_id, data, timestamp)
                  
             elif event_type == "team_event":
-                pass
+                # Team events carry the full team state
+                await self._process_team_info(guild_id, data.team_info, timestamp)
                 
-            elif event_type == "markers":
-                # data is list of markers
-                await self._process_markers(guild_id, data)
+            elif event_type == "marker_delta":
+                # data is MarkerDelta (added/removed/moved since last poll)
+                await self._process_markers(guild_id, data, timestamp)
                 
             elif event_type == "chat_event":
                 # In-game chat command handling
                 await self._handle_in_game_command(guild_id, data)
                 
+            elif event_type == "entity_event":
+                # Smart alarm / switch / storage state change
+                await self._handle_entity_event(guild_id, data)
+                
             elif event_type == "time":
-                # Store time for potential command usage
+                # Cached on the monitor (monitor.snapshots) for commands
                 pass
                 
             elif event_type == "server_info":
-                # Store pop info
+                # Cached on the monitor (monitor.snapshots) for commands
+                pass
+                
+            elif event_type == "pop_changed":
                 pass
                 
         except Exception as e:
             log.error(f"RustTracker: Error handling monitor event {event_type} for guild {guild_id}: {e}")
 
-    async def _process_markers(self, guild_id: int, markers: list):
-        if guild_id not in self.previous_markers:
-            self.previous_markers[guild_id] = set()
+    async def _process_team_info(self, guild_id: int, team_info: Any, timestamp: datetime.datetime):
+        roster = self.rosters.setdefault(guild_id, TeamRoster())
+        transitions = roster.apply(team_info, timestamp)
+        if transitions:
+            await self._apply_roster_transitions(guild_id, transitions)
+
+    async def _apply_roster_transitions(self, guild_id: int, transitions: List[RosterTransition]):
+        """Push a batch of team presence changes into player activity/sessions with set-based statements."""
+        presence = [t for t in transitions if t.kind in (ONLINE, OFFLINE)]
+        for t in transitions:
+            if t.kind not in (ONLINE, OFFLINE):
+                log.info(f"Rust Team: {t.name} {t.kind} in guild {guild_id}")
+        if not presence:
+            return
 
-        current_marker_ids = {m.id for m in markers}
-        previous = self.previous_markers[guild_id]
-        
-        new_markers = current_marker_ids - previous
-        # removed_markers = previous - current_marker_ids 
+        player_ids = await self._resolve_teammates(guild_id, presence)
+        batches: Dict[Tuple[str, datetime.datetime], List[int]] = {}
+        for t in presence:
+            if t.steam_id in player_ids:
+                batches.setdefault((t.kind, t.timestamp), []).append(player_ids[t.steam_id])
+        for (kind, timestamp), ids in batches.items():
+            if kind == ONLINE:
+                await mark_online(ids, timestamp, is_teammate=True)
+            else:
+                await mark_offline(ids, timestamp) # First snapshot after startup reports offline teammates; already-offline rows keep last_seen
+
+    async def _resolve_teammates(self, guild_id: int, transitions: List[RosterTransition]) -> Dict[int, int]:
+        """steam_id -> rust_players.id, creating rows for teammates seen for the first time."""
+        player_ids: Dict[int, int] = {}
+        missing: Dict[str, RosterTransition] = {}
+        identities = await self.identity.observe_many(
+            guild_id, [(t.name, t.steam_id, None) for t in transitions], transitions[0].timestamp if transitions else None
+        )
+        for t, identity in zip(transitions, identities):
+            if identity:
+                player_ids[t.steam_id] = identity.player_id
+            else:
+                missing.setdefault(self._normalize_name(t.name), t)
+        if not missing:
+            return player_ids
+
+        names = list(missing)
+        values = ", ".join(["(%s, %s, %s, FALSE, NULL, TRUE)"] * len(names))
+        params = []
+        for name in names:
+            params.extend([guild_id, name, name])
+        await db.execute(f"""
+            INSERT INTO rust_players (guild_id, name, normalized_name, is_online, last_seen, is_teammate)
+            VALUES {values}
+            ON DUPLICATE KEY UPDATE is_teammate = TRUE
+        """, *params)
+        placeholders = ", ".join(["%s"] * len(names))
+        rows = await db.fetch_all(f"SELECT id, name FROM rust_players WHERE guild_id = %s AND name IN ({placeholders})", guild_id, *names)
+        for row in rows:
+            t = missing.get(row["name"])
+            if t:
+                await self.identity.register(guild_id, row["id"], row["name"], steam_id=t.steam_id)
+                player_ids[t.steam_id] = row["id"]
+        return player_ids
+
+    async def _process_markers(self, guild_id: int, delta: MarkerDelta, timestamp: datetime.datetime):
+        # The first snapshot after startup only seeds the tracker; markers already out aren't announced.
+        tracker = self.marker_trackers.setdefault(guild_id, MarkerTracker())
+        finished: List[TrackedMarker] = []
+
+        # Position history only needs new and moved markers; vending machines never move
+        sampled = delta.markers if delta.initial else delta.added + delta.moved
+        self.marker_history.record(guild_id, timestamp.timestamp(), sampled, skip_types=HISTORY_SKIP_TYPES)
+
+        for event in tracker.apply(delta, timestamp):
+            marker = event.marker
+            label = MARKER_LABELS.get(marker.type)
+
+            if event.kind == SPAWN and label:
+                await self._notify_tracking_channels(guild_id, f"**{label}** has spawned!", PRIORITY_EVENT, coalesce_key="spawn", item=f"**{label}**")
+            elif event.kind == DESPAWN:
+                if marker.partial:
+                    continue # Spawn time unknown, lifetime would be wrong
+                finished.append(marker)
+                if label and marker.type in DEPARTURE_TYPES:
+                    await self._notify_tracking_channels(guild_id, f"**{label}** has left after {self._format_duration(marker.lifetime)}.", PRIORITY_EVENT)
+
+        if finished:
+            await self._store_marker_lifetimes(guild_id, finished)
+
+        await self._process_vending_markers(guild_id, delta, timestamp)
+
+    async def _process_vending_markers(self, guild_id: int, delta: MarkerDelta, timestamp: datetime.datetime):
+        # Sell orders come with every marker poll; only listing changes are written
+        vending = self.vending.setdefault(guild_id, VendingTracker())
+        changes = vending.apply(delta)
+        if delta.initial:
+            # First snapshot replaces whatever was live before the restart
+            await db.execute("DELETE FROM rust_current_listings WHERE guild_id = %s", guild_id)
+            self.listing_index.pop(guild_id, None)
+        if changes:
+            await self._store_listing_changes(guild_id, changes, timestamp)
+            await self._update_current_listings(guild_id, changes, timestamp)
+
+            hits = self.price_watches.check(guild_id, changes)
+            # Offers already up at startup are marked as seen, not announced
+            if not delta.initial:
+                for watch, listing in hits:
+                    await self._send_price_alert(watch, listing)
+
+    async def _send_price_alert(self, watch: PriceWatch, listing: Listing):
+        msg = (f"💰 **{listing.item_name}** at **{listing.shop_name}**: {listing.quantity}x for {listing.cost_amount} {listing.cost_item} "
+               f"({listing.unit_price:g} each, stock {listing.stock}) — below your {watch.max_unit_price:g} {watch.cost_item} watch.")
+        if not watch.dm:
+            await self._notify_tracking_channels(watch.guild_id, f"<@{watch.user_id}> {msg}", PRIORITY_EVENT)
+            return
+        try:
+            user = self.bot.get_user(watch.user_id) or await self.bot.fetch_user(watch.user_id)
+            await user.send(msg)
+        except Exception as e:
+            log.error(f"Rust Market: Failed to DM price alert to {watch.user_id}: {e}")
 
-        for marker in markers:
-            if marker.id in new_markers:
-                # Detect Type
-                m_type = str(type(marker).__name__)
-                label = None
-                
-                if "CargoShip" in m_type:
-                    label = "🚢 Cargo Ship"
-                elif "PatrolHelicopter" in m_type:
-                    label = "🚁 Patrol Helicopter"
-                elif "Chinook" in m_type:
-                    label = "🚁 Chinook CH47"
-                elif "Bradley" in m_type:
-                    label = "💥 Bradley APC"
-                elif "Crate" in m_type:
-                    label = "📦 Hackable Crate"
-                    
-                if label:
-                   await self._notify_tracking_channels(guild_id, f"**{label}** has spawned!")
+    async def _backfill_normalized_names(self):
+        """Fill rust_players.normalized_name for rows written before the column existed."""
+        try:
+            rows = await db.fetch_all("SELECT id, name FROM rust_players WHERE normalized_name IS NULL AND name IS NOT NULL")
+            for start in range(0, len(rows), NAME_BACKFILL_ROWS):
+                batch = rows[start:start + NAME_BACKFILL_ROWS]
+                cases = " ".join(["WHEN %s THEN %s"] * len(batch))
+                params = []
+                for row in batch:
+                    params.extend([row["id"], self._normalize_name(row["name"])])
+                placeholders = ", ".join(["%s"] * len(batch))
+                await db.execute(f"UPDATE rust_players SET normalized_name = CASE id {cases} END WHERE id IN ({placeholders})", *params, *[row["id"] for row in batch])
+            if rows:
+                log.info(f"RustTracker: Backfilled normalized names for {len(rows)} players")
+        except Exception as e:
+            log.error(f"Failed to backfill normalized player names: {e}")
+
+    async def _load_listing_index(self):
+        rows = await db.fetch_all("SELECT guild_id, item_name, COUNT(*) as listings FROM rust_current_listings GROUP BY guild_id, item_name")
+        self.listing_index = {}
+        for row in rows:
+            self.listing_index.setdefault(row["guild_id"], NameIndex()).add(row["item_name"], row["listings"])
+
+    async def _update_current_listings(self, guild_id: int, changes: List[ListingChange], timestamp: datetime.datetime):
+        index = self.listing_index.setdefault(guild_id, NameIndex())
+        live = [c.listing for c in changes if c.kind != REMOVED]
+        removed = [c.listing for c in changes if c.kind == REMOVED]
+
+        for c in changes:
+            if c.kind == NEW:
+                index.add(c.listing.item_name)
+            elif c.kind == REMOVED:
+                index.remove(c.listing.item_name)
+
+        try:
+            for start in range(0, len(live), LISTING_BATCH_ROWS):
+                batch = live[start:start + LISTING_BATCH_ROWS]
+                placeholders = ", ".join(["(%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)"] * len(batch))
+                params = []
+                for l in batch:
+                    params.extend([guild_id, l.shop_id, l.item_id, l.currency_id, l.shop_name, l.item_name, l.quantity, l.cost_item, l.cost_amount, l.stock, timestamp])
+                await db.execute(f"""
+                    INSERT INTO rust_current_listings
+                    (guild_id, shop_id, item_id, currency_id, shop_name, item_name, quantity, cost_item, cost_amount, stock, updated_at)
+                    VALUES {placeholders}
+                    ON DUPLICATE KEY UPDATE shop_name = VALUES(shop_name), quantity = VALUES(quantity),
+                        cost_amount = VALUES(cost_amount), stock = VALUES(stock), updated_at = VALUES(updated_at)
+                """, *params)
+
+            for start in range(0, len(removed), LISTING_BATCH_ROWS):
+                batch = removed[start:start + LISTING_BATCH_ROWS]
+                placeholders = ", ".join(["(%s, %s, %s)"] * len(batch))
+                params = []
+                for l in batch:
+                    params.extend([l.shop_id, l.item_id, l.currency_id])
+                await db.execute(f"""
+                    DELETE FROM rust_current_listings
+                    WHERE guild_id = %s AND (shop_id, item_id, currency_id) IN ({placeholders})
+                """, guild_id, *params)
+        except Exception as e:
+            log.error(f"Rust Market: Failed to update current listings for guild {guild_id}: {e}")
+
+    async def _store_listing_changes(self, guild_id: int, changes: List[ListingChange], timestamp: datetime.datetime):
+        for start in range(0, len(changes), LISTING_BATCH_ROWS):
+            batch = changes[start:start + LISTING_BATCH_ROWS]
+            placeholders = ", ".join(["(%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)"] * len(batch))
+            params = []
+            for c in batch:
+                l = c.listing
+                stock = 0 if c.kind == REMOVED else l.stock
+                params.extend([guild_id, l.shop_id, l.shop_name, l.item_name, l.quantity, l.cost_item, l.cost_amount, stock, c.kind, timestamp])
+            try:
+                await db.execute(f"""
+                    INSERT INTO rust_market_listings
+                    (guild_id, shop_id, shop_name, item_name, quantity, cost_item, cost_amount, stock, change_type, timestamp)
+                    VALUES {placeholders}
+                """, *params)
+            except Exception as e:
+                log.error(f"Rust Market: Failed to store {len(batch)} listing changes for guild {guild_id}: {e}")
+                return
+        log.debug(f"Rust Market: Stored {len(changes)} listing changes for guild {guild_id}")
+
+    async def _store_marker_lifetimes(self, guild_id: int, markers: List[TrackedMarker]):
+        placeholders = ", ".join(["(%s, %s, %s, %s, %s, %s)"] * len(markers))
+        params = []
+        for m in markers:
+            params.extend([guild_id, m.marker_id, int(m.type), m.first_seen, m.last_seen, int(m.lifetime.total_seconds())])
+        try:
+            await db.execute(f"INSERT INTO rust_marker_lifetimes (guild_id, marker_id, marker_type, spawned_at, despawned_at, duration_seconds) VALUES {placeholders}", *params)
+        except Exception as e:
+            log.error(f"Failed to store marker lifetimes for guild {guild_id}: {e}")
 
-        self.previous_markers[guild_id] = current_marker_ids
+    @staticmethod
+    def _format_duration(delta: datetime.timedelta) -> str:
+        total = int(delta.total_seconds())
+        hours, mins = total // 3600, (total % 3600) // 60
+        return f"{hours}h {mins}m" if hours > 0 else f"{mins}m"
 
     async def _handle_in_game_command(self, guild_id: int, event: Any):
         # event is ChatEvent(message, name, steam_id, ...)
@@ -236,14 +627,14 @@ class RustTracker(commands.Cog):
 
         if command == "!pop":
              try:
-                 info = await monitor.socket.get_info()
+                 info = (await monitor.get_snapshot("server_info", priority=PRIORITY_CHAT)).data
                  response = f"Population: {info.players}/{info.max_players} (Queued: {info.queued_players})"
              except:
                  response = "Failed to fetch population."
 
         elif command == "!time":
              try:
-                 time_data = await monitor.socket.get_time()
+                 time_data = (await monitor.get_snapshot("time", priority=PRIORITY_CHAT)).data
                  response = f"Game Time: {time_data.time}"
              except:
                  response = "Failed to fetch time."
@@ -251,25 +642,22 @@ class RustTracker(commands.Cog):
         elif command == "!online":
               # Basic online check
               try:
-                 team_info = await monitor.socket.get_team_info()
+                 team_info = (await monitor.get_snapshot("team_info", priority=PRIORITY_CHAT)).data
                  online_members = [m.name for m in team_info.members if m.is_online]
                  response = f"Online: {', '.join(online_members)}" if online_members else "No teammates online."
               except:
                  response = "Failed to fetch online members."
 
         if response:
-            await monitor.socket.send_team_message(response)
+            await monitor.request("send_team_message", response, priority=PRIORITY_CHAT)
     
-    async def _notify_tracking_channels(self, guild_id: int, message: str):
-        # Notify channels associated with this guild
-        channels = await db.fetch_all("SELECT channel_id FROM rust_tracking_channels WHERE guild_id = %s", guild_id)
-        for row in channels:
-            channel = self.bot.get_channel(row["channel_id"])
-            if channel:
-                try:
-                    await channel.send(message)
-                except Exception as e:
-                    log.error(f"Failed to send Rust notification: {e}")
+    async def _get_tracking_channel_ids(self, guild_id: int) -> List[int]:
+        config = await self.guild_configs.get(guild_id)
+        return config.channel_ids
+
+    async def _notify_tracking_channels(self, guild_id: int, message: str, priority: int = PRIORITY_INFO, coalesce_key: Optional[str] = None, item: Optional[str] = None):
+        # Queued per channel; sent by the notifier in priority order under Discord's per-channel rate limit
+        await self.notifier.notify(guild_id, message, priority, coalesce_key=coalesce_key, item=item)
 
     @app_commands.command(name="rust_map", description="Get the current map status.")
     async def rust_map(self, interaction: discord.Interaction):
@@ -282,12 +670,10 @@ class RustTracker(commands.Cog):
              return
              
         try:
-             # rustplus library map generation
-             map_img = await monitor.socket.get_map(add_icons=True, add_events=True, add_vending_machines=True)
+             # Cached base map + live event/vending overlays, encoded off the event loop
+             png = await self.map_renderer.render(monitor)
              
-             with io.BytesIO() as image_binary:
-                 map_img.save(image_binary, 'PNG')
-                 image_binary.seek(0)
+             with io.BytesIO(png) as image_binary:
                  await interaction.followup.send(file=discord.File(fp=image_binary, filename='rust_map.png'))
                  
         except Exception as e:
@@ -299,28 +685,35 @@ class RustTracker(commands.Cog):
         # value is typically True/False for switch/alarm state
         
         try:
-            device = await db.fetch_one("SELECT name, type FROM rust_smart_devices WHERE guild_id = %s AND entity_id = %s", guild_id, event.entityId)
+            registry = await self._get_device_registry(guild_id)
+            device = registry.get(event.entityId)
             
             if device:
-                name = device["name"]
-                dtype = device["type"]
+                name = device.name
+                dtype = device.type
                 state = event.value
                 
                 msg = None
+                priority = PRIORITY_INFO
+                coalesce_key = None
+                item = name
                 if dtype == "alarm":
                     if state:
                         msg = f"🚨 **SMART ALARM TRIGGERED**: {name}!"
+                        priority, coalesce_key = PRIORITY_ALARM, "alarm"
                     else:
                         msg = f"✅ Smart Alarm Cleared: {name}"
+                        priority, coalesce_key = PRIORITY_EVENT, "alarm_clear"
                 elif dtype == "switch":
                     status = "ON" if state else "OFF"
                     msg = f"🔌 Switch **{name}** turned **{status}**."
+                    priority, coalesce_key, item = PRIORITY_SWITCH, "switch", f"**{name}** {status}"
                 elif dtype == "storage":
                      # Monitor Storage monitor?
                      msg = f"📦 Storage Monitor **{name}**: {state}"
                 
                 if msg:
-                     await self._notify_tracking_channels(guild_id, msg)
+                     await self._notify_tracking_channels(guild_id, msg, priority, coalesce_key=coalesce_key, item=item)
                      
         except Exception as e:
             log.error(f"Error handling entity event: {e}")
@@ -399,6 +792,8 @@ class RustTracker(commands.Cog):
             VALUES (%s, %s)
             ON DUPLICATE KEY UPDATE battlemetrics_server_id = VALUES(battlemetrics_server_id)
         """, interaction.guild_id, server_id)
+        await self.guild_configs.invalidate(interaction.guild_id)
+        self.bm_poller.refresh()
         
         # Also update legacy table for compatibility if needed, or migration?
         # The existing code used `rust_tracking_channels`. 
@@ -407,12 +802,25 @@ class RustTracker(commands.Cog):
         
         await interaction.response.send_message(f"✅ BattleMetrics ID set to `{server_id}`.", ephemeral=True)
 
-    async def _reload_monitor(self, guild_id: int):
+    async def _get_device_registry(self, guild_id: int) -> DeviceRegistry:
+        registry = self.devices.get(guild_id)
+        if registry is None:
+            rows = await db.fetch_all("SELECT entity_id, name, type FROM rust_smart_devices WHERE guild_id = %s", guild_id)
+            registry = DeviceRegistry.from_rows(rows)
+            self.devices[guild_id] = registry
+        return registry
+
+    async def _reload_monitor(self, guild_id: int, row: Optional[dict] = None):
         if guild_id in self.monitors:
             await self.monitors[guild_id].stop()
             del self.monitors[guild_id]
+        self.rosters.pop(guild_id, None)
+        self.marker_trackers.pop(guild_id, None)
+        self.vending.pop(guild_id, None)
+        self.listing_index.pop(guild_id, None)
             
-        row = await db.fetch_one("SELECT * FROM rust_server_configs WHERE guild_id = %s", guild_id)
+        if row is None:
+            row = await db.fetch_one("SELECT * FROM rust_server_configs WHERE guild_id = %s", guild_id)
         if row and row["server_ip"] and row["player_token"]:
              monitor = RustMonitor(
                  guild_id=guild_id,
@@ -420,15 +828,24 @@ class RustTracker(commands.Cog):
                  port=row["server_port"],
                  player_id=row["player_id"],
                  player_token=row["player_token"],
-                 event_callback=lambda t, d: self._handle_monitor_event(t, d, guild_id)
+                 event_callback=lambda t, d: self._handle_monitor_event(t, d, guild_id),
+                 scheduler=self.poll_scheduler,
+                 connect_limiter=self.connect_limiter
              )
              self.monitors[guild_id] = monitor
+             # Device registry is (re)loaded once per monitor start
+             self.devices.pop(guild_id, None)
+             await self._get_device_registry(guild_id)
              self.bot.loop.create_task(monitor.start())
 
     async def _load_monitors(self):
         rows = await db.fetch_all("SELECT * FROM rust_server_configs WHERE server_ip IS NOT NULL")
+        # Shuffle so guilds sharing a Rust server aren't started back-to-back
+        rows = list(rows)
+        random.shuffle(rows)
         for row in rows:
-            await self._reload_monitor(row["guild_id"])
+            await self._reload_monitor(row["guild_id"], row)
+            await asyncio.sleep(random.uniform(0.5, 1.5) * MONITOR_START_INTERVAL)
 
     # --- Message Handlers (Deprecated/Removed) ---
     # The new Monitor system proactively fetches events.
@@ -461,12 +878,18 @@ class RustTracker(commands.Cog):
         name = self._normalize_name(name)
         
         await db.execute("""
-            INSERT INTO rust_players (guild_id, name, is_online, last_seen, is_teammate)
-            VALUES (%s, %s, %s, %s, COALESCE(%s, FALSE))
+            INSERT INTO rust_players (guild_id, name, normalized_name, is_online, last_seen, is_teammate)
+            VALUES (%s, %s, %s, %s, %s, COALESCE(%s, FALSE))
             ON DUPLICATE KEY UPDATE 
                 name = VALUES(name),
+                normalized_name = VALUES(normalized_name),
                 is_teammate = IF(%s IS NOT NULL, %s, is_teammate)
-        """, guild_id, name, False, None, is_teammate, is_teammate, is_teammate) # Don't update last_seen/online status, just ensure existence
+        """, guild_id, name, name, False, None, is_teammate, is_teammate, is_teammate) # Don't update last_seen/online status, just ensure existence
+        
+        if not self.identity.resolve(guild_id, name):
+            player = await db.fetch_one("SELECT id FROM rust_players WHERE guild_id = %s AND name = %s", guild_id, name)
+            if player:
+                await self.identity.register(guild_id, player["id"], name)
         
         log.info(f"Rust Tracker: Pre-registered player '{name}' in guild {guild_id}")
 
@@ -515,9 +938,9 @@ class RustTracker(commands.Cog):
         
         # 2. Reset cursor for this channel
         # Ensure channel is set up
-        config = await db.fetch_one("SELECT channel_id FROM rust_tracking_channels WHERE guild_id = %s", interaction.guild_id)
-        if config:
-            channel_id = config["channel_id"]
+        config = await self.guild_configs.get(interaction.guild_id)
+        if config.channel_ids:
+            channel_id = config.channel_ids[0]
             await db.execute("UPDATE rust_tracking_channels SET last_scanned_message_id = %s WHERE guild_id = %s", snowflake, interaction.guild_id)
             
             await interaction.followup.send(f"<:jeffthelandsharkabsolutecinema:1438791420260384848> Wipe time set to {wipe_date.strftime('%Y-%m-%d %H:%M:%S')} UTC.\n🔄 Started retrospective scan from that date...")
@@ -591,18 +1014,33 @@ class RustTracker(commands.Cog):
         log.info(f"Rust Market: Logged {len(listings)} items for shop '{shop_name}' in guild {guild_id}")
 
     def _normalize_name(self, name: str) -> str:
+        """Normalize a player name for consistent matching (clan tags and 'Player ' prefix removed, lowercased)."""
+        return normalize_name(name)
+
+    async def _find_player(self, guild_id: int, term: str) -> Optional[Dict[str, Any]]:
         """
-        Normalize a player name for consistent matching.
-        Removes clan tags [TAG] and 'Player ' prefix, trims whitespace, and converts to lowercase.
+        Look a player up by (partial) name: exact name or known alias, then prefix on the
+        indexed normalized_name, then a substring/trigram match against every name seen.
         """
-        # 1. Remove [TAG] or [TAG] patterns
-        name = re.sub(r"\[.*?\]", "", name)
-        
-        # 2. Remove "Player " prefix (case insensitive)
-        # ^ matches start of string (after previous strip/sub)
-        name = re.sub(r"^player\s+", "", name.strip(), flags=re.IGNORECASE)
-        
-        return name.strip().lower()
+        identity = self.identity.resolve(guild_id, term)
+        if identity:
+            player = await db.fetch_one("SELECT * FROM rust_players WHERE id = %s", identity.player_id)
+            if player:
+                return player
+
+        key = self._normalize_name(term)
+        if key:
+            prefix = key.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+            player = await db.fetch_one("""
+                SELECT * FROM rust_players WHERE guild_id = %s AND normalized_name LIKE %s ORDER BY last_seen DESC LIMIT 1
+            """, guild_id, prefix)
+            if player:
+                return player
+
+        identity = self.identity.search(guild_id, term)
+        if identity:
+            return await db.fetch_one("SELECT * FROM rust_players WHERE id = %s", identity.player_id)
+        return None
 
     @app_commands.command(name="rust_deduplicate", description="Merge duplicate players (e.g. 'Player X' -> 'X') (Admin).")
     @app_commands.checks.has_permissions(administrator=True)
@@ -642,7 +1080,10 @@ class RustTracker(commands.Cog):
                     # 1. Update Sessions
                     await db.execute("UPDATE rust_sessions SET player_id = %s WHERE player_id = %s", target_id, source_id)
                     
-                    # 2. Delete Source Player
+                    # 2. Keep the old name and ids resolving to the target
+                    await self.identity.merge(source_id, target_id)
+                    
+                    # 3. Delete Source Player
                     await db.execute("DELETE FROM rust_players WHERE id = %s", source_id)
                     
                     merged_count += 1
@@ -651,10 +1092,11 @@ class RustTracker(commands.Cog):
                     source_id = p["id"]
                     log.info(f"Rust Dedup: Renaming '{name}' -> '{target_name}'")
                     
-                    await db.execute("UPDATE rust_players SET name = %s WHERE id = %s", target_name, source_id)
+                    await db.execute("UPDATE rust_players SET name = %s, normalized_name = %s WHERE id = %s", target_name, self._normalize_name(target_name), source_id)
                     
                 duplicates_found += 1
                 
+        await self.identity.load_guild(guild_id)
         await interaction.followup.send(f"<:jeffthelandsharkabsolutecinema:1438791420260384848> Deduplication complete.\nProcessed: {duplicates_found}\nMerged: {merged_count}\nRenamed: {duplicates_found - merged_count}")
 
     @app_commands.command(name="rust_merge_players", description="Manually merge Player A into Player B (Admin).")
@@ -700,8 +1142,12 @@ class RustTracker(commands.Cog):
         await db.execute("UPDATE rust_economy_transactions SET buyer_name = %s WHERE guild_id = %s AND buyer_name = %s", target["name"], interaction.guild_id, source["name"])
         await db.execute("UPDATE rust_economy_transactions SET seller_name = %s WHERE guild_id = %s AND seller_name = %s", target["name"], interaction.guild_id, source["name"])
         
-        # 3. Delete Source
+        # 3. Old name and ids now resolve to the target
+        await self.identity.merge(source_id, target_id)
+        
+        # 4. Delete Source
         await db.execute("DELETE FROM rust_players WHERE id = %s", source_id)
+        await self.identity.load_guild(interaction.guild_id)
         
         await interaction.followup.send(f"<:jeffthelandsharkabsolutecinema:1438791420260384848> Merged **{source['name']}** into **{target['name']}**.\nSessions and transactions transferred.")
 
@@ -716,6 +1162,17 @@ class RustTracker(commands.Cog):
         bm_status = "Disconnected"
         if self.bm_client:
             bm_status = "Active" # BM client is stateless http usually, but we assume it's up.
+            state = self.bm_poller.status_for_guild(guild_id)
+            if state:
+                age = f"`{state.staleness:.0f}s` old" if state.staleness is not None else "not fetched yet"
+                bm_status += f"\nData: {age}, polling every `{state.interval:.0f}s` (pop `{state.population if state.population is not None else '?'}`)"
+                if state.last_error:
+                    bm_status += f"\nLast Error: `{state.last_error[:100]}`"
+            cache = self.bm_client.get_stats()
+            bm_status += f"\nCache: players `{cache['players']['hits']}` hits / `{cache['players']['misses']}` fetches, info `{cache['info']['hits']}` hits / `{cache['info']['misses']}` fetches"
+            last = self.reconciler.last.get(guild_id)
+            if last:
+                bm_status += f"\nLast Reconcile: <t:{int(last.finished_at.timestamp())}:R> — `{last.corrections}` corrections in `{last.duration * 1000:.0f}ms`"
             
         rp_status = "Not Configured"
         rp_details = ""
@@ -732,6 +1189,17 @@ class RustTracker(commands.Cog):
                  rp_status = "Stopped 🔴"
                  
             rp_details = f"\nIP: `{monitor.server_ip}:{monitor.port}`"
+            
+            lag = self.poll_scheduler.get_lag(guild_id)
+            if lag is not None:
+                rp_details += f"\nPoll Lag: `{lag:.1f}s`"
+            rp_details += f"\nNo-op Polls Suppressed: `{monitor.differ.suppressed}`"
+            
+            q = monitor.events.get_stats()
+            rp_details += f"\nEvent Queue: `{q['depth']}` queued (oldest `{q['oldest_age']:.1f}s`, max wait `{q['max_age']:.1f}s`, dropped `{q['dropped']}`, coalesced `{q['coalesced']}`)"
+            
+            for endpoint, stats in monitor.latency.summary().items():
+                rp_details += f"\n{endpoint}: p50 `{stats['p50'] * 1000:.0f}ms` / p95 `{stats['p95'] * 1000:.0f}ms` ({stats['timeouts']} timeouts)"
         
         # Check DB config
         config = await db.fetch_one("SELECT * FROM rust_server_configs WHERE guild_id = %s", guild_id)
@@ -742,9 +1210,24 @@ class RustTracker(commands.Cog):
         embed.add_field(name="BattleMetrics Poller", value=f"Status: **{bm_status}**", inline=False)
         embed.add_field(name="Database Config", value=db_status, inline=False)
         
+        offload_lines = [
+            f"{label}: {s['calls']}x, off-loop `{s['off_loop']:.2f}s` (queued `{s['queued']:.2f}s`), on-loop `{s['on_loop']:.2f}s`"
+            for label, s in self.offload.get_stats().items()
+        ]
+        if offload_lines:
+            embed.add_field(name="Off-loop Work", value="\n".join(offload_lines)[:1024], inline=False)
+        
+        report = self.retention.last_report
+        if report:
+            embed.add_field(name="Retention", value=f"Last run <t:{int(report.started_at.timestamp())}:R>: reclaimed `{report.total}` rows in `{report.duration:.1f}s`", inline=False)
+        
+        if self.notifier:
+            coalesced = sum(self.notifier.coalesced.values())
+            embed.add_field(name="Notifications", value=f"Sent: `{self.notifier.sent}` | Queued: `{self.notifier.queued()}` | Coalesced: `{coalesced}`", inline=False)
+        
         await interaction.followup.send(embed=embed)
 
-    async def _update_player_activity(self, guild_id: int, raw_name: str, is_joining: bool, timestamp: datetime.datetime, is_teammate: Optional[bool] = None):
+    async def _update_player_activity(self, guild_id: int, raw_name: str, is_joining: bool, timestamp: datetime.datetime, is_teammate: Optional[bool] = None, steam_id: Optional[int] = None, bm_id: Optional[int] = None):
         # Normalize name for lookup, but keep raw_name for display updates if needed
         # Actually, if we want to store the "canonical" name, maybe we update it to the latest seen raw_name?
         # User goal: "If they join as [CLAN] Jeff, it might create a duplicate... Fix: Normalize names before DB insertion/lookup."
@@ -787,6 +1270,12 @@ class RustTracker(commands.Cog):
         
         name = self._normalize_name(raw_name) # Ensure consistent casing and stripping
 
+        # A known steam/BattleMetrics id or a previously seen name maps to the existing row,
+        # whatever name they're playing under now
+        identity = await self.identity.observe(guild_id, raw_name, steam_id, bm_id, timestamp)
+        if identity:
+            name = identity.name
+
         # Zombie Session Heuristic
         # If joining, check previous state.
         if is_joining:
@@ -829,18 +1318,20 @@ class RustTracker(commands.Cog):
         
         # UPSERT Player
         await db.execute("""
-            INSERT INTO rust_players (guild_id, name, is_online, last_seen, is_teammate)
-            VALUES (%s, %s, %s, %s, COALESCE(%s, FALSE))
+            INSERT INTO rust_players (guild_id, name, normalized_name, is_online, last_seen, is_teammate)
+            VALUES (%s, %s, %s, %s, %s, COALESCE(%s, FALSE))
             ON DUPLICATE KEY UPDATE
                 is_online = %s,
                 last_seen = %s,
                 is_teammate = IF(%s IS NOT NULL, %s, is_teammate)
-        """, guild_id, name, is_joining, timestamp, is_teammate, is_joining, timestamp, is_teammate, is_teammate)
+        """, guild_id, name, self._normalize_name(name), is_joining, timestamp, is_teammate, is_joining, timestamp, is_teammate, is_teammate)
 
         player = await db.fetch_one("SELECT id FROM rust_players WHERE guild_id = %s AND name = %s", guild_id, name)
         if not player:
             return
         player_id = player["id"]
+        if not identity:
+            await self.identity.register(guild_id, player_id, name, steam_id, bm_id)
 
         # Session Management
         if is_joining:
@@ -874,6 +1365,7 @@ class RustTracker(commands.Cog):
             (guild_id, buyer_name, seller_name, quantity, cost_item, cost_amount, timestamp)
             VALUES (%s, %s, %s, %s, %s, %s, %s)
         """, guild_id, sender, receiver, 1, currency, amount, timestamp)
+        await self.economy.record(guild_id, await self._get_wipe_time(guild_id), None, currency, 1, amount, timestamp)
         log.info(f"Rust Economy: {sender} sent {amount} {currency} to {receiver}")
 
     async def _process_vending(self, guild_id: int, match: re.Match, timestamp: datetime.datetime):
@@ -890,17 +1382,32 @@ class RustTracker(commands.Cog):
             (guild_id, buyer_name, seller_name, item_name, quantity, cost_item, cost_amount, timestamp)
             VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
         """, guild_id, buyer, shop, item, quantity, currency, cost, timestamp)
+        await self.economy.record(guild_id, await self._get_wipe_time(guild_id), item, currency, quantity, cost, timestamp)
         log.info(f"Rust Economy: {buyer} bought {quantity} {item} from {shop} for {cost} {currency}")
 
+    async def _backfill_economy_rollups(self):
+        # One-time: build rollups from transactions recorded before they existed
+        try:
+            if await db.fetch_one("SELECT 1 FROM rust_economy_hourly LIMIT 1"):
+                return
+            rows = await db.fetch_all("SELECT DISTINCT guild_id FROM rust_economy_transactions")
+            for row in rows:
+                await self.economy.rebuild_hourly(row["guild_id"])
+                await self.economy.rebuild_wipe(row["guild_id"], await self._get_wipe_time(row["guild_id"]))
+            if rows:
+                log.info(f"Rust Economy: Backfilled rollups for {len(rows)} guilds")
+        except Exception as e:
+            log.error(f"Rust Economy: Rollup backfill failed: {e}")
+
     async def _has_economy_access(self, interaction: discord.Interaction) -> bool:
         # Check if admin
         if interaction.user.guild_permissions.administrator:
             return True
             
         # Check permissions role
-        config = await db.fetch_one("SELECT manager_role_id FROM rust_economy_config WHERE guild_id = %s", interaction.guild_id)
-        if config and config["manager_role_id"]:
-            role = interaction.guild.get_role(config["manager_role_id"])
+        config = await self.guild_configs.get(interaction.guild_id)
+        if config.manager_role_id:
+            role = interaction.guild.get_role(config.manager_role_id)
             if role and role in interaction.user.roles:
                 return True
                 
@@ -908,18 +1415,12 @@ class RustTracker(commands.Cog):
 
     async def _update_wipe_time(self, guild_id: int, timestamp: datetime.datetime):
         await db.execute("UPDATE rust_tracking_channels SET last_wipe_at = %s WHERE guild_id = %s", timestamp, guild_id)
+        await self.guild_configs.invalidate(guild_id)
+        await self.economy.rebuild_wipe(guild_id, timestamp)
 
     async def _get_wipe_time(self, guild_id: int) -> Optional[datetime.datetime]:
-        row = await db.fetch_one("SELECT last_wipe_at FROM rust_tracking_channels WHERE guild_id = %s", guild_id)
-        if row and row["last_wipe_at"]:
-            wipe_at = row["last_wipe_at"]
-            if isinstance(wipe_at, str):
-                try:
-                    wipe_at = datetime.datetime.fromisoformat(str(wipe_at))
-                except ValueError:
-                    return None
-            return wipe_at
-        return None
+        config = await self.guild_configs.get(guild_id)
+        return config.wipe_at
 
     # Commands
 
@@ -933,6 +1434,7 @@ class RustTracker(commands.Cog):
         """, interaction.guild_id, interaction.channel_id, interaction.channel_id)
         
         self.tracking_channels.add(interaction.channel_id)
+        await self.guild_configs.invalidate(interaction.guild_id)
         await interaction.response.send_message(f"<:jeffthelandsharkabsolutecinema:1438791420260384848> Rust tracking enabled in {interaction.channel.mention}.")
 
     @app_commands.command(name="rust_unsetup", description="Disable Rust tracking in the current channel and clear data.")
@@ -962,6 +1464,7 @@ class RustTracker(commands.Cog):
 
             # 2. Clear all associated data for this guild
             await db.execute("DELETE FROM rust_economy_transactions WHERE guild_id = %s", guild_id)
+            await self.economy.clear(guild_id)
             await db.execute("DELETE FROM rust_market_listings WHERE guild_id = %s", guild_id)
             await db.execute("DELETE FROM rust_economy_config WHERE guild_id = %s", guild_id)
             
@@ -973,6 +1476,9 @@ class RustTracker(commands.Cog):
             
             # Delete players
             await db.execute("DELETE FROM rust_players WHERE guild_id = %s", guild_id)
+            await self.identity.load_guild(guild_id)
+            
+            await self.guild_configs.invalidate(guild_id)
 
             await interaction.followup.send(f"<:jeffthelandsharkabsolutecinema:1438791420260384848> Rust tracking disabled in {interaction.channel.mention} and all data cleared.")
             log.info(f"Rust unsetup and data cleared for guild {guild_id} by {interaction.user}")
@@ -990,7 +1496,8 @@ class RustTracker(commands.Cog):
         
         await interaction.response.defer()
         try:
-             info = await monitor.socket.get_info()
+             snapshot = await monitor.get_snapshot("server_info")
+             info = snapshot.data
              # Info has: players, max_players, queued_players, seed, map_size, url, header_image_url, name
              
              embed = discord.Embed(title=info.name or "Rust Server Info", color=discord.Color.green())
@@ -1001,6 +1508,7 @@ class RustTracker(commands.Cog):
              embed.add_field(name="Queued", value=str(info.queued_players), inline=True)
              embed.add_field(name="Map", value=f"Size: {info.map_size}\nSeed: {info.seed}", inline=True)
              embed.add_field(name="URL", value=info.url or "N/A", inline=False)
+             embed.set_footer(text=f"Updated {int(snapshot.age)}s ago")
              
              await interaction.followup.send(embed=embed)
         except Exception as e:
@@ -1014,11 +1522,45 @@ class RustTracker(commands.Cog):
              return
              
         try:
-             data = await monitor.socket.get_time()
+             data = (await monitor.get_snapshot("time")).data
              await interaction.response.send_message(f"🕰️ **Game Time**: {data.time}")
         except Exception as e:
              await interaction.response.send_message(f"❌ Failed to fetch time: {e}", ephemeral=True)
 
+    @app_commands.command(name="rust_events", description="Show active map events and how long recent ones lasted.")
+    async def rust_events(self, interaction: discord.Interaction):
+        await interaction.response.defer()
+        guild_id = interaction.guild_id
+        now = datetime.datetime.now(datetime.timezone.utc)
+        
+        embed = discord.Embed(title="Rust Map Events", color=discord.Color.orange())
+        
+        tracker = self.marker_trackers.get(guild_id)
+        active = []
+        for m in (tracker.active() if tracker else []):
+            label = MARKER_LABELS.get(m.type)
+            if label:
+                age = "since before tracking started" if m.partial else f"out for {self._format_duration(now - m.first_seen)}"
+                active.append(f"**{label}** — {age}")
+        embed.add_field(name="Active", value="\n".join(active)[:1024] if active else "No events on the map.", inline=False)
+        
+        rows = await db.fetch_all("""
+            SELECT marker_type, COUNT(*) as total, AVG(duration_seconds) as avg_duration
+            FROM rust_marker_lifetimes
+            WHERE guild_id = %s
+            GROUP BY marker_type
+        """, guild_id)
+        history = []
+        for row in rows:
+            label = MARKER_LABELS.get(row["marker_type"])
+            if label:
+                avg = self._format_duration(datetime.timedelta(seconds=float(row["avg_duration"] or 0)))
+                history.append(f"**{label}**: {row['total']}x, avg `{avg}`")
+        if history:
+            embed.add_field(name="History", value="\n".join(history)[:1024], inline=False)
+        
+        await interaction.followup.send(embed=embed)
+
     @app_commands.command(name="rust_team", description="Get current team info.")
     async def rust_team(self, interaction: discord.Interaction):
         monitor = self.monitors.get(interaction.guild_id)
@@ -1028,7 +1570,8 @@ class RustTracker(commands.Cog):
              
         await interaction.response.defer()
         try:
-             team = await monitor.socket.get_team_info()
+             snapshot = await monitor.get_snapshot("team_info")
+             team = snapshot.data
              # TeamInfo: leader_steam_id, members [TeamMember: steam_id, name, x, y, is_online, spawn_time, is_alive, death_time]
              
              embed = discord.Embed(title="Team Status", color=discord.Color.blue())
@@ -1054,7 +1597,7 @@ class RustTracker(commands.Cog):
              if offline_list:
                  embed.add_field(name=f"Offline ({len(offline_list)})", value="\n".join(offline_list), inline=False)
                  
-             embed.set_footer(text=f"Leader ID: {team.leader_steam_id}")
+             embed.set_footer(text=f"Leader ID: {team.leader_steam_id} • Updated {int(snapshot.age)}s ago")
              await interaction.followup.send(embed=embed)
              
         except Exception as e:
@@ -1082,6 +1625,10 @@ class RustTracker(commands.Cog):
                 ON DUPLICATE KEY UPDATE name = VALUES(name), type = VALUES(type)
             """, interaction.guild_id, eid, name, type.lower())
             
+            # Write-through to the in-memory registry
+            registry = await self._get_device_registry(interaction.guild_id)
+            registry.upsert(SmartDevice(eid, name, type.lower()))
+            
             await interaction.response.send_message(f"✅ Paired **{type}** '{name}' (ID: {eid}).")
         except ValueError:
             await interaction.response.send_message("❌ Entity ID must be a number.", ephemeral=True)
@@ -1094,34 +1641,29 @@ class RustTracker(commands.Cog):
              await interaction.response.send_message("❌ Rust Monitor not active.", ephemeral=True)
              return
 
-        device = await db.fetch_one("SELECT entity_id FROM rust_smart_devices WHERE guild_id = %s AND name = %s AND type = 'switch'", interaction.guild_id, name)
-        
-        if not device:
-             # Try fuzzy search?
-             device = await db.fetch_one("SELECT entity_id FROM rust_smart_devices WHERE guild_id = %s AND name LIKE %s AND type = 'switch'", interaction.guild_id, f"%{name}%")
+        registry = await self._get_device_registry(interaction.guild_id)
+        device = registry.find(name, "switch") # Exact, then partial name match
              
         if not device:
              await interaction.response.send_message(f"❌ Smart Switch '{name}' not found. Pair it first with `/rust_pair`.", ephemeral=True)
              return
              
-        eid = device["entity_id"]
+        eid = device.entity_id
         
         await interaction.response.defer()
         try:
             if state:
-                await monitor.socket.turn_on_smart_switch(eid)
+                await monitor.request("turn_on_smart_switch", eid, priority=PRIORITY_COMMAND)
                 await interaction.followup.send(f"🟢 Turned **ON** switch '{name}'.")
             else:
-                await monitor.socket.turn_off_smart_switch(eid)
+                await monitor.request("turn_off_smart_switch", eid, priority=PRIORITY_COMMAND)
                 await interaction.followup.send(f"🔴 Turned **OFF** switch '{name}'.")
         except Exception as e:
             await interaction.followup.send(f"❌ Failed to toggle switch: {e}")
 
     @app_commands.command(name="rust_predict", description="Predict when an offline player will return.")
     async def rust_predict(self, interaction: discord.Interaction, player_name: str):
-        player = await db.fetch_one("""
-            SELECT * FROM rust_players WHERE guild_id = %s AND name = %s
-        """, interaction.guild_id, player_name)
+        player = await self._find_player(interaction.guild_id, player_name)
 
         if not player:
             await interaction.response.send_message(f"No data found for player '{player_name}'.", ephemeral=True)
@@ -1241,6 +1783,78 @@ class RustTracker(commands.Cog):
 
     # Economy Commands
     
+    rust_watch = app_commands.Group(name="rust_watch", description="Get alerted when an item is sold below a price.")
+
+    @rust_watch.command(name="add", description="Alert me when an item is sold at or below a price per unit.")
+    async def watch_add(self, interaction: discord.Interaction, item_name: str, max_price: float, currency: str = "Scrap", dm: bool = False):
+        if max_price <= 0:
+            await interaction.response.send_message("❌ Max price must be positive.", ephemeral=True)
+            return
+        if len(self.price_watches.for_user(interaction.guild_id, interaction.user.id)) >= MAX_WATCHES_PER_USER:
+            await interaction.response.send_message(f"❌ You already have {MAX_WATCHES_PER_USER} watches. Remove one first.", ephemeral=True)
+            return
+        
+        # Alerts compare against listing names, so store a real item name
+        candidates = self._item_candidates(interaction.guild_id, item_name)
+        if not candidates and not len(item_index()):
+            candidates = [item_name.strip()] # No item table configured; can only trust the input
+        if not candidates:
+            await interaction.response.send_message(f"❌ No item matching `{item_name}`. Check the name (e.g. as shown by `/rust_shop_search`).", ephemeral=True)
+            return
+        item = candidates[0]
+        currencies = self._item_candidates(interaction.guild_id, currency)
+        currency = currencies[0] if currencies else currency.strip()
+        
+        await db.execute("""
+            INSERT INTO rust_price_watches (guild_id, user_id, item_name, max_unit_price, cost_item, dm)
+            VALUES (%s, %s, %s, %s, %s, %s)
+        """, interaction.guild_id, interaction.user.id, item, max_price, currency, dm)
+        row = await db.fetch_one("""
+            SELECT * FROM rust_price_watches WHERE guild_id = %s AND user_id = %s ORDER BY id DESC LIMIT 1
+        """, interaction.guild_id, interaction.user.id)
+        
+        # Write-through to the in-memory index
+        self.price_watches.add(PriceWatch(row["id"], row["guild_id"], row["user_id"], row["item_name"], float(row["max_unit_price"]), row["cost_item"], bool(row["dm"])))
+        
+        where = "by DM" if dm else "in the tracking channels"
+        msg = f"✅ Watching **{item}** at ≤ {max_price:g} {currency} each (ID: {row['id']}). You'll be alerted {where}."
+        if item.lower() != item_name.strip().lower():
+            msg += f"\nMatched `{item_name}` to **{item}**."
+            if len(candidates) > 1:
+                msg += f" Other matches: {', '.join(candidates[1:4])}"
+        await interaction.response.send_message(msg, ephemeral=True)
+
+    def _item_candidates(self, guild_id: int, term: str) -> List[str]:
+        """Item names matching term, best first: exact, then items on sale in the guild, then every known item."""
+        candidates: List[str] = []
+        for index in (self.listing_index.get(guild_id), item_index()):
+            if index:
+                for name in index.search(term, limit=5):
+                    if name not in candidates:
+                        candidates.append(name)
+        key = term.strip().lower()
+        candidates.sort(key=lambda name: name.lower() != key) # Stable: keeps search order otherwise
+        return candidates
+
+    @rust_watch.command(name="list", description="List your price watches.")
+    async def watch_list(self, interaction: discord.Interaction):
+        watches = self.price_watches.for_user(interaction.guild_id, interaction.user.id)
+        if not watches:
+            await interaction.response.send_message("You have no price watches. Add one with `/rust_watch add`.", ephemeral=True)
+            return
+        lines = [f"`{w.watch_id}` **{w.item_name}** ≤ {w.max_unit_price:g} {w.cost_item}{' (DM)' if w.dm else ''}" for w in watches]
+        await interaction.response.send_message("\n".join(lines), ephemeral=True)
+
+    @rust_watch.command(name="remove", description="Remove one of your price watches.")
+    async def watch_remove(self, interaction: discord.Interaction, watch_id: int):
+        watch = next((w for w in self.price_watches.for_user(interaction.guild_id, interaction.user.id) if w.watch_id == watch_id), None)
+        if not watch:
+            await interaction.response.send_message(f"❌ Watch `{watch_id}` not found.", ephemeral=True)
+            return
+        await db.execute("DELETE FROM rust_price_watches WHERE id = %s", watch_id)
+        self.price_watches.remove(watch_id)
+        await interaction.response.send_message(f"🗑️ Removed watch for **{watch.item_name}**.", ephemeral=True)
+
     rust_economy = app_commands.Group(name="rust_economy", description="Manage and view Rust economy stats.")
 
     @rust_economy.command(name="set_role", description="Set the role allowed to view economy stats.")
@@ -1251,6 +1865,7 @@ class RustTracker(commands.Cog):
             VALUES (%s, %s)
             ON DUPLICATE KEY UPDATE manager_role_id = %s
         """, interaction.guild_id, role.id, role.id)
+        await self.guild_configs.invalidate(interaction.guild_id)
         await interaction.response.send_message(f"<:jeffthelandsharkabsolutecinema:1438791420260384848> Economy manager role set to: {role.mention}")
 
     @rust_economy.command(name="stats", description="View economy statistics.")
@@ -1261,25 +1876,11 @@ class RustTracker(commands.Cog):
 
         wipe_at = await self._get_wipe_time(interaction.guild_id)
         
-        query = """
-            SELECT item_name, SUM(quantity) as total_sold, SUM(cost_amount) as total_volume, cost_item
-            FROM rust_economy_transactions
-            WHERE guild_id = %s AND item_name IS NOT NULL
-        """
-        params = [interaction.guild_id]
+        # Simple Stats: Top Traded Items (pre-aggregated per wipe)
+        top_items = await self.economy.top_items(interaction.guild_id, wipe_at, limit=5)
         
-        if wipe_at:
-            query += " AND timestamp >= %s"
-            params.append(wipe_at)
-            
-        query += """
-            GROUP BY item_name, cost_item
-            ORDER BY total_volume DESC
-            LIMIT 5
-        """
-
-        # Simple Stats: Top Traded Items
-        top_items = await db.fetch_all(query, *params)
+        since = datetime.datetime.now(datetime.timezone.utc) - datetime.timedelta(hours=24)
+        recent = await self.economy.hourly(interaction.guild_id, since)
 
         embed = discord.Embed(title="Rust Economy Stats", color=discord.Color.gold())
         
@@ -1293,6 +1894,11 @@ class RustTracker(commands.Cog):
             embed.add_field(name="Top Traded Items", value="\n".join(lines), inline=False)
         else:
             embed.description = "No transaction data recorded yet."
+        
+        if recent:
+            trades = sum(int(row["trades"]) for row in recent)
+            busiest = max(recent, key=lambda row: row["trades"])
+            embed.add_field(name="Last 24h", value=f"{trades} trades | Busiest hour: <t:{int(busiest['hour_start'].replace(tzinfo=datetime.timezone.utc).timestamp())}:t>", inline=False)
 
         await interaction.response.send_message(embed=embed)
 
@@ -1369,73 +1975,49 @@ class RustTracker(commands.Cog):
         """Find active listings for a specific item."""
         await interaction.response.defer()
         
-        # We want the LATEST listing for each shop/item combo.
-        # But our table inserts historical data.
-        # We need to find listings from recent timestamps.
-        # Assumption: Vending machines broadcast every ~5-10 mins or on change.
-        # Let's filter by listings in the last 24 hours to be safe, 
-        # and then group by shop/cost to show unique offers.
-        
-        cutoff = datetime.datetime.now(datetime.timezone.utc) - datetime.timedelta(hours=24)
-        
-        query = """
-            SELECT shop_name, quantity, cost_amount, cost_item, stock, timestamp
-            FROM rust_market_listings
-            WHERE guild_id = %s 
-            AND item_name LIKE %s
-            AND timestamp > %s
-            ORDER BY timestamp DESC
-        """
-        # Fuzzy search
-        search_term = f"%{item_name}%"
-        
-        rows = await db.fetch_all(query, interaction.guild_id, search_term, cutoff)
+        # Resolve the search term against items currently on sale, then read only those live offers
+        index = self.listing_index.get(interaction.guild_id)
+        matches = index.search(item_name, limit=5) if index else []
         
-        if not rows:
-            await interaction.followup.send(f"🔍 No recent listings found for '{item_name}'.", ephemeral=True)
+        if not matches:
+            await interaction.followup.send(f"🔍 No current listings found for '{item_name}'.", ephemeral=True)
             return
-            
-        # Deduplicate: Keep latest per shop per cost_type
-        # (A shop might have multiple listings for same item but diff cost? rare but possible)
-        # Mainly we want latest status per shop.
         
-        unique_listings = {} # shop_name -> row
+        placeholders = ", ".join(["%s"] * len(matches))
+        rows = await db.fetch_all(f"""
+            SELECT shop_name, item_name, quantity, cost_amount, cost_item, stock, updated_at
+            FROM rust_current_listings
+            WHERE guild_id = %s AND item_name IN ({placeholders})
+        """, interaction.guild_id, *matches)
         
-        for row in rows:
-            shop = row["shop_name"]
-            if shop not in unique_listings:
-                unique_listings[shop] = row
-            # Since we ordered by timestamp DESC, the first one we see is the latest.
+        if not rows:
+            await interaction.followup.send(f"🔍 No current listings found for '{item_name}'.", ephemeral=True)
+            return
         
-        # Sort by best price? Hard to say what "best" is with different currencies.
-        # Let's just list them.
+        # Best match first, then in-stock offers, then cheapest per unit
+        rank = {name: i for i, name in enumerate(matches)}
+        rows = sorted(rows, key=lambda r: (rank.get(r["item_name"], len(rank)), r["stock"] <= 0, r["cost_amount"] / max(1, r["quantity"])))
         
-        embed = discord.Embed(title=f"🛒 Market Listings: {item_name}", color=discord.Color.green())
+        title = matches[0] if matches[0].lower() == item_name.strip().lower() else item_name
+        embed = discord.Embed(title=f"🛒 Market Listings: {title}", color=discord.Color.green())
         
-        if len(unique_listings) > 15:
-            embed.description = f"Found {len(unique_listings)} shops. Showing top 15 most recent."
+        if len(rows) > 15:
+            embed.description = f"Found {len(rows)} offers. Showing the best 15."
         
-        count = 0
-        for shop, row in unique_listings.items():
-            if count >= 15: break
-            
-            qty = row["quantity"]
-            cost = row["cost_amount"]
-            currency = row["cost_item"]
-            stock = row["stock"]
-            ts = row["timestamp"]
+        for row in rows[:15]:
+            ts = row["updated_at"]
             
             # UTC handling for timestamp display if needed
             if isinstance(ts, str): ts = datetime.datetime.fromisoformat(str(ts))
             if ts.tzinfo is None: ts = ts.replace(tzinfo=datetime.timezone.utc)
             ts_int = int(ts.timestamp())
             
+            name = row["shop_name"] if len(matches) == 1 else f"{row['shop_name']} — {row['item_name']}"
             embed.add_field(
-                name=shop,
-                value=f"**{qty}x** for **{cost} {currency}**\nStock: {stock} | <t:{ts_int}:R>",
+                name=name[:256],
+                value=f"**{row['quantity']}x** for **{row['cost_amount']} {row['cost_item']}**\nStock: {row['stock']} | <t:{ts_int}:R>",
                 inline=True
             )
-            count += 1
             
         await interaction.followup.send(embed=embed)
 
@@ -1461,6 +2043,7 @@ class RustTracker(commands.Cog):
             # 1. Clean Data
             log.info(f"Rust Refresh: Clearing data for guild {guild_id}")
             await db.execute("DELETE FROM rust_economy_transactions WHERE guild_id = %s", guild_id)
+            await self.economy.clear(guild_id)
             await db.execute("DELETE FROM rust_market_listings WHERE guild_id = %s", guild_id)
             
             # Subqueries delete syntax varies, safer to join or just two separate calls if possible.
@@ -1472,6 +2055,7 @@ class RustTracker(commands.Cog):
             """, guild_id)
             
             await db.execute("DELETE FROM rust_players WHERE guild_id = %s", guild_id)
+            await self.identity.load_guild(guild_id)
             
             # 2. Reset Cursor
             # If wipe date exists, use that as start point to save time/resources
@@ -1542,6 +2126,30 @@ class RustTracker(commands.Cog):
             
             wipe_at = await self._get_wipe_time(interaction.guild_id)
             
+            # Last 50 sessions of every offline player in one round trip
+            offline_ids = [p["id"] for p in players if not p["is_online"]]
+            start_times: Dict[int, list] = {}
+            if offline_ids:
+                placeholders = ", ".join(["%s"] * len(offline_ids))
+                rows = await db.fetch_all(f"""
+                    SELECT player_id, start_time FROM (
+                        SELECT player_id, start_time,
+                               ROW_NUMBER() OVER (PARTITION BY player_id ORDER BY start_time DESC) AS rn
+                        FROM rust_sessions
+                        WHERE player_id IN ({placeholders})
+                    ) recent
+                    WHERE rn <= 50
+                    ORDER BY player_id, start_time DESC
+                """, *offline_ids)
+                for row in rows:
+                    start_times.setdefault(row["player_id"], []).append(row["start_time"])
+            
+            # Predictions, status lines and field chunking are light; a worker thread keeps them off the loop
+            now = datetime.datetime.now(datetime.timezone.utc)
+            fields = await self.offload.run(
+                self._build_trackedplayers_fields, players, start_times, now, label="trackedplayers"
+            )
+            
             # Build embed
             embed = discord.Embed(
                 title=f"🎮 Tracked Rust Players ({len(players)} total)",
@@ -1551,77 +2159,9 @@ class RustTracker(commands.Cog):
             if wipe_at:
                 embed.set_footer(text=f"Data since wipe: {wipe_at.strftime('%Y-%m-%d %H:%M')}")
             
-            online_players = []
-            offline_players_with_predictions = []
-            offline_players_no_data = []
-            
-            # Process each player
-            for player in players:
-                player_id = player["id"]
-                name = player["name"]
-                is_online = player["is_online"]
-                last_seen = player["last_seen"]
-                
-                # Ensure last_seen is datetime
-                if last_seen and not isinstance(last_seen, datetime.datetime):
-                    try:
-                        last_seen = datetime.datetime.fromisoformat(str(last_seen))
-                    except:
-                        last_seen = None
-                
-                if is_online:
-                    online_players.append(f"🟢 **{name}**")
-                else:
-                    # Try to generate prediction
-                    prediction_text = await self._generate_prediction_text(player_id, last_seen, wipe_at)
-                    
-                    if prediction_text:
-                        offline_players_with_predictions.append(f"🔴 **{name}**\n   └ {prediction_text}")
-                    else:
-                        # No prediction data
-                        if last_seen:
-                            time_ago = datetime.datetime.now() - last_seen
-                            hours_ago = int(time_ago.total_seconds() // 3600)
-                            if hours_ago < 1:
-                                mins_ago = int(time_ago.total_seconds() // 60)
-                                offline_players_no_data.append(f"🔴 **{name}** - Last seen {mins_ago}m ago")
-                            else:
-                                offline_players_no_data.append(f"🔴 **{name}** - Last seen {hours_ago}h ago")
-                        else:
-                            offline_players_no_data.append(f"🔴 **{name}** - No data")
-            
-            # Add fields to embed (Discord has 25 field limit, 1024 char per field value)
-            if online_players:
-                # Split if too many
-                online_text = "\n".join(online_players)
-                if len(online_text) > 1024:
-                    # Chunk into multiple fields
-                    chunks = self._chunk_list(online_players, 1024)
-                    for idx, chunk in enumerate(chunks):
-                        field_name = f"Online ({len(online_players)})" if idx == 0 else "​"  # Zero-width space for continuation
-                        embed.add_field(name=field_name, value=chunk, inline=False)
-                else:
-                    embed.add_field(name=f"Online ({len(online_players)})", value=online_text, inline=False)
-            
-            if offline_players_with_predictions:
-                pred_text = "\n".join(offline_players_with_predictions)
-                if len(pred_text) > 1024:
-                    chunks = self._chunk_list(offline_players_with_predictions, 1024)
-                    for idx, chunk in enumerate(chunks):
-                        field_name = f"Offline (with predictions)" if idx == 0 else "​"
-                        embed.add_field(name=field_name, value=chunk, inline=False)
-                else:
-                    embed.add_field(name="Offline (with predictions)", value=pred_text, inline=False)
-            
-            if offline_players_no_data:
-                nodata_text = "\n".join(offline_players_no_data)
-                if len(nodata_text) > 1024:
-                    chunks = self._chunk_list(offline_players_no_data, 1024)
-                    for idx, chunk in enumerate(chunks):
-                        field_name = f"Offline (no prediction data)" if idx == 0 else "​"
-                        embed.add_field(name=field_name, value=chunk, inline=False)
-                else:
-                    embed.add_field(name="Offline (no prediction data)", value=nodata_text, inline=False)
+            # Discord has 25 field limit, 1024 char per field value
+            for field_name, value in fields:
+                embed.add_field(name=field_name, value=value, inline=False)
             
             await interaction.followup.send(embed=embed)
             
@@ -1654,24 +2194,25 @@ class RustTracker(commands.Cog):
             online_list = []
             offline_list = []
             
-            for p in players:
-                name = p["name"]
-                status = "🟢 Online" if p["is_online"] else "🔴 Offline"
+            with self.offload.on_loop("teammatelist"):
+                for p in players:
+                    name = p["name"]
+                    status = "🟢 Online" if p["is_online"] else "🔴 Offline"
                 
-                last_seen_str = ""
-                if p["last_seen"]:
-                    ls = p["last_seen"]
-                    if isinstance(ls, str): ls = datetime.datetime.fromisoformat(ls)
-                    if ls.tzinfo is None: ls = ls.replace(tzinfo=datetime.timezone.utc)
-                    ts = int(ls.timestamp())
-                    last_seen_str = f" (<t:{ts}:R>)"
+                    last_seen_str = ""
+                    if p["last_seen"]:
+                        ls = p["last_seen"]
+                        if isinstance(ls, str): ls = datetime.datetime.fromisoformat(ls)
+                        if ls.tzinfo is None: ls = ls.replace(tzinfo=datetime.timezone.utc)
+                        ts = int(ls.timestamp())
+                        last_seen_str = f" (<t:{ts}:R>)"
                 
-                entry = f"{status} **{name}**{last_seen_str}"
+                    entry = f"{status} **{name}**{last_seen_str}"
                 
-                if p["is_online"]:
-                    online_list.append(entry)
-                else:
-                    offline_list.append(entry)
+                    if p["is_online"]:
+                        online_list.append(entry)
+                    else:
+                        offline_list.append(entry)
             
             # Chunking
             if online_list:
@@ -1690,7 +2231,60 @@ class RustTracker(commands.Cog):
             log.error(f"Error in rust_teammatelist: {e}")
             await interaction.followup.send(f"❌ Error fetching teammate list: {e}", ephemeral=True)
     
-    def _chunk_list(self, items: List[str], max_length: int) -> List[str]:
+    @staticmethod
+    def _build_trackedplayers_fields(players: List[Dict], start_times: Dict[int, list], now: datetime.datetime) -> List[tuple]:
+        """CPU side of /rust_trackedplayers. Returns embed (name, value) fields. Light (<= 50 sessions per player); runs in the thread pool."""
+        online_players = []
+        offline_players_with_predictions = []
+        offline_players_no_data = []
+        
+        # Process each player
+        for player in players:
+            name = player["name"]
+            last_seen = player["last_seen"]
+            
+            # Ensure last_seen is datetime
+            if last_seen and not isinstance(last_seen, datetime.datetime):
+                try:
+                    last_seen = datetime.datetime.fromisoformat(str(last_seen))
+                except:
+                    last_seen = None
+            
+            if player["is_online"]:
+                online_players.append(f"🟢 **{name}**")
+                continue
+            
+            # Try to generate prediction from the 50 most recent sessions
+            prediction = RustTracker._predict_next_online(start_times.get(player["id"], [])[:50], now)
+            
+            if prediction:
+                offline_players_with_predictions.append(f"🔴 **{name}**\n   └ {RustTracker._format_prediction(prediction)}")
+            elif last_seen:
+                time_ago = datetime.datetime.now() - last_seen
+                hours_ago = int(time_ago.total_seconds() // 3600)
+                if hours_ago < 1:
+                    mins_ago = int(time_ago.total_seconds() // 60)
+                    offline_players_no_data.append(f"🔴 **{name}** - Last seen {mins_ago}m ago")
+                else:
+                    offline_players_no_data.append(f"🔴 **{name}** - Last seen {hours_ago}h ago")
+            else:
+                offline_players_no_data.append(f"🔴 **{name}** - No data")
+        
+        fields = []
+        sections = [
+            (f"Online ({len(online_players)})", online_players),
+            ("Offline (with predictions)", offline_players_with_predictions),
+            ("Offline (no prediction data)", offline_players_no_data),
+        ]
+        for title, lines in sections:
+            if not lines:
+                continue
+            for idx, chunk in enumerate(RustTracker._chunk_list(lines, 1024)):
+                fields.append((title if idx == 0 else "​", chunk))  # Zero-width space for continuation
+        return fields
+
+    @staticmethod
+    def _chunk_list(items: List[str], max_length: int) -> List[str]:
         """Split a list of strings into chunks that fit within max_length when joined."""
         chunks = []
         current_chunk = []
@@ -1716,7 +2310,10 @@ class RustTracker(commands.Cog):
         # Wrapper around _generate_prediction_data
         data = await self._generate_prediction_data(player_id, wipe_at)
         if not data: return None
-        
+        return self._format_prediction(data)
+
+    @staticmethod
+    def _format_prediction(data: tuple) -> str:
         predicted_return, time_until, confidence = data
         ts = int(predicted_return.timestamp())
         
@@ -1736,13 +2333,7 @@ class RustTracker(commands.Cog):
         await interaction.response.defer()
         
         # 1. Fuzzy Find Player
-        query = """
-            SELECT id, name, is_online, last_seen 
-            FROM rust_players 
-            WHERE guild_id = %s AND LOWER(name) LIKE LOWER(%s) 
-            ORDER BY last_seen DESC LIMIT 1
-        """
-        player = await db.fetch_one(query, interaction.guild_id, f"%{player_name}%")
+        player = await self._find_player(interaction.guild_id, player_name)
         
         if not player:
              await interaction.followup.send(f"❌ Could not find any tracked player matching `{player_name}`.", ephemeral=True)
@@ -1802,79 +2393,86 @@ class RustTracker(commands.Cog):
             query = "SELECT start_time FROM rust_sessions WHERE player_id = %s ORDER BY start_time DESC LIMIT 50"
             sessions = await db.fetch_all(query, player_id)
             
-            if len(sessions) < 3: return None
+            return self._predict_next_online([s["start_time"] for s in sessions], datetime.datetime.now(datetime.timezone.utc))
             
-            start_times = []
-            for s in sessions:
-                st = s["start_time"]
-                if isinstance(st, str): st = datetime.datetime.fromisoformat(st)
-                if st.tzinfo is None: st = st.replace(tzinfo=datetime.timezone.utc)
-                start_times.append(st)
-            
-            # --- Time of Day Clustering ---
-            # 1. Convert to hours and weights
-            now = datetime.datetime.now(datetime.timezone.utc)
-            vectors_x = []
-            vectors_y = []
-            total_weight = 0
-            
-            for st in start_times:
-                # Weight logic:
-                days_ago = (now - st).days
-                if days_ago < 0: days_ago = 0
-                
-                # Weight: 3.0 for last 3 days, 1.0 otherwise.
-                weight = 3.0 if days_ago <= 3 else 1.0
-                
-                # Hour in radians
-                # hour + minute/60
-                hour_val = st.hour + st.minute / 60.0
-                angle = (hour_val / 24.0) * 2 * math.pi
-                
-                vectors_x.append(math.cos(angle) * weight)
-                vectors_y.append(math.sin(angle) * weight)
-                total_weight += weight
-                
-            if total_weight == 0: return None
-            
-            mean_x = sum(vectors_x) / total_weight
-            mean_y = sum(vectors_y) / total_weight
-            
-            # 2. Convert back to hour
-            mean_angle = math.atan2(mean_y, mean_x)
-            if mean_angle < 0: mean_angle += 2 * math.pi
-            
-            mean_hour = (mean_angle / (2 * math.pi)) * 24.0
-            
-            # 3. Construct Prediction
-            # If current time (hour) < mean_hour, predict Today. Else Tomorrow.
-            current_hour = now.hour + now.minute/60.0
-            
-            # Simple wrapper to get next occurrence
-            predicted_dt = now.replace(minute=0, second=0, microsecond=0)
-            
-            target_h = int(mean_hour)
-            target_m = int((mean_hour - target_h) * 60)
+        except Exception as e:
+            log.error(f"Prediction error: {e}")
+            return None
+
+    @staticmethod
+    def _predict_next_online(sessions: List, now: datetime.datetime):
+        """
+        Pure part of _generate_prediction_data: session start times (most recent first) -> prediction.
+        At most 50 starts, so it runs inline on the loop.
+        """
+        if len(sessions) < 3: return None
+        
+        start_times = []
+        for st in sessions:
+            if isinstance(st, str): st = datetime.datetime.fromisoformat(st)
+            if st.tzinfo is None: st = st.replace(tzinfo=datetime.timezone.utc)
+            start_times.append(st)
+        
+        # --- Time of Day Clustering ---
+        # 1. Convert to hours and weights
+        vectors_x = []
+        vectors_y = []
+        total_weight = 0
+        
+        for st in start_times:
+            # Weight logic:
+            days_ago = (now - st).days
+            if days_ago < 0: days_ago = 0
             
-            predicted_dt = predicted_dt.replace(hour=target_h, minute=target_m)
+            # Weight: 3.0 for last 3 days, 1.0 otherwise.
+            weight = 3.0 if days_ago <= 3 else 1.0
             
-            if predicted_dt < now:
-                predicted_dt += datetime.timedelta(days=1)
-                
-            time_until = predicted_dt - now
+            # Hour in radians
+            # hour + minute/60
+            hour_val = st.hour + st.minute / 60.0
+            angle = (hour_val / 24.0) * 2 * math.pi
             
-            # Confidence metric: Length of mean vector (0 to 1)
-            # R = sqrt(mean_x^2 + mean_y^2). Closer to 1 = tighter cluster.
-            r_val = math.sqrt(mean_x**2 + mean_y**2)
-            confidence = "High" if r_val > 0.8 else "Medium" if r_val > 0.5 else "Low"
+            vectors_x.append(math.cos(angle) * weight)
+            vectors_y.append(math.sin(angle) * weight)
+            total_weight += weight
             
-            return predicted_dt, time_until, confidence
+        if total_weight == 0: return None
+        
+        mean_x = sum(vectors_x) / total_weight
+        mean_y = sum(vectors_y) / total_weight
+        
+        # 2. Convert back to hour
+        mean_angle = math.atan2(mean_y, mean_x)
+        if mean_angle < 0: mean_angle += 2 * math.pi
+        
+        mean_hour = (mean_angle / (2 * math.pi)) * 24.0
+        
+        # 3. Construct Prediction
+        # If current time (hour) < mean_hour, predict Today. Else Tomorrow.
+        current_hour = now.hour + now.minute/60.0
+        
+        # Simple wrapper to get next occurrence
+        predicted_dt = now.replace(minute=0, second=0, microsecond=0)
+        
+        target_h = int(mean_hour)
+        target_m = int((mean_hour - target_h) * 60)
+        
+        predicted_dt = predicted_dt.replace(hour=target_h, minute=target_m)
+        
+        if predicted_dt < now:
+            predicted_dt += datetime.timedelta(days=1)
             
-        except Exception as e:
-            log.error(f"Prediction error: {e}")
-            return None
+        time_until = predicted_dt - now
+        
+        # Confidence metric: Length of mean vector (0 to 1)
+        # R = sqrt(mean_x^2 + mean_y^2). Closer to 1 = tighter cluster.
+        r_val = math.sqrt(mean_x**2 + mean_y**2)
+        confidence = "High" if r_val > 0.8 else "Medium" if r_val > 0.5 else "Low"
+        
+        return predicted_dt, time_until, confidence
 
-    def _calculate_playtime_stats(self, sessions: List[Dict], now: datetime.datetime):
+    @staticmethod
+    def _calculate_playtime_stats(sessions: List[Dict], now: datetime.datetime):
         """Helper to calculate behavioral stats from session list."""
         if not sessions: return {}
         
@@ -1926,13 +2524,8 @@ class RustTracker(commands.Cog):
 
     @app_commands.command(name="rust_stats", description="Get stats for a player.")
     async def rust_stats(self, interaction: discord.Interaction, player_name: str):
-        # Fuzzy lookup first
-        player = await db.fetch_one("""
-            SELECT * FROM rust_players WHERE guild_id = %s AND LOWER(name) LIKE LOWER(%s) ORDER BY last_seen DESC LIMIT 1
-        """, interaction.guild_id, f"%{player_name}%") # Partial match support + normalized input if strict? 
-        # Actually user said "Normalize names before DB insertion/lookup".
-        # So typically we'd search EXACT normalized name.
-        # But for UI convenience, LIKE is friendly.
+        # Exact name or alias, then prefix, then fuzzy
+        player = await self._find_player(interaction.guild_id, player_name)
         
         if not player:
             await interaction.response.send_message(f"No data found for player '{player_name}'.", ephemeral=True)
@@ -1976,7 +2569,8 @@ class RustTracker(commands.Cog):
             
             clean_sessions.append({"start_time": st, "end_time": et})
             
-        stats = self._calculate_playtime_stats(clean_sessions, now)
+        # Every session since wipe, pure-Python math: the process pool keeps it from holding the loop's GIL
+        stats = await self.offload.run(self._calculate_playtime_stats, clean_sessions, now, kind=PROCESS, label="playtime_stats")
         
         # Build Embed
         status_emoji = "🟢" if player["is_online"] else "🔴"
@@ -2025,20 +2619,28 @@ class RustTracker(commands.Cog):
         await interaction.response.defer()
         try:
             log.info(f"Rust Debug: Manual verification triggered for guild {interaction.guild_id}")
-            await self._sync_battlemetrics_status(interaction.guild_id)
-            await interaction.followup.send("<:jeffthelandsharkabsolutecinema:1438791420260384848> Verification cycle complete. Check logs for any corrections made.")
+            result = await self._sync_battlemetrics_status(interaction.guild_id)
+            if result:
+                await interaction.followup.send(f"<:jeffthelandsharkabsolutecinema:1438791420260384848> Verification cycle complete. {len(result.joined)} marked online, {len(result.left)} marked offline ({result.checked} checked in {result.duration * 1000:.0f}ms).")
+            else:
+                await interaction.followup.send("<:jeffthelandsharkabsolutecinema:1438791420260384848> Verification cycle complete. Check logs for any corrections made.")
         except Exception as e:
             await interaction.followup.send(f"❌ Verification failed: {e}")
 
-    async def _sync_battlemetrics_status(self, guild_id: int):
+    async def _sync_battlemetrics_status(self, guild_id: int) -> Optional[ReconcileResult]:
         """Syncs online status of tracked players/teammates with BattleMetrics."""
         try:
             # Get Server ID
-            config = await db.fetch_one("SELECT battlemetrics_server_id FROM rust_tracking_channels WHERE guild_id = %s", guild_id)
-            if not config or not config["battlemetrics_server_id"]:
+            config = await self.guild_configs.get(guild_id)
+            if not config.battlemetrics_server_id:
                 return
 
-            server_id = config["battlemetrics_server_id"]
+            # Reconciled recently enough that BattleMetrics would serve the same cached list
+            last = self.reconciler.last.get(guild_id)
+            if last and (datetime.datetime.now(datetime.timezone.utc) - last.finished_at).total_seconds() < PLAYERS_TTL:
+                return last
+
+            server_id = config.battlemetrics_server_id
             bm_players = await self.bm_client.get_server_players(server_id)
             # If empty list returned, it might mean empty server OR api failure.
             # We should probably proceed only if we have data or if we trust the empty list.
@@ -2053,33 +2655,8 @@ class RustTracker(commands.Cog):
             # Helper logic in get_server_players returns [] if data missing.
             # Let's improve utils later if needed.
             
-            online_names = set()
-            for p in bm_players:
-                if "attributes" in p and "name" in p["attributes"]:
-                     online_names.add(p["attributes"]["name"].lower())
-            
-            # Fetch all relevant players from DB: Teammates AND currently Online players
-            db_players = await db.fetch_all("""
-                SELECT id, name, is_online 
-                FROM rust_players 
-                WHERE guild_id = %s AND (is_online = TRUE OR is_teammate = TRUE)
-            """, guild_id)
-            
-            now = datetime.datetime.now(datetime.timezone.utc)
-            
-            for p in db_players:
-                name = p["name"]
-                is_online_db = p["is_online"]
-                name_lower = name.lower()
-                
-                is_online_bm = name_lower in online_names
-                
-                if is_online_bm and not is_online_db:
-                    log.info(f"BattleMetrics Sync: Marking {name} as ONLINE")
-                    await self._update_player_activity(guild_id, name, True, now)
-                elif not is_online_bm and is_online_db:
-                    log.info(f"BattleMetrics Sync: Marking {name} as OFFLINE")
-                    await self._update_player_activity(guild_id, name, False, now)
+            # Only teammates and players we think are online need checking here
+            return await self.reconciler.reconcile(guild_id, bm_players, tracked_only=True)
 
         except Exception as e:
             log.error(f"Error syncing BattleMetrics status: {e}")
@@ -2118,6 +2695,8 @@ class RustTracker(commands.Cog):
             "UPDATE rust_tracking_channels SET battlemetrics_server_id = %s WHERE channel_id = %s", 
             server_id, interaction.channel_id
         )
+        await self.guild_configs.invalidate(interaction.guild_id)
+        self.bm_poller.refresh()
 
         embed = discord.Embed(title="<:jeffthelandsharkabsolutecinema:1438791420260384848> Server Linked!", color=discord.Color.green())
         embed.add_field(name="Server Name", value=name, inline=False)
@@ -2131,12 +2710,12 @@ class RustTracker(commands.Cog):
     async def rust_server_info(self, interaction: discord.Interaction):
         """Display live info (Rank, Players, Map) from BattleMetrics."""
         # Get server ID for this guild/channel
-        config = await db.fetch_one("SELECT battlemetrics_server_id FROM rust_tracking_channels WHERE guild_id = %s", interaction.guild_id)
-        if not config or not config["battlemetrics_server_id"]:
+        config = await self.guild_configs.get(interaction.guild_id)
+        if not config.battlemetrics_server_id:
             await interaction.response.send_message("❌ No BattleMetrics server linked. Ask an Admin to use `/rust_setserver`.", ephemeral=True)
             return
             
-        server_id = config["battlemetrics_server_id"]
+        server_id = config.battlemetrics_server_id
         
         await interaction.response.defer()
         
@@ -0,0 +1,143 @@
+import asyncio
+import heapq
+import itertools
+import logging
+import random
+import time
+from typing import Dict, List, Optional, Set, Tuple, Any
+
+log = logging.getLogger(__name__)
+
+# Seconds between polls of each Rust+ endpoint.
+# Markers drive spawn notifications so they are polled fastest; time and pop change slowly.
+DEFAULT_INTERVALS = {
+    "markers": 10.0,
+    "server_info": 30.0,
+    "time": 60.0,
+}
+
+
+class PollScheduler:
+    """
+    Fleet-wide poll scheduler shared by every RustMonitor.
+
+    Each (guild, endpoint) pair lives in a min-heap keyed by its next due time.
+    First polls are spread over a full interval and every reschedule is jittered,
+    so monitors started together never line up.
+    """
+
+    def __init__(self, intervals: Optional[Dict[str, float]] = None, jitter: float = 0.1, max_concurrency: int = 32):
+        self.intervals = dict(intervals or DEFAULT_INTERVALS)
+        self.jitter = jitter
+
+        self._heap: List[Tuple[float, int, int, str, Any]] = []  # (due, seq, guild_id, endpoint, monitor)
+        self._seq = itertools.count()
+        self._monitors: Dict[int, Any] = {}
+        self._inflight = set()
+        self._lag: Dict[int, float] = {}  # guild_id -> seconds behind schedule on last dispatch
+
+        self._wakeup = asyncio.Event()
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._task: Optional[asyncio.Task] = None
+        self._polls: Set[asyncio.Task] = set()  # In-flight dispatches, kept referenced until done
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        for task in list(self._polls):
+            task.cancel()
+        await asyncio.gather(*self._polls, return_exceptions=True)
+
+    def register(self, monitor):
+        """Schedule all endpoints for a monitor, replacing any previous monitor for the guild."""
+        self._monitors[monitor.guild_id] = monitor
+        now = time.monotonic()
+        for endpoint, interval in self.intervals.items():
+            # Random phase within the first interval spreads a mass start evenly.
+            self._push(now + random.uniform(0, interval), monitor.guild_id, endpoint, monitor)
+        self._wakeup.set()
+
+    def unregister(self, monitor):
+        # Heap entries are dropped lazily when they come due.
+        if self._monitors.get(monitor.guild_id) is monitor:
+            del self._monitors[monitor.guild_id]
+            self._lag.pop(monitor.guild_id, None)
+
+    def get_lag(self, guild_id: int) -> Optional[float]:
+        """Seconds the last poll for this guild started after its due time."""
+        return self._lag.get(guild_id)
+
+    def get_lag_stats(self) -> Dict[str, float]:
+        lags = list(self._lag.values())
+        if not lags:
+            return {"guilds": 0, "max": 0.0, "mean": 0.0}
+        return {"guilds": len(lags), "max": max(lags), "mean": sum(lags) / len(lags)}
+
+    def _push(self, due: float, guild_id: int, endpoint: str, monitor):
+        heapq.heappush(self._heap, (due, next(self._seq), guild_id, endpoint, monitor))
+
+    def _next_due(self, due: float, interval: float, now: float) -> float:
+        spread = interval * self.jitter
+        next_due = due + interval + random.uniform(-spread, spread)
+        if next_due < now:
+            # We fell more than a whole interval behind; skip the missed slots instead of bursting.
+            next_due = now + random.uniform(0, spread)
+        return next_due
+
+    async def _run(self):
+        while True:
+            if not self._heap:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+
+            now = time.monotonic()
+            due = self._heap[0][0]
+            if due > now:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=due - now)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            # Collect everything that is due, grouped per guild.
+            batches: Dict[int, Tuple[Any, List[str], float]] = {}
+            while self._heap and self._heap[0][0] <= now:
+                due, _, guild_id, endpoint, monitor = heapq.heappop(self._heap)
+                if self._monitors.get(guild_id) is not monitor:
+                    continue  # Unregistered or replaced
+
+                self._push(self._next_due(due, self.intervals[endpoint], now), guild_id, endpoint, monitor)
+
+                _, endpoints, lag = batches.get(guild_id, (monitor, [], 0.0))
+                endpoints.append(endpoint)
+                batches[guild_id] = (monitor, endpoints, max(lag, now - due))
+
+            for guild_id, (monitor, endpoints, lag) in batches.items():
+                self._lag[guild_id] = lag
+                if guild_id in self._inflight:
+                    # Previous poll still running; don't stack another on top of it.
+                    continue
+                self._inflight.add(guild_id)
+                task = asyncio.create_task(self._dispatch(guild_id, monitor, endpoints))
+                self._polls.add(task)
+                task.add_done_callback(self._polls.discard)
+
+    async def _dispatch(self, guild_id: int, monitor, endpoints: List[str]):
+        try:
+            async with self._semaphore:
+                await monitor.poll(endpoints)
+        except Exception as e:
+            log.debug(f"PollScheduler: Poll failed for guild {guild_id}: {e}")
+        finally:
+            self._inflight.discard(guild_id)
@@ -34,10 +34,27 @@ CREATE TABLE IF NOT EXISTS rust_players (
     steam_id BIGINT, -- Raw Steam ID (if known) or derived
     guild_id BIGINT,
     name VARCHAR(100),
+    normalized_name VARCHAR(100) DEFAULT NULL, -- Clan tag / 'Player ' prefix stripped, lowercased
     is_online BOOLEAN DEFAULT FALSE,
     last_seen TIMESTAMP NULL,
     is_teammate BOOLEAN DEFAULT FALSE,
-    UNIQUE KEY unique_player (guild_id, name)
+    bm_player_id BIGINT DEFAULT NULL, -- BattleMetrics player id (if known)
+    UNIQUE KEY unique_player (guild_id, name),
+    INDEX idx_normalized (guild_id, normalized_name),
+    INDEX idx_steam (guild_id, steam_id),
+    INDEX idx_bm (guild_id, bm_player_id)
+);
+
+-- Every name a player has been seen under (normalized), for resolving renames
+CREATE TABLE IF NOT EXISTS rust_player_aliases (
+    guild_id BIGINT,
+    normalized_name VARCHAR(100),
+    player_id BIGINT,
+    name VARCHAR(100),
+    first_seen TIMESTAMP NULL,
+    PRIMARY KEY (guild_id, normalized_name),
+    INDEX idx_player (player_id),
+    FOREIGN KEY (player_id) REFERENCES rust_players(id) ON DELETE CASCADE
 );
 
 -- Sessions Table (Playtime History)
@@ -59,8 +76,41 @@ CREATE TABLE IF NOT EXISTS rust_market_listings (
     cost_amount INT,
     cost_item VARCHAR(100),
     stock INT,
+    shop_id BIGINT DEFAULT NULL, -- Rust+ vending machine marker id
+    change_type VARCHAR(10) DEFAULT NULL, -- 'new', 'price', 'stock', 'removed'
     timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-    INDEX idx_search (guild_id, item_name)
+    INDEX idx_search (guild_id, item_name),
+    INDEX idx_time (timestamp) -- Retention deletes
+);
+
+-- Current Listings (live vending offers, maintained from map marker diffs)
+CREATE TABLE IF NOT EXISTS rust_current_listings (
+    guild_id BIGINT,
+    shop_id BIGINT, -- Rust+ vending machine marker id
+    item_id INT,
+    currency_id INT,
+    shop_name VARCHAR(100),
+    item_name VARCHAR(100),
+    quantity INT,
+    cost_item VARCHAR(100),
+    cost_amount INT,
+    stock INT,
+    updated_at TIMESTAMP NULL,
+    PRIMARY KEY (guild_id, shop_id, item_id, currency_id),
+    INDEX idx_item (guild_id, item_name)
+);
+
+-- Price Watches (/rust_watch)
+CREATE TABLE IF NOT EXISTS rust_price_watches (
+    id BIGINT AUTO_INCREMENT PRIMARY KEY,
+    guild_id BIGINT,
+    user_id BIGINT,
+    item_name VARCHAR(100),
+    max_unit_price DOUBLE, -- Per unit, in cost_item
+    cost_item VARCHAR(100),
+    dm BOOLEAN DEFAULT FALSE,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    INDEX idx_guild_user (guild_id, user_id)
 );
 
 -- Economy Transactions (Sales tracking)
@@ -72,5 +122,42 @@ CREATE TABLE IF NOT EXISTS rust_economy_transactions (
     cost_amount INT,
     cost_item VARCHAR(100),
     buyer_name VARCHAR(100),
-    timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    INDEX idx_time (timestamp) -- Retention deletes
+);
+
+-- Economy Rollups (maintained on insert into rust_economy_transactions)
+CREATE TABLE IF NOT EXISTS rust_economy_hourly (
+    guild_id BIGINT,
+    hour_start DATETIME,
+    item_name VARCHAR(100), -- '' for currency transfers
+    cost_item VARCHAR(100),
+    total_quantity BIGINT DEFAULT 0,
+    total_cost BIGINT DEFAULT 0,
+    trades INT DEFAULT 0,
+    PRIMARY KEY (guild_id, hour_start, item_name, cost_item)
+);
+
+CREATE TABLE IF NOT EXISTS rust_economy_wipe (
+    guild_id BIGINT,
+    wipe_at DATETIME, -- 1970-01-02 when the guild has no wipe time
+    item_name VARCHAR(100),
+    cost_item VARCHAR(100),
+    total_quantity BIGINT DEFAULT 0,
+    total_cost BIGINT DEFAULT 0,
+    trades INT DEFAULT 0,
+    PRIMARY KEY (guild_id, wipe_at, item_name, cost_item),
+    INDEX idx_top (guild_id, wipe_at, total_cost)
+);
+
+-- Map Event Lifetimes (Cargo, Heli, CH47, ...)
+CREATE TABLE IF NOT EXISTS rust_marker_lifetimes (
+    id BIGINT AUTO_INCREMENT PRIMARY KEY,
+    guild_id BIGINT,
+    marker_id BIGINT,
+    marker_type INT, -- Rust+ AppMarkerType
+    spawned_at TIMESTAMP NULL,
+    despawned_at TIMESTAMP NULL,
+    duration_seconds INT,
+    INDEX idx_type_time (guild_id, marker_type, despawned_at)
 );
@@ -0,0 +1,96 @@
+import bisect
+from collections import defaultdict
+from typing import Dict, List, Set, Tuple
+
+TRIGRAM_THRESHOLD = 0.3 # Minimum Jaccard similarity for a fuzzy match
+
+
+def normalize(name: str) -> str:
+    return " ".join(name.lower().split())
+
+
+def trigrams(text: str) -> Set[str]:
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class NameIndex:
+    """
+    In-memory name index with reference counts, for ranking a search term against
+    a small, changing set of names (e.g. items currently on sale in a guild).
+
+    Matches are ranked exact > prefix > substring > trigram similarity.
+    """
+
+    def __init__(self):
+        self._counts: Dict[str, int] = {}
+        self._display: Dict[str, str] = {}
+        self._sorted: List[str] = []
+        self._trigrams: Dict[str, Set[str]] = defaultdict(set)
+
+    def __len__(self) -> int:
+        return len(self._counts)
+
+    def add(self, name: str, count: int = 1):
+        key = normalize(name)
+        if key in self._counts:
+            self._counts[key] += count
+            return
+        self._counts[key] = count
+        self._display[key] = name
+        bisect.insort(self._sorted, key)
+        for tri in trigrams(key):
+            self._trigrams[tri].add(key)
+
+    def remove(self, name: str):
+        key = normalize(name)
+        count = self._counts.get(key)
+        if count is None:
+            return
+        if count > 1:
+            self._counts[key] = count - 1
+            return
+        del self._counts[key]
+        del self._display[key]
+        self._sorted.pop(bisect.bisect_left(self._sorted, key))
+        for tri in trigrams(key):
+            keys = self._trigrams[tri]
+            keys.discard(key)
+            if not keys:
+                del self._trigrams[tri]
+
+    def clear(self):
+        self.__init__()
+
+    def search(self, term: str, limit: int = 10) -> List[str]:
+        """Display names matching term, best first."""
+        query = normalize(term)
+        if not query:
+            return []
+        ranked: Dict[str, Tuple[int, float]] = {}
+
+        if query in self._counts:
+            ranked[query] = (0, 0.0)
+
+        i = bisect.bisect_left(self._sorted, query)
+        while i < len(self._sorted) and self._sorted[i].startswith(query):
+            ranked.setdefault(self._sorted[i], (1, 0.0))
+            i += 1
+
+        query_tris = trigrams(query)
+        shared: Dict[str, int] = defaultdict(int)
+        for tri in query_tris:
+            for key in self._trigrams.get(tri, ()):
+                shared[key] += 1
+        for key, n in shared.items():
+            if key in ranked:
+                continue
+            if query in key:
+                ranked[key] = (2, 0.0)
+                continue
+            similarity = n / (len(query_tris) + len(trigrams(key)) - n)
+            if similarity >= TRIGRAM_THRESHOLD:
+                ranked[key] = (3, -similarity)
+
+        best = sorted(ranked, key=lambda k: (ranked[k], len(k)))[:limit]
+        return [self._display[k] for k in best]
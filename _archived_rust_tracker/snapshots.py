@@ -0,0 +1,81 @@
+import asyncio
+import datetime
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+log = logging.getLogger(__name__)
+
+# Seconds before a snapshot is considered stale and refreshed in the background
+DEFAULT_MAX_AGE = {
+    "markers": 10.0,
+    "server_info": 30.0,
+    "time": 60.0,
+    "team_info": 30.0,
+}
+
+
+@dataclass
+class Snapshot:
+    endpoint: str
+    data: Any
+    fetched_at: float = field(default_factory=time.monotonic)
+    received_at: datetime.datetime = field(default_factory=lambda: datetime.datetime.now(datetime.timezone.utc))
+
+    @property
+    def age(self) -> float:
+        return time.monotonic() - self.fetched_at
+
+
+class SnapshotCache:
+    """
+    Last-known value of each Rust+ endpoint, fed by polling and socket events.
+
+    get() answers from the cache immediately; a stale entry triggers one background
+    refresh (stale-while-revalidate). Only a cold cache waits on the network.
+    """
+
+    def __init__(self, fetch: Callable[[str, int], Awaitable[Any]], max_age: Optional[Dict[str, float]] = None):
+        self._fetch = fetch # async func(endpoint, priority) -> data
+        self.max_age = dict(DEFAULT_MAX_AGE)
+        if max_age:
+            self.max_age.update(max_age)
+
+        self._snapshots: Dict[str, Snapshot] = {}
+        self._refreshing: Dict[str, asyncio.Task] = {}
+
+    def store(self, endpoint: str, data: Any):
+        self._snapshots[endpoint] = Snapshot(endpoint, data)
+
+    def peek(self, endpoint: str) -> Optional[Snapshot]:
+        return self._snapshots.get(endpoint)
+
+    def clear(self):
+        self._snapshots.clear()
+
+    async def get(self, endpoint: str, priority: int) -> Snapshot:
+        snapshot = self._snapshots.get(endpoint)
+        if snapshot is None:
+            # Cold cache: join (or start) the refresh and wait for it
+            await self._refresh_task(endpoint, priority)
+            return self._snapshots[endpoint]
+
+        if snapshot.age > self.max_age.get(endpoint, 30.0):
+            self._refresh_task(endpoint, priority)
+        return snapshot
+
+    def _refresh_task(self, endpoint: str, priority: int) -> asyncio.Task:
+        task = self._refreshing.get(endpoint)
+        if task is None or task.done():
+            task = asyncio.create_task(self._refresh(endpoint, priority))
+            self._refreshing[endpoint] = task
+        return task
+
+    async def _refresh(self, endpoint: str, priority: int):
+        try:
+            self.store(endpoint, await self._fetch(endpoint, priority))
+        except Exception as e:
+            if endpoint not in self._snapshots:
+                raise
+            log.debug(f"SnapshotCache: Background refresh of {endpoint} failed: {e}")
@@ -0,0 +1,76 @@
+import pytest
+
+from _archived_rust_tracker import bm_poller
+from _archived_rust_tracker.bm_poller import (
+    CHURN_SMOOTHING, INITIAL_INTERVAL, MAX_INTERVAL, MIN_INTERVAL, TARGET_CHANGES, BattleMetricsPoller, ServerState,
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+
+async def _unused(*args):
+    return []
+
+
+def _poller(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(bm_poller.time, "monotonic", clock.monotonic)
+    poller = BattleMetricsPoller(lambda: {}, _unused, _unused, lambda players: set(players))
+    return poller, clock
+
+
+def test_first_poll_keeps_interval_growth_without_churn(monkeypatch):
+    poller, clock = _poller(monkeypatch)
+    state = ServerState("1")
+
+    poller._observe(state, ["a", "b"])
+
+    assert state.churn == 0.0
+    assert state.interval == INITIAL_INTERVAL * 1.5
+    assert state.population == 2 and state.last_success == clock.now
+
+
+def test_churn_shortens_interval_towards_target(monkeypatch):
+    poller, clock = _poller(monkeypatch)
+    state = ServerState("1")
+    poller._observe(state, ["a", "b"])
+
+    clock.now += 100.0
+    poller._observe(state, ["a", "c", "d"])  # b left, c and d joined: 3 changes in 100s
+
+    assert state.churn == pytest.approx(CHURN_SMOOTHING * 3 / 100.0)
+    assert state.interval == pytest.approx(TARGET_CHANGES / state.churn)
+
+
+def test_interval_is_clamped(monkeypatch):
+    poller, clock = _poller(monkeypatch)
+    state = ServerState("1")
+    poller._observe(state, ["a"])
+
+    clock.now += 60.0
+    poller._observe(state, [str(i) for i in range(200)])  # Wipe day
+    assert state.interval == MIN_INTERVAL
+
+    state.churn = 0.0
+    state.interval = MAX_INTERVAL
+    clock.now += 60.0
+    poller._observe(state, [str(i) for i in range(200)])
+    assert state.interval == MAX_INTERVAL
+
+
+def test_empty_server_backs_off_to_max(monkeypatch):
+    poller, clock = _poller(monkeypatch)
+    state = ServerState("1")
+    poller._observe(state, ["a"])
+
+    clock.now += 60.0
+    poller._observe(state, [])
+
+    assert state.interval == MAX_INTERVAL
+    assert state.population == 0
@@ -0,0 +1,56 @@
+from types import SimpleNamespace
+
+from _archived_rust_tracker.changes import MarkerDelta, SnapshotDiffer
+
+
+def _marker(marker_id, x=0.0, y=0.0, name=None):
+    return SimpleNamespace(id=marker_id, x=x, y=y, type=1, name=name, out_of_stock=False, sell_orders=[])
+
+
+def _ids(markers):
+    return sorted(m.id for m in markers)
+
+
+def test_merge_drops_markers_added_then_removed():
+    older = MarkerDelta(markers=[], added=[_marker(1)])
+    newer = MarkerDelta(markers=[], removed=[_marker(1)])
+
+    merged = older.merge(newer)
+
+    assert merged.added == [] and merged.removed == []
+
+
+def test_merge_keeps_newest_version_of_added_marker():
+    older = MarkerDelta(markers=[], added=[_marker(1, x=0.0)])
+    newer = MarkerDelta(markers=[_marker(1, x=50.0)], moved=[_marker(1, x=50.0)], updated=[_marker(2, name="b")])
+
+    merged = older.merge(newer)
+
+    assert [m.x for m in merged.added] == [50.0]
+    assert merged.moved == []
+    assert _ids(merged.updated) == [2]
+    assert merged.markers == newer.markers
+
+
+def test_merge_removal_clears_earlier_moves_and_updates():
+    older = MarkerDelta(markers=[], moved=[_marker(1)], updated=[_marker(2)], initial=True)
+    newer = MarkerDelta(markers=[], removed=[_marker(1), _marker(2)])
+
+    merged = older.merge(newer)
+
+    assert _ids(merged.removed) == [1, 2]
+    assert merged.moved == [] and merged.updated == []
+    assert merged.initial
+
+
+def test_differ_reports_moves_updates_and_suppresses_no_op_polls():
+    differ = SnapshotDiffer(move_threshold=1.0)
+    assert differ.diff_markers([_marker(1), _marker(2)]).initial
+
+    delta = differ.diff_markers([_marker(1, x=0.5), _marker(2, name="renamed"), _marker(3)])
+    assert delta.moved == []  # Within the move threshold
+    assert _ids(delta.updated) == [2]
+    assert _ids(delta.added) == [3]
+
+    assert differ.diff("markers", [_marker(1, x=0.5), _marker(2, name="renamed"), _marker(3)]) == []
+    assert differ.suppressed == 1
@@ -0,0 +1,19 @@
+from _archived_rust_tracker.devices import DeviceRegistry, SmartDevice
+
+
+def test_same_name_switch_and_alarm_are_both_found():
+    registry = DeviceRegistry([SmartDevice(1, "Door", "switch"), SmartDevice(2, "Door", "alarm")])
+
+    assert registry.find("door", "switch").entity_id == 1
+    assert registry.find("door", "alarm").entity_id == 2
+    assert registry.find("do", "switch").entity_id == 1
+
+
+def test_renaming_one_of_two_same_name_devices_keeps_the_other():
+    registry = DeviceRegistry([SmartDevice(1, "Door", "switch"), SmartDevice(2, "Door", "alarm")])
+
+    registry.upsert(SmartDevice(2, "Garage", "alarm"))
+
+    assert registry.find("door", "switch").entity_id == 1
+    assert registry.find("door", "alarm") is None
+    assert registry.find("garage", "alarm").entity_id == 2
@@ -0,0 +1,54 @@
+from _archived_rust_tracker.events import GuildEventQueue
+
+
+class Delta:
+    def __init__(self, added):
+        self.added = set(added)
+
+    def merge(self, other):
+        return Delta(self.added | other.added)
+
+
+async def _noop(event_type, data):
+    pass
+
+
+def _types(queue):
+    return [e.event_type for e in queue._queue]
+
+
+def test_full_queue_keeps_coalesced_delta_and_rejects_chat():
+    queue = GuildEventQueue(1, _noop, maxsize=3)
+    queue.put("marker_delta", Delta({1}))
+    queue.put("entity_event", "alarm")
+    queue.put("entity_event", "alarm")
+
+    queue.put("chat_event", "hello")
+
+    assert _types(queue) == ["marker_delta", "entity_event", "entity_event"]
+    assert dict(queue.dropped) == {"chat_event": 1}
+
+    queue.put("marker_delta", Delta({2}))
+    assert queue._queue[0].payload.added == {1, 2}
+
+
+def test_full_queue_evicts_oldest_chat_first():
+    queue = GuildEventQueue(1, _noop, maxsize=2)
+    queue.put("chat_event", "first")
+    queue.put("marker_delta", Delta({1}))
+
+    queue.put("chat_event", "second")
+
+    assert _types(queue) == ["marker_delta", "chat_event"]
+    assert queue._queue[1].payload == "second"
+    assert dict(queue.dropped) == {"chat_event": 1}
+
+
+def test_new_coalesced_type_is_accepted_past_maxsize():
+    queue = GuildEventQueue(1, _noop, maxsize=1)
+    queue.put("entity_event", "alarm")
+
+    queue.put("marker_delta", Delta({1}))
+
+    assert _types(queue) == ["entity_event", "marker_delta"]
+    assert not queue.dropped
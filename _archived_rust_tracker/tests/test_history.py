@@ -0,0 +1,51 @@
+from _archived_rust_tracker.history import (
+    RECORD, MarkerHistory, append_records, heatmap, history_path, read_range, trim_records,
+)
+
+
+def test_ring_grows_lazily_then_wraps_and_range_is_time_ordered():
+    history = MarkerHistory(capacity=4)
+    for t in range(3):
+        history.append(float(t), t % 2, 1, float(t), 0.0)
+    assert len(history._t) == 3
+
+    for t in range(3, 7):
+        history.append(float(t), t % 2, 1, float(t), 0.0)
+
+    assert len(history._t) == 4
+    assert [s[0] for s in history.range(0.0, 100.0)] == [3.0, 4.0, 5.0, 6.0]
+    assert [s[0] for s in history.range(4.0, 6.0)] == [4.0, 5.0]
+    assert [s[0] for s in history.range(4.0, 7.0, marker_id=1)] == [5.0]
+    assert history.path(0) == [(4.0, 4.0, 0.0), (6.0, 6.0, 0.0)]
+
+
+def test_flushed_file_reads_back_by_range(tmp_path):
+    history = MarkerHistory(capacity=8)
+    for t in range(5):
+        history.append(100.0 + t, 7, 2, 10.0 * t, 20.0)
+    path = history_path(1, str(tmp_path))
+
+    append_records(path, history.take_unflushed())
+
+    assert history.take_unflushed() == b""
+    samples = read_range(path, 101.0, 104.0)
+    assert [s[0] for s in samples] == [101.0, 102.0, 103.0]
+    assert samples[0] == (101.0, 7, 2, 10.0, 20.0)
+    assert read_range(str(tmp_path / "missing.bin"), 0.0, 1.0) == []
+
+
+def test_trim_keeps_newer_records(tmp_path):
+    history = MarkerHistory(capacity=8)
+    for t in range(5):
+        history.append(float(t), 1, 1, 0.0, 0.0)
+    path = history_path(1, str(tmp_path))
+    append_records(path, history.take_unflushed())
+
+    assert trim_records(path, 3.0) == 3
+    assert [s[0] for s in read_range(path, 0.0, 10.0)] == [3.0, 4.0]
+    assert (tmp_path / "1.bin").stat().st_size == 2 * RECORD.size
+
+
+def test_heatmap_bins_north_up():
+    grid = heatmap([(0.0, 1, 1, 0.0, 0.0), (0.0, 1, 1, 99.0, 99.0)], map_size=100.0, cells=2)
+    assert grid == [[0, 1], [1, 0]]
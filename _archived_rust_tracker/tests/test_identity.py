@@ -0,0 +1,109 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip("xyz.jefferybeans.jeffbot.database")
+
+from _archived_rust_tracker import identity as identity_module
+from _archived_rust_tracker.identity import IdentityStore, normalize_name
+
+
+class FakeDB:
+    """Just enough of rust_players / rust_player_aliases for IdentityStore."""
+
+    def __init__(self, players):
+        self.players = {p["id"]: dict(p) for p in players}
+        self.aliases = {} # (guild_id, normalized_name) -> player_id
+        self.queries = []
+
+    async def execute(self, query, *params):
+        query = " ".join(query.split())
+        self.queries.append(query)
+        if query.startswith("INSERT INTO rust_player_aliases"):
+            overwrite = "VALUES(player_id)" in query
+            for i in range(0, len(params), 5):
+                guild_id, key, player_id = params[i:i + 3]
+                if overwrite or (guild_id, key) not in self.aliases:
+                    self.aliases[(guild_id, key)] = player_id
+        elif query.startswith("UPDATE rust_player_aliases SET player_id"):
+            target_id, source_id = params
+            for key, pid in self.aliases.items():
+                if pid == source_id:
+                    self.aliases[key] = target_id
+        elif query.startswith("UPDATE rust_players SET steam_id"):
+            n = len(params) // 5
+            steam_ids = dict(zip(params[0:2 * n:2], params[1:2 * n:2]))
+            bm_ids = dict(zip(params[2 * n:4 * n:2], params[2 * n + 1:4 * n:2]))
+            for player_id in params[4 * n:]:
+                row = self.players[player_id]
+                row["steam_id"] = row["steam_id"] or steam_ids[player_id]
+                row["bm_player_id"] = row["bm_player_id"] or bm_ids[player_id]
+        elif query.startswith("DELETE FROM rust_players WHERE id"):
+            player_id = params[0]
+            del self.players[player_id]
+            self.aliases = {k: v for k, v in self.aliases.items() if v != player_id}
+        else:
+            raise AssertionError(f"Unexpected query: {query}")
+
+    async def fetch_all(self, query, *params):
+        guild_id = params[0] if params else None
+        if "FROM rust_players" in query:
+            return [dict(p) for p in self.players.values() if guild_id is None or p["guild_id"] == guild_id]
+        return [
+            {"guild_id": g, "normalized_name": key, "player_id": pid}
+            for (g, key), pid in self.aliases.items()
+            if guild_id is None or g == guild_id
+        ]
+
+
+def _player(player_id, name, steam_id=None):
+    return {"id": player_id, "guild_id": 1, "name": name, "normalized_name": name, "steam_id": steam_id, "bm_player_id": None}
+
+
+def test_merged_name_resolves_to_target_after_reload(monkeypatch):
+    fake = FakeDB([_player(1, "oldjeff", steam_id=76561198000000001), _player(2, "jeff")])
+    monkeypatch.setattr(identity_module, "db", fake)
+    store = IdentityStore(normalize_name)
+
+    async def run():
+        await store.load_all()
+        await store.merge(1, 2)
+        await fake.execute("DELETE FROM rust_players WHERE id = %s", 1)
+        await store.load_guild(1)
+
+    asyncio.run(run())
+
+    assert fake.aliases[(1, "oldjeff")] == 2
+    assert store.resolve(1, "[CLAN] OldJeff").player_id == 2
+    assert store.resolve(1, steam_id=76561198000000001).player_id == 2
+
+
+def test_observe_many_links_ids_and_names_in_one_statement_per_table(monkeypatch):
+    fake = FakeDB([_player(1, "jeff"), _player(2, "bob"), _player(3, "alice", steam_id=76561198000000003)])
+    monkeypatch.setattr(identity_module, "db", fake)
+    store = IdentityStore(normalize_name)
+
+    async def run():
+        await store.load_all()
+        return await store.observe_many(1, [
+            ("[CLAN] Jeff", None, 101),
+            ("Bob", None, 102),
+            ("alice", None, None),       # Nothing new to link
+            ("stranger", None, 104),     # Unknown; not created here
+        ])
+
+    identities = asyncio.run(run())
+
+    assert [i.player_id if i else None for i in identities] == [1, 2, 3, None]
+    assert len(fake.queries) == 1 # Names were already known, so only the ids are written
+    assert fake.players[1]["bm_player_id"] == 101
+    assert fake.players[2]["bm_player_id"] == 102
+    assert store.resolve(1, bm_id=102).player_id == 2
+
+    fake.queries.clear()
+    asyncio.run(store.observe_many(1, [("Jeffrey", None, 101), ("Bobby", None, 102)]))
+
+    assert len(fake.queries) == 1
+    assert fake.aliases[(1, "jeffrey")] == 1
+    assert fake.aliases[(1, "bobby")] == 2
+    assert store.resolve(1, "bobby").player_id == 2
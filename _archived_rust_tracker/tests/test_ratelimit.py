@@ -0,0 +1,85 @@
+import asyncio
+
+from _archived_rust_tracker import ratelimit
+from _archived_rust_tracker.ratelimit import ConnectLimiter, TokenBucket
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+
+def _bucket(monkeypatch, rate, capacity):
+    clock = FakeClock()
+    monkeypatch.setattr(ratelimit.time, "monotonic", clock.monotonic)
+    return TokenBucket(rate, capacity), clock
+
+
+def test_bucket_allows_burst_then_refills_at_rate(monkeypatch):
+    bucket, clock = _bucket(monkeypatch, rate=2.0, capacity=3.0)
+
+    assert [bucket.try_acquire() for _ in range(4)] == [True, True, True, False]
+    assert bucket.time_until() == 0.5
+
+    clock.now += 0.5
+    assert bucket.try_acquire()
+    assert not bucket.try_acquire()
+
+
+def test_bucket_never_refills_past_capacity(monkeypatch):
+    bucket, clock = _bucket(monkeypatch, rate=10.0, capacity=2.0)
+    bucket.try_acquire(2.0)
+
+    clock.now += 60.0
+
+    assert bucket.try_acquire(2.0)
+    assert not bucket.try_acquire()
+
+
+def test_acquire_waits_instead_of_failing():
+    bucket = TokenBucket(rate=100.0, capacity=1.0)
+
+    async def run():
+        await bucket.acquire()
+        await asyncio.wait_for(bucket.acquire(), timeout=1.0)
+
+    asyncio.run(run())
+
+
+def test_connect_limiter_caps_concurrent_handshakes():
+    limiter = ConnectLimiter(max_concurrent=2, rate=1000.0, burst=10.0)
+    active = peak = 0
+
+    async def connect():
+        nonlocal active, peak
+        async with limiter:
+            active += 1
+            peak = max(peak, active)
+            await asyncio.sleep(0.01)
+            active -= 1
+
+    async def run():
+        await asyncio.gather(*(connect() for _ in range(6)))
+
+    asyncio.run(run())
+
+    assert peak == 2
+    assert limiter.waiting == 0
+
+
+def test_connect_limiter_counts_waiters():
+    limiter = ConnectLimiter(max_concurrent=1, rate=1000.0, burst=10.0)
+
+    async def run():
+        async with limiter:
+            waiter = asyncio.create_task(limiter.__aenter__())
+            await asyncio.sleep(0)
+            assert limiter.waiting == 1
+        await waiter
+        await limiter.__aexit__(None, None, None)
+        assert limiter.waiting == 0
+
+    asyncio.run(run())
@@ -0,0 +1,63 @@
+import datetime
+from types import SimpleNamespace
+
+from _archived_rust_tracker.roster import DEATH, OFFLINE, ONLINE, RESPAWN, TeamRoster
+
+NOW = datetime.datetime(2024, 1, 1, tzinfo=datetime.timezone.utc)
+
+
+def _member(steam_id, online=True, alive=True, spawn_time=0, death_time=0):
+    return SimpleNamespace(steam_id=steam_id, name=f"player{steam_id}", is_online=online, is_alive=alive, spawn_time=spawn_time, death_time=death_time)
+
+
+def _team(*members, leader=1):
+    return SimpleNamespace(members=list(members), leader_steam_id=leader)
+
+
+def _kinds(transitions):
+    return [(t.steam_id, t.kind) for t in transitions]
+
+
+def test_first_snapshot_reports_presence_of_every_member():
+    roster = TeamRoster()
+
+    transitions = roster.apply(_team(_member(1), _member(2, online=False), leader=2), NOW)
+
+    assert _kinds(transitions) == [(1, ONLINE), (2, OFFLINE)]
+    assert roster.initialized and roster.leader_steam_id == 2
+    assert [m.steam_id for m in roster.online()] == [1]
+
+
+def test_unchanged_snapshot_produces_nothing():
+    roster = TeamRoster()
+    roster.apply(_team(_member(1)), NOW)
+
+    assert roster.apply(_team(_member(1)), NOW) == []
+
+
+def test_online_offline_and_death_respawn_transitions():
+    roster = TeamRoster()
+    roster.apply(_team(_member(1), _member(2)), NOW)
+
+    transitions = roster.apply(_team(_member(1, online=False), _member(2, alive=False, death_time=10)), NOW)
+    assert _kinds(transitions) == [(1, OFFLINE), (2, DEATH)]
+
+    transitions = roster.apply(_team(_member(1), _member(2, spawn_time=20, death_time=10)), NOW)
+    assert _kinds(transitions) == [(1, ONLINE), (2, RESPAWN)]
+
+
+def test_death_and_respawn_between_snapshots_is_caught_by_timestamps():
+    roster = TeamRoster()
+    roster.apply(_team(_member(1, spawn_time=5, death_time=0)), NOW)
+
+    transitions = roster.apply(_team(_member(1, spawn_time=30, death_time=25)), NOW)
+
+    assert _kinds(transitions) == [(1, DEATH), (1, RESPAWN)]
+
+
+def test_members_who_leave_drop_out_silently():
+    roster = TeamRoster()
+    roster.apply(_team(_member(1), _member(2)), NOW)
+
+    assert roster.apply(_team(_member(1)), NOW) == []
+    assert list(roster.members) == [1]
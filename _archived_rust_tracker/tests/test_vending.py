@@ -0,0 +1,61 @@
+from types import SimpleNamespace
+
+from _archived_rust_tracker.changes import MarkerDelta
+from _archived_rust_tracker.markers import MarkerType
+from _archived_rust_tracker.vending import NEW, PRICE, REMOVED, STOCK, VendingTracker
+
+
+def _order(item_id=1, quantity=1, cost=50, stock=5, currency_id=2):
+    return SimpleNamespace(item_id=item_id, quantity=quantity, currency_id=currency_id, cost_per_item=cost, amount_in_stock=stock)
+
+
+def _shop(*orders, shop_id=10):
+    return SimpleNamespace(id=shop_id, type=int(MarkerType.VENDING_MACHINE), name="Shop", sell_orders=list(orders))
+
+
+def _kinds(changes):
+    return sorted((c.kind, c.listing.item_id) for c in changes)
+
+
+def _tracker(*markers):
+    tracker = VendingTracker()
+    tracker.apply(MarkerDelta(markers=list(markers), initial=True))
+    return tracker
+
+
+def test_initial_snapshot_lists_every_order_and_skips_other_markers():
+    tracker = VendingTracker()
+    crate = SimpleNamespace(id=11, type=int(MarkerType.CRATE))
+
+    changes = tracker.apply(MarkerDelta(markers=[_shop(_order(1), _order(3)), crate], initial=True))
+
+    assert _kinds(changes) == [(NEW, 1), (NEW, 3)]
+    assert list(tracker.shops) == [10]
+
+
+def test_updated_shop_reports_price_stock_new_and_removed_orders():
+    tracker = _tracker(_shop(_order(1), _order(3), _order(4)))
+
+    shop = _shop(_order(1, cost=40), _order(3, stock=2), _order(5))
+    changes = tracker.apply(MarkerDelta(markers=[shop], updated=[shop]))
+
+    assert _kinds(changes) == [(NEW, 5), (PRICE, 1), (REMOVED, 4), (STOCK, 3)]
+    price = next(c for c in changes if c.kind == PRICE)
+    assert (price.previous.cost_amount, price.listing.cost_amount) == (50, 40)
+
+
+def test_removed_shop_reports_all_its_orders():
+    shop = _shop(_order(1), _order(3))
+    tracker = _tracker(shop)
+
+    changes = tracker.apply(MarkerDelta(markers=[], removed=[shop]))
+
+    assert _kinds(changes) == [(REMOVED, 1), (REMOVED, 3)]
+    assert tracker.shops == {}
+
+
+def test_unchanged_orders_produce_nothing():
+    shop = _shop(_order(1))
+    tracker = _tracker(shop)
+
+    assert tracker.apply(MarkerDelta(markers=[shop], moved=[shop])) == []
@@ -0,0 +1,50 @@
+from _archived_rust_tracker.vending import Listing, ListingChange, NEW, PRICE, REMOVED, STOCK
+from _archived_rust_tracker.watches import PriceWatch, WatchIndex
+
+
+def _listing(cost_amount=50, stock=5):
+    return Listing(10, "Shop", 1, "Rifle Body", 1, 2, "Scrap", cost_amount, stock)
+
+
+def _index():
+    return WatchIndex([PriceWatch(1, 100, 7, "rifle body", 60.0, "scrap")])
+
+
+def _hits(index, kind, listing):
+    return index.check(100, [ListingChange(kind, listing)])
+
+
+def test_alerts_once_per_matching_offer():
+    index = _index()
+    assert len(_hits(index, NEW, _listing())) == 1
+    assert _hits(index, STOCK, _listing(stock=3)) == []
+    assert _hits(index, PRICE, _listing(cost_amount=40)) == []
+
+
+def test_price_bounce_alerts_again():
+    index = _index()
+    assert len(_hits(index, NEW, _listing(cost_amount=50))) == 1
+    assert _hits(index, PRICE, _listing(cost_amount=80)) == []
+    assert len(_hits(index, PRICE, _listing(cost_amount=55))) == 1
+
+
+def test_sell_out_then_restock_alerts_again():
+    index = _index()
+    assert len(_hits(index, NEW, _listing())) == 1
+    assert _hits(index, STOCK, _listing(stock=0)) == []
+    assert len(_hits(index, STOCK, _listing(stock=4))) == 1
+
+
+def test_removal_prunes_and_readd_alerts_again():
+    index = _index()
+    assert len(_hits(index, NEW, _listing())) == 1
+    assert _hits(index, REMOVED, _listing()) == []
+    assert not index._alerted
+    assert len(_hits(index, NEW, _listing())) == 1
+
+
+def test_other_currency_or_item_does_not_match():
+    index = _index()
+    wood = Listing(10, "Shop", 1, "Rifle Body", 1, 3, "Wood", 10, 5)
+    pipe = Listing(10, "Shop", 4, "Metal Pipe", 1, 2, "Scrap", 10, 5)
+    assert index.check(100, [ListingChange(NEW, wood), ListingChange(NEW, pipe)]) == []
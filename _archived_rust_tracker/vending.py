@@ -0,0 +1,104 @@
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+from .changes import MarkerDelta
+from .items import item_name
+from .markers import MarkerType
+
+# Change kinds
+NEW = "new"
+PRICE = "price"
+STOCK = "stock"
+REMOVED = "removed"
+
+
+@dataclass
+class Listing:
+    shop_id: int
+    shop_name: str
+    item_id: int
+    item_name: str
+    quantity: int
+    currency_id: int
+    cost_item: str
+    cost_amount: int
+    stock: int
+
+    @property
+    def unit_price(self) -> float:
+        return self.cost_amount / self.quantity if self.quantity else float("inf")
+
+
+@dataclass
+class ListingChange:
+    kind: str
+    listing: Listing
+    previous: Optional[Listing] = None
+
+
+def _listings(marker: Any) -> Dict[Tuple[int, int], Listing]:
+    """(item, cost item) -> Listing for one vending machine marker."""
+    shop_name = (getattr(marker, "name", None) or "Vending Machine").strip()
+    listings = {}
+    for order in getattr(marker, "sell_orders", None) or []:
+        listing = Listing(
+            shop_id=marker.id,
+            shop_name=shop_name,
+            item_id=order.item_id,
+            item_name=item_name(order.item_id, getattr(order, "item_is_blueprint", False)),
+            quantity=int(order.quantity),
+            currency_id=order.currency_id,
+            cost_item=item_name(order.currency_id, getattr(order, "currency_is_blueprint", False)),
+            cost_amount=int(order.cost_per_item),
+            stock=int(order.amount_in_stock),
+        )
+        listings[(listing.item_id, listing.currency_id)] = listing
+    return listings
+
+
+def _is_vending(marker: Any) -> bool:
+    return MarkerType.of(marker) == MarkerType.VENDING_MACHINE
+
+
+class VendingTracker:
+    """
+    Last-seen sell orders per vending machine for one guild, keyed by
+    (shop, item, cost item). apply() only looks at shops in the MarkerDelta and
+    returns listing-level changes.
+    """
+
+    def __init__(self):
+        self.shops: Dict[int, Dict[Tuple[int, int], Listing]] = {}
+
+    def apply(self, delta: MarkerDelta) -> List[ListingChange]:
+        changes: List[ListingChange] = []
+
+        if delta.initial:
+            self.shops.clear()
+            changed = delta.markers
+        else:
+            changed = delta.added + delta.updated + delta.moved
+            for marker in delta.removed:
+                for listing in self.shops.pop(marker.id, {}).values():
+                    changes.append(ListingChange(REMOVED, listing, listing))
+
+        for marker in changed:
+            if not _is_vending(marker):
+                continue
+            old = self.shops.get(marker.id, {})
+            new = _listings(marker)
+            self.shops[marker.id] = new
+
+            for key, listing in new.items():
+                previous = old.get(key)
+                if previous is None:
+                    changes.append(ListingChange(NEW, listing))
+                elif (listing.quantity, listing.cost_amount) != (previous.quantity, previous.cost_amount):
+                    changes.append(ListingChange(PRICE, listing, previous))
+                elif listing.stock != previous.stock:
+                    changes.append(ListingChange(STOCK, listing, previous))
+            for key, previous in old.items():
+                if key not in new:
+                    changes.append(ListingChange(REMOVED, previous, previous))
+
+        return changes
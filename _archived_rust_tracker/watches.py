@@ -0,0 +1,90 @@
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from .search import normalize
+from .vending import Listing, ListingChange, NEW, PRICE, STOCK
+
+MAX_WATCHES_PER_USER = 10
+
+
+@dataclass
+class PriceWatch:
+    watch_id: int
+    guild_id: int
+    user_id: int
+    item_name: str
+    max_unit_price: float
+    cost_item: str
+    dm: bool = False # Alert by DM instead of the tracking channels
+
+    def matches(self, listing: Listing) -> bool:
+        return (
+            listing.stock > 0
+            and normalize(listing.cost_item) == normalize(self.cost_item)
+            and listing.unit_price <= self.max_unit_price
+        )
+
+
+def _offer_key(listing: Listing) -> Tuple:
+    # Same key across price/stock changes, so a change can always find what was stored for the offer
+    return (listing.shop_id, listing.item_id, listing.currency_id)
+
+
+class WatchIndex:
+    """
+    Price watches for all guilds, inverted by (guild, item name) so a vending
+    diff only checks watchers of the items that actually changed.
+    """
+
+    def __init__(self, watches: Iterable[PriceWatch] = ()):
+        self._by_item: Dict[Tuple[int, str], List[PriceWatch]] = defaultdict(list)
+        self._by_id: Dict[int, PriceWatch] = {}
+        self._alerted: Dict[int, Set[Tuple]] = defaultdict(set) # watch_id -> offers reported and still matching
+        for watch in watches:
+            self.add(watch)
+
+    @classmethod
+    def from_rows(cls, rows) -> "WatchIndex":
+        return cls(
+            PriceWatch(r["id"], r["guild_id"], r["user_id"], r["item_name"], float(r["max_unit_price"]), r["cost_item"], bool(r["dm"]))
+            for r in rows
+        )
+
+    def add(self, watch: PriceWatch):
+        self._by_id[watch.watch_id] = watch
+        self._by_item[(watch.guild_id, normalize(watch.item_name))].append(watch)
+
+    def remove(self, watch_id: int) -> Optional[PriceWatch]:
+        watch = self._by_id.pop(watch_id, None)
+        if watch:
+            key = (watch.guild_id, normalize(watch.item_name))
+            self._by_item[key].remove(watch)
+            if not self._by_item[key]:
+                del self._by_item[key]
+            self._alerted.pop(watch_id, None)
+        return watch
+
+    def for_user(self, guild_id: int, user_id: int) -> List[PriceWatch]:
+        return [w for w in self._by_id.values() if w.guild_id == guild_id and w.user_id == user_id]
+
+    def check(self, guild_id: int, changes: Iterable[ListingChange]) -> List[Tuple[PriceWatch, Listing]]:
+        """(watch, listing) pairs for offers that newly satisfy a watch."""
+        hits = []
+        for change in changes:
+            watchers = self._by_item.get((guild_id, normalize(change.listing.item_name)))
+            if not watchers:
+                continue
+            offer = _offer_key(change.listing)
+            for watch in watchers:
+                alerted = self._alerted[watch.watch_id]
+                if change.kind not in (NEW, PRICE, STOCK) or not watch.matches(change.listing):
+                    alerted.discard(offer) # Removed, sold out or now too expensive; alert again if it comes back
+                    if not alerted:
+                        del self._alerted[watch.watch_id]
+                    continue
+                if offer in alerted:
+                    continue # Already reported; changes that keep it matching don't re-alert
+                alerted.add(offer)
+                hits.append((watch, change.listing))
+        return hits